@@ -1,11 +1,11 @@
 # src/core/__init__.py
 """Core business logic modules."""
 
-from .portfolio import sanitize_trades, adjust_trade_amounts, recalculate_portfolio
+from .portfolio import sanitize_trades, adjust_trade_amounts, recalculate_portfolio, normalize_trade
 from .charting import create_chart
 from .data_loader import load_data, COINS, COMMISSION, SLIPPAGE, TOTAL_FEE
 
 __all__ = [
-    'sanitize_trades', 'adjust_trade_amounts', 'recalculate_portfolio',
+    'sanitize_trades', 'adjust_trade_amounts', 'recalculate_portfolio', 'normalize_trade',
     'create_chart', 'load_data', 'COINS', 'COMMISSION', 'SLIPPAGE', 'TOTAL_FEE'
 ]
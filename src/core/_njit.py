@@ -0,0 +1,23 @@
+"""
+Numba opcional para os kernels numéricos.
+
+Se o numba estiver instalado, `njit` compila os loops para código nativo.
+Caso contrário, vira um decorator no-op e os kernels rodam em Python puro
+(mesmo resultado, apenas mais lento); `prange` vira `range`.
+"""
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback no-op: aceita @njit, @njit(...) e @njit('assinatura', ...)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+__all__ = ['njit', 'prange', 'HAS_NUMBA']
@@ -0,0 +1,45 @@
+"""
+Pré-compilação dos kernels numba (uso: python -m src.core._precompile).
+
+Os kernels têm assinatura explícita e `cache=True`: importar o módulo já
+compila e grava o código nativo no cache do numba. Rodando isto no build
+da imagem (ver Dockerfile), o primeiro request do app só carrega o cache
+em vez de pagar a compilação.
+"""
+
+import importlib
+import time
+from pathlib import Path
+
+from src.core._njit import HAS_NUMBA
+
+
+# Pacotes onde ficam os kernels
+_PACKAGES = ("src.core", "src.strategies")
+
+
+def kernel_modules():
+    """Módulos dos pacotes que declaram kernels @njit (busca no fonte, sem importar)."""
+    root = Path(__file__).resolve().parents[2]
+    for package in _PACKAGES:
+        for path in sorted((root / package.replace(".", "/")).glob("*.py")):
+            if path.stem in ("_njit", "_precompile"):
+                continue
+            if "@njit(" in path.read_text(encoding="utf-8"):
+                yield f"{package}.{path.stem}"
+
+
+def main() -> None:
+    if not HAS_NUMBA:
+        print("numba não instalado: nada a compilar")
+        return
+
+    start = time.perf_counter()
+    names = list(kernel_modules())
+    for name in names:
+        importlib.import_module(name)
+    print(f"{len(names)} módulos com kernels compilados em {time.perf_counter() - start:.1f}s: {', '.join(names)}")
+
+
+if __name__ == "__main__":
+    main()
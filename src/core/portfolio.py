@@ -3,8 +3,75 @@ Portfolio management functions.
 Handles trade sanitization, position sizing and recalculation.
 """
 
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+from ._njit import njit
+from .config import get_total_fee
+
+
+# Códigos de ação usados pelos kernels numéricos
+_ACTION_NONE = 0
+_ACTION_BUY = 1
+_ACTION_SELL = 2
+
+# Chave do session_state com o último SanitizedArtifact montado
+_ARTIFACT_KEY = '_sanitized_artifact'
+
+
+@lru_cache(maxsize=64)
+def _default_fee(coin: str) -> float:
+    """Taxa total da moeda com os valores padrão do config (cacheada por moeda)."""
+    return get_total_fee(coin)
+
+
+def _fee(coin: str) -> float:
+    """
+    Taxa total (exchange + slippage) da moeda.
+    
+    Sem taxas customizadas no session_state o valor depende só da moeda e vem
+    do cache. Com customização (aba Config), consulta get_total_fee sempre,
+    para refletir a configuração atual.
+    """
+    if 'custom_exchange_fee' in st.session_state or 'custom_slippage' in st.session_state:
+        return get_total_fee(coin)
+    return _default_fee(coin)
+
+
+@lru_cache(maxsize=16)
+def _action_code(action: str) -> int:
+    """Converte a string de ação ('BUY'/'SELL') para o código inteiro (cacheado)."""
+    action = action.upper()
+    if action == 'BUY':
+        return _ACTION_BUY
+    if action == 'SELL':
+        return _ACTION_SELL
+    return _ACTION_NONE
+
+
+def normalize_trade(trade: dict) -> dict:
+    """
+    Grava o código inteiro da ação em trade['_action_code'].
+    
+    Deve ser chamado quando o trade entra no sistema (registro manual, editor,
+    arquivo, estratégias): as funções de portfólio usam o código em vez de
+    repetir action.upper() a cada recálculo.
+    """
+    trade['_action_code'] = _action_code(trade.get('action', ''))
+    return trade
+
+
+def _trade_code(t: dict) -> int:
+    """Código da ação do trade (usa o normalizado se existir)."""
+    code = t.get('_action_code')
+    if code is None:
+        return _action_code(t.get('action', ''))
+    return code
 
 
 def sanitize_trades(trades: list) -> list:
@@ -18,24 +85,28 @@ def sanitize_trades(trades: list) -> list:
     if not trades:
         return []
     
-    # Ordena por timestamp
-    sorted_trades = sorted(trades, key=lambda x: x['timestamp'])
+    # Ordena por timestamp (caso comum: trades já chegam em ordem -> só verifica, O(N))
+    ts = [t['timestamp'] for t in trades]
+    if all(a <= b for a, b in zip(ts, ts[1:])):
+        sorted_trades = trades
+    else:
+        sorted_trades = sorted(trades, key=lambda x: x['timestamp'])
     
     valid_trades = []
     holdings = 0.0
     
     for t in sorted_trades:
-        action = t.get('action', '').upper()
+        code = _trade_code(t)
         amount = float(t.get('amount', 1.0))
         
-        if action == 'BUY':
+        if code == _ACTION_BUY:
             # STRICT MODE: Só permite compra se não houver posição aberta
             if holdings < 0.0001:  # Basicamente zero
                 valid_trades.append(t)
                 holdings += amount
             # else: Ignora compra se já estiver posicionado
             
-        elif action == 'SELL':
+        elif code == _ACTION_SELL:
             # Só permite venda se tiver saldo suficiente
             if holdings >= (amount - 0.0001):
                 valid_trades.append(t)
@@ -45,227 +116,399 @@ def sanitize_trades(trades: list) -> list:
     return valid_trades
 
 
-def adjust_trade_amounts(trades: list, initial_balance: float, position_size_pct: float = 100.0, 
-                         force_close: bool = False, last_price: float = None, last_timestamp = None,
-                         use_compound: bool = False) -> list:
+def _trades_frame(trades: list) -> pd.DataFrame:
     """
-    Ajusta os amounts dos trades.
+    Normaliza os campos numéricos/ação dos trades de uma vez (vetorizado no pandas).
     
-    Args:
-        trades: Lista de trades com amounts placeholders
-        initial_balance: Saldo inicial da conta
-        position_size_pct: Porcentagem do saldo por operação
-        force_close: Se True, adiciona SELL no final se houver posição aberta
-        last_price: Preço do último candle
-        last_timestamp: Timestamp do último candle
-        use_compound: Se True, usa saldo CORRENTE (juros compostos). 
-                      Se False, usa saldo INICIAL fixo.
+    Colunas: action (código inteiro, de _action_code quando presente), price, amount (NaN se ausente), size_factor.
+    Extraia as colunas com to_numpy(copy=True): os kernels compilados exigem
+    arrays graváveis e o pandas pode devolver views somente-leitura.
+    """
+    df_t = pd.DataFrame.from_records(
+        trades, columns=['action', '_action_code', 'price', 'amount', 'size_factor']
+    )
     
-    Returns:
-        Lista de trades com amounts ajustados
+    # Usa o código normalizado; só converte a string nos trades sem código
+    codes = pd.to_numeric(df_t['_action_code'], errors='coerce')
+    missing = codes.isna()
+    if missing.any():
+        action = df_t.loc[missing, 'action'].astype(str).str.upper()
+        codes[missing] = action.map({'BUY': _ACTION_BUY, 'SELL': _ACTION_SELL}).fillna(_ACTION_NONE)
+    df_t['action'] = codes.astype(np.uint8)
+    df_t['price'] = pd.to_numeric(df_t['price'], errors='coerce').fillna(0.0).astype(np.float64)
+    df_t['amount'] = pd.to_numeric(df_t['amount'], errors='coerce').astype(np.float64)
+    df_t['size_factor'] = pd.to_numeric(df_t['size_factor'], errors='coerce').fillna(1.0).astype(np.float64)
+    return df_t
+
+
+@dataclass(slots=True)
+class SanitizedArtifact:
     """
-    from .config import get_total_fee, COMMISSION
+    Trades sanitizados + arrays prontos para os kernels.
     
-    if not trades:
-        return []
-        
-    adjusted_trades = []
+    Montado uma vez e compartilhado entre recalculate_portfolio e
+    get_portfolio_at (que o UI chama várias vezes no mesmo rerun).
+    """
+    trades: list                   # Lista limpa (saída de sanitize_trades)
+    timestamps: pd.DatetimeIndex   # Timestamp de cada trade
+    prices: np.ndarray             # float64
+    amounts: np.ndarray            # float64, NaN onde o trade não tem amount
+    action_codes: np.ndarray       # uint8 (_ACTION_*)
+    
+    def amounts_or(self, default_amount: float) -> np.ndarray:
+        """Amounts com o default aplicado aos trades sem amount."""
+        return np.where(np.isnan(self.amounts), float(default_amount), self.amounts)
+
+
+def build_sanitized_artifact(trades: list) -> SanitizedArtifact:
+    """
+    Sanitiza os trades e extrai os arrays para os kernels.
+    
+    Preço/amount ficam em float64: o amount volta para holdings, e a venda
+    de st.session_state.holdings precisa bater com o amount da compra
+    (em float32, 80923.45078979344 vira 80923.453125 e a venda é descartada).
+    """
+    clean_trades = sanitize_trades(trades)
+    df_t = _trades_frame(clean_trades)
+    return SanitizedArtifact(
+        trades=clean_trades,
+        timestamps=pd.DatetimeIndex(pd.to_datetime([t['timestamp'] for t in clean_trades])),
+        prices=df_t['price'].to_numpy(dtype=np.float64, copy=True),
+        amounts=df_t['amount'].to_numpy(dtype=np.float64, copy=True),
+        action_codes=df_t['action'].to_numpy(copy=True),
+    )
+
+
+def _get_artifact(trades: list) -> SanitizedArtifact:
+    """
+    Artefato dos trades, reaproveitado do session_state quando possível.
+    
+    O cache guarda a própria lista de origem (comparada por identidade e
+    tamanho): manter a referência impede que outro objeto reutilize o mesmo id.
+    A lista limpa do artefato (que vai para session_state.trades) também vale.
+    """
+    cached = st.session_state.get(_ARTIFACT_KEY)
+    if cached is not None:
+        source, size, artifact = cached
+        if source is trades and size == len(trades):
+            return artifact
+        if artifact.trades is trades and len(artifact.prices) == len(trades):
+            return artifact
+    
+    artifact = build_sanitized_artifact(trades)
+    st.session_state[_ARTIFACT_KEY] = (trades, len(trades), artifact)
+    return artifact
+
+
+# Assinatura explícita: compila na importação do módulo (não no primeiro uso)
+@njit('Tuple((f8[:], b1[:], f8))(f8[:], u1[:], f8[:], f8, f8, f8, b1)', cache=True)
+def _sizing_walk(prices, actions, size_factors, initial_balance, position_size_pct, fee_rate, use_compound):
+    """
+    Simula o saldo corrente e define o amount de cada trade (kernel de adjust_trade_amounts).
+    
+    Returns:
+        (amounts, keep, holdings)
+        amounts: novo amount de cada trade (NaN = trade não tocado)
+        keep: máscara dos trades mantidos
+        holdings: posição aberta ao final
+    """
+    n = prices.shape[0]
+    amounts = np.full(n, np.nan)
+    keep = np.zeros(n, dtype=np.bool_)
     
-    # Estado para simulação de saldo corrente
     running_balance = initial_balance
     holdings = 0.0
     
-    # Usa taxa total (exchange + slippage) baseada na moeda selecionada
-    coin = st.session_state.get('sb_coin', 'SOL/USDT')
-    fee_rate = get_total_fee(coin) 
-    
-    for t in trades:
-        action = t.get('action', '').upper()
-        price = float(t.get('price', 0))
+    for i in range(n):
+        price = prices[i]
         
-        if action == 'BUY':
-            if holdings == 0: # Só compra se não tiver posição (logica simplificada de portfolio unico)
+        if actions[i] == _ACTION_BUY:
+            if holdings == 0:  # Só compra se não tiver posição (portfolio único)
                 # Define base de cálculo do tamanho da posição
                 base_capital = running_balance if use_compound else initial_balance
                 
-                # Fator de tamanho do trade (Gestão de Risco)
-                # Default 1.0 (100%), pode vir da estratégia ou gestão de risco
-                size_factor = t.get('size_factor', 1.0)
-                
-                # Calcula valor alvo do trade
                 # target = Capital * %Global * FatorDinâmico
-                target_value = base_capital * (position_size_pct / 100.0) * size_factor
+                target_value = base_capital * (position_size_pct / 100.0) * size_factors[i]
                 
                 # PROTEÇÃO: Nunca investir mais do que o saldo disponível (sem alavancagem)
-                # Se não estiver usando juros compostos (fixo), mas perdeu dinheiro, 
-                # limita ao que sobrou na conta.
                 position_value = min(target_value, running_balance)
                 
                 # Se saldo for insuficiente (<= 0), não opera
                 if position_value <= 0:
-                    position_value = 0
+                    position_value = 0.0
                 
-                # Ajusta amount
-                amount = position_value / price if price > 0 else 0
+                amount = position_value / price if price > 0 else 0.0
                 
-                # Registra o custo (estimado para controle de fluxo)
                 cost = amount * price
                 fee = cost * fee_rate
                 
                 # Pequeno ajuste se a taxa faria o saldo ficar negativo (corner case)
                 if (cost + fee) > running_balance:
-                    # Reduz amount para cobrir a taxa
                     amount = running_balance / (price * (1 + fee_rate))
                     cost = amount * price
                     fee = cost * fee_rate
                 
                 running_balance -= (cost + fee)
                 
-                t['amount'] = amount
+                amounts[i] = amount
                 holdings += amount
-                if amount > 0:
-                    adjusted_trades.append(t)
-            
-        elif action == 'SELL':
+                keep[i] = amount > 0
+        
+        elif actions[i] == _ACTION_SELL:
             if holdings > 0:
                 # Vende TUDO (uma compra = uma venda)
-                # O size_factor já foi aplicado na COMPRA para controlar tamanho
-                amount = holdings  # Vende 100% da posição
+                amount = holdings
                 
                 revenue = amount * price
                 fee = revenue * fee_rate
                 running_balance += (revenue - fee)
                 
-                t['amount'] = amount
-                holdings = 0  # Zera posição
-                adjusted_trades.append(t)
+                amounts[i] = amount
+                holdings = 0.0
+                keep[i] = True
+    
+    return amounts, keep, holdings
+
+
+def adjust_trade_amounts(trades: list, initial_balance: float, position_size_pct: float = 100.0, 
+                         force_close: bool = False, last_price: float = None, last_timestamp = None,
+                         use_compound: bool = False, fee_rate: Optional[float] = None) -> list:
+    """
+    Ajusta os amounts dos trades.
+    
+    Args:
+        trades: Lista de trades com amounts placeholders
+        initial_balance: Saldo inicial da conta
+        position_size_pct: Porcentagem do saldo por operação
+        force_close: Se True, adiciona SELL no final se houver posição aberta
+        last_price: Preço do último candle
+        last_timestamp: Timestamp do último candle
+        use_compound: Se True, usa saldo CORRENTE (juros compostos). 
+                      Se False, usa saldo INICIAL fixo.
+        fee_rate: Taxa total já calculada pelo chamador (None = taxa da moeda selecionada)
+    
+    Returns:
+        Lista de trades com amounts ajustados
+    """
+    if not trades:
+        return []
+    
+    # Usa taxa total (exchange + slippage) baseada na moeda selecionada
+    if fee_rate is None:
+        fee_rate = _fee(st.session_state.get('sb_coin', 'SOL/USDT'))
+    
+    # Coerção de ação/preço/size_factor de uma vez; o loop com estado roda no kernel
+    df_t = _trades_frame(trades)
+    amounts, keep, holdings = _sizing_walk(
+        df_t['price'].to_numpy(copy=True), df_t['action'].to_numpy(copy=True),
+        df_t['size_factor'].to_numpy(copy=True),
+        float(initial_balance), float(position_size_pct), float(fee_rate), bool(use_compound)
+    )
+    
+    for i in np.flatnonzero(~np.isnan(amounts)):
+        trades[i]['amount'] = amounts[i].item()
+    adjusted_trades = [normalize_trade(trades[i]) for i in np.flatnonzero(keep)]
     
     # Force close: se ainda tem posição aberta e force_close está ativo
     if force_close and holdings > 0 and last_price and last_timestamp:
         close_trade = {
             'action': 'SELL',
             'price': last_price,
-            'amount': holdings,
+            'amount': float(holdings),
             'timestamp': last_timestamp,
             'reason': '📌 Fechamento Forçado (fim do período)',
             'coin': 'AUTO'
         }
-        adjusted_trades.append(close_trade)
-        # Atualiza saldo final (opcional aqui, mas bom para debug)
-        revenue = holdings * last_price
-        fee = revenue * fee_rate
-        running_balance += (revenue - fee)
-        holdings = 0
+        adjusted_trades.append(normalize_trade(close_trade))
     
     return adjusted_trades
 
 
-def recalculate_portfolio(trades: list) -> None:
-    """Recalcula o portfólio baseado na lista de trades (com sanitização)."""
-    from .config import get_total_fee, COMMISSION
+@njit('Tuple((f8, f8, f8, f8[:], f8[:]))(f8[:], f8[:], u1[:], f8, f8)', cache=True)
+def _portfolio_walk(prices, amounts, actions, init_bal, fee_rate):
+    """
+    Percorre os trades acumulando saldo, posição e preço médio.
     
-    clean_trades = sanitize_trades(trades)
+    Kernel compartilhado por recalculate_portfolio e get_portfolio_at,
+    garantindo que os dois calculem exatamente os mesmos números.
+    Tudo em float64 (entradas e curvas).
     
-    # Reseta portfólio
-    st.session_state.trades = clean_trades
-    st.session_state.balance = st.session_state.get('initial_balance', 10000.0)
-    st.session_state.holdings = 0.0
-    st.session_state.avg_price = 0.0
+    Returns:
+        (balance, holdings, avg_price, bal_curve, hold_curve)
+        As curvas guardam o estado após cada trade (curva de patrimônio).
+    """
+    n = prices.shape[0]
+    bal_curve = np.empty(n, dtype=np.float64)
+    hold_curve = np.empty(n, dtype=np.float64)
     
-    # Pega moeda selecionada para usar taxa correta
-    coin = st.session_state.get('sb_coin', 'SOL/USDT')
-    fee_rate = get_total_fee(coin)
+    balance = init_bal
+    holdings = 0.0
+    avg_price = 0.0
     
-    # Recalcula posição
-    for t in clean_trades:
-        action = t.get('action', '').upper()
-        price = float(t.get('price', 0))
-        amount = float(t.get('amount', 1.0))
+    for i in range(n):
+        price = prices[i]
+        amount = amounts[i]
         
-        if action == 'BUY':
+        if actions[i] == _ACTION_BUY:
             cost = amount * price
             fee = cost * fee_rate
             
             # Calcula novo preço médio
-            total_holdings = st.session_state.holdings + amount
+            total_holdings = holdings + amount
             if total_holdings > 0:
-                curr_val = st.session_state.holdings * st.session_state.avg_price
-                new_val = amount * price
-                st.session_state.avg_price = (curr_val + new_val) / total_holdings
+                avg_price = (holdings * avg_price + amount * price) / total_holdings
             
-            st.session_state.balance -= (cost + fee)
-            st.session_state.holdings = total_holdings
-                
-        elif action == 'SELL':
+            balance -= (cost + fee)
+            holdings = total_holdings
+            
+        elif actions[i] == _ACTION_SELL:
             revenue = amount * price
             fee = revenue * fee_rate
-            st.session_state.balance += (revenue - fee)
-            st.session_state.holdings -= amount
+            balance += (revenue - fee)
+            holdings -= amount
             
-            if st.session_state.holdings <= 0.0001:
-                st.session_state.holdings = 0.0
-                st.session_state.avg_price = 0.0
+            if holdings <= 0.0001:
+                holdings = 0.0
+                avg_price = 0.0
+        
+        bal_curve[i] = balance
+        hold_curve[i] = holdings
+    
+    return balance, holdings, avg_price, bal_curve, hold_curve
+
+
+@njit('Tuple((f8, f8, f8))(f8[:], f8[:], u1[:], f8, f8)', cache=True)
+def _replay_walk(prices, amounts, actions, init_bal, fee_rate):
+    """
+    Saldo, posição e preço médio após os trades, na ordem em que vieram.
+    
+    Replay fiel de um arquivo de trades: sem sanitização e sem zerar a
+    posição residual (ao contrário de _portfolio_walk), tudo em float64.
+    """
+    balance = init_bal
+    holdings = 0.0
+    avg_price = 0.0
+    
+    for i in range(prices.shape[0]):
+        price = prices[i]
+        amount = amounts[i]
+        
+        if actions[i] == _ACTION_BUY:
+            cost = amount * price
+            balance -= (cost + cost * fee_rate)
+            if (holdings + amount) > 0:
+                avg_price = (holdings * avg_price + amount * price) / (holdings + amount)
+            holdings += amount
+        
+        elif actions[i] == _ACTION_SELL:
+            revenue = amount * price
+            balance += (revenue - revenue * fee_rate)
+            holdings -= amount
+    
+    return balance, holdings, avg_price
+
+
+def replay_trades(trades: list, initial_balance: float, fee_rate: float) -> Tuple[float, float, float]:
+    """
+    Recalcula (saldo, posição, preço médio) de trades carregados de arquivo.
+    
+    Sem sanitizar: price e amount são obrigatórios e convertidos com float(),
+    então um trade sem o campo ou com valor não numérico levanta
+    (KeyError/TypeError/ValueError) em vez de virar 0/NaN em silêncio.
+    O laço roda no kernel compilado; o preço médio depende da posição anterior.
+    """
+    n = len(trades)
+    prices = np.fromiter((float(t['price']) for t in trades), dtype=np.float64, count=n)
+    amounts = np.fromiter((float(t['amount']) for t in trades), dtype=np.float64, count=n)
+    actions = _trades_frame(trades)['action'].to_numpy(copy=True)
+    balance, holdings, avg_price = _replay_walk(
+        prices, amounts, actions, float(initial_balance), float(fee_rate)
+    )
+    return float(balance), float(holdings), float(avg_price)
+
+
+def recalculate_portfolio(trades: list, artifact: Optional[SanitizedArtifact] = None,
+                          fee_rate: Optional[float] = None) -> None:
+    """Recalcula o portfólio baseado na lista de trades (com sanitização)."""
+    if artifact is None:
+        artifact = _get_artifact(trades)
+    initial_balance = st.session_state.get('initial_balance', 10000.0)
+    
+    # Pega moeda selecionada para usar taxa correta
+    if fee_rate is None:
+        fee_rate = _fee(st.session_state.get('sb_coin', 'SOL/USDT'))
+    
+    # Recalcula posição
+    balance, holdings, avg_price, _, _ = _portfolio_walk(
+        artifact.prices, artifact.amounts_or(1.0), artifact.action_codes,
+        float(initial_balance), float(fee_rate)
+    )
+    
+    st.session_state.trades = artifact.trades
+    st.session_state.balance = float(balance)
+    st.session_state.holdings = float(holdings)
+    st.session_state.avg_price = float(avg_price)
                 
                 
-def get_portfolio_at(trades: list, target_timestamp) -> dict:
+def get_portfolio_at(trades: list, target_timestamp,
+                     artifact: Optional[SanitizedArtifact] = None,
+                     fee_rate: Optional[float] = None) -> dict:
     """
     Calcula o estado do portfólio em um momento específico (time-travel).
     Retorna dict com balance, holdings, avg_price.
     """
-    from .config import get_total_fee
-    
-    # Filtra trades até o momento atual
     # Precisamos sanitizar TUDO primeiro para manter a lógica consistente
-    clean_trades = sanitize_trades(trades)
+    if artifact is None:
+        artifact = _get_artifact(trades)
     
     # Filtra por timestamp
     # Converte para timestamp do pandas para garantir comparação correta
     target_ts = pd.to_datetime(target_timestamp)
-    relevant_trades = [t for t in clean_trades if pd.to_datetime(t['timestamp']) <= target_ts]
+    relevant = np.asarray(artifact.timestamps <= target_ts, dtype=bool)
     
     # Estado inicial
-    balance = st.session_state.get('initial_balance', 10000.0)
-    holdings = 0.0
-    avg_price = 0.0
+    initial_balance = st.session_state.get('initial_balance', 10000.0)
     
-    coin = st.session_state.get('sb_coin', 'SOL/USDT')
-    fee_rate = get_total_fee(coin)
+    if fee_rate is None:
+        fee_rate = _fee(st.session_state.get('sb_coin', 'SOL/USDT'))
     
-    for t in relevant_trades:
-        action = t.get('action', '').upper()
-        price = float(t.get('price', 0))
-        amount = float(t.get('amount', 0))
-        
-        if action == 'BUY':
-            cost = amount * price
-            fee = cost * fee_rate
-            
-            total_holdings = holdings + amount
-            if total_holdings > 0:
-                curr_val = holdings * avg_price
-                new_val = amount * price
-                avg_price = (curr_val + new_val) / total_holdings
-            
-            balance -= (cost + fee)
-            holdings = total_holdings
-            
-        elif action == 'SELL':
-            revenue = amount * price
-            fee = revenue * fee_rate
-            balance += (revenue - fee)
-            holdings -= amount
-            
-            if holdings <= 0.0001:
-                holdings = 0.0
-                avg_price = 0.0
+    balance, holdings, avg_price, _, _ = _portfolio_walk(
+        artifact.prices[relevant], artifact.amounts_or(0.0)[relevant], artifact.action_codes[relevant],
+        float(initial_balance), float(fee_rate)
+    )
                 
     return {
-        'balance': balance,
-        'holdings': holdings,
-        'avg_price': avg_price
+        'balance': float(balance),
+        'holdings': float(holdings),
+        'avg_price': float(avg_price)
     }
 
 
+def _values_at(series: pd.Series, timestamps: pd.DatetimeIndex, default: float) -> np.ndarray:
+    """
+    Busca os valores da série nos timestamps dos trades (busca binária no índice).
+    Timestamps que não existem no índice recebem o valor default, assim como
+    todos quando o fuso do índice não bate com o dos trades (aware x naive).
+    """
+    index = series.index
+    if (len(index) == 0 or not isinstance(index, pd.DatetimeIndex)
+            or (index.tz is None) != (timestamps.tz is None)):
+        return np.full(len(timestamps), default, dtype=float)
+    values = series.to_numpy(dtype=float)
+    
+    if not index.is_monotonic_increasing:
+        # Fora de ordem: searchsorted não vale, busca por hash (1ª ocorrência)
+        keep = ~index.duplicated()
+        pos = index[keep].get_indexer(timestamps)
+        return np.where(pos >= 0, values[keep][pos], default)
+    
+    pos = index.searchsorted(timestamps)
+    pos_clip = np.minimum(pos, len(index) - 1)
+    valid = (pos < len(index)) & (index[pos_clip] == timestamps)
+    
+    return np.where(valid, values[pos_clip], default)
+
+
 def apply_risk_management(trades: list, df: pd.DataFrame, method: str) -> list:
     """
     Aplica lógica de Sizing (Gestão de Risco) aos trades.
@@ -281,60 +524,57 @@ def apply_risk_management(trades: list, df: pd.DataFrame, method: str) -> list:
     """
     if not trades or method == 'fixo':
         return trades
-        
-    processed_trades = []
     
-    # Pré-cálculos de indicadores se necessário
-    atr_pct = None
-    rsi_series = None
+    n = len(trades)
+    factors = np.ones(n)
+    labels = None
     
-    if method == "volatilidade_atr" and 'close' in df.columns:
-        # Calcula ATR Simplificado (%) se não tiver
-        high = df['high'] if 'high' in df.columns else df['close'] * 1.01
-        low = df['low'] if 'low' in df.columns else df['close'] * 0.99
-        high_low = (high - low) / df['close']
-        atr_pct = high_low.rolling(14).mean().fillna(0.02) # Default 2%
+    if method == "conservador":
+        factors[:] = 0.5
         
-    if method == "agressivo_rsi" and 'rsi' in df.columns:
-        rsi_series = df['rsi']
+    elif method == "volatilidade_atr":
+        trade_ts = pd.DatetimeIndex(pd.to_datetime([t['timestamp'] for t in trades]))
+        atr_values = np.full(n, 0.02)
         
-    for t in trades:
-        ts = t['timestamp']
-        factor = 1.0 # Default
-        
-        if method == "conservador":
-            factor = 0.5
+        if 'close' in df.columns:
+            # Calcula ATR Simplificado (%) se não tiver
+            high = df['high'] if 'high' in df.columns else df['close'] * 1.01
+            low = df['low'] if 'low' in df.columns else df['close'] * 0.99
+            high_low = (high - low) / df['close']
+            atr_pct = high_low.rolling(14).mean().fillna(0.02) # Default 2%
             
-        elif method == "volatilidade_atr":
-            try:
-                # Busca Volatilidade na data do trade
-                current_atr = atr_pct.loc[ts] if (atr_pct is not None and ts in atr_pct.index) else 0.02
-                
-                if current_atr > 0.04: factor = 0.3      # Caos
-                elif current_atr > 0.025: factor = 0.6   # Agitado
-                elif current_atr < 0.01: factor = 1.0    # Calmo (Full)
-                else: factor = 0.8                       # Normal
-                    
-                t['reason'] = t.get('reason', '') + f" | Volat.: {current_atr:.2%} (x{factor})"
-            except:
-                factor = 1.0
-
-        elif method == "agressivo_rsi":
-            try:
-                val_rsi = rsi_series.loc[ts] if (rsi_series is not None and ts in rsi_series.index) else 50
-                action = t['action']
-                
-                if action == 'BUY':
-                    if val_rsi < 25: factor = 1.0    # Oversold extremo -> Full
-                    elif val_rsi < 35: factor = 0.6  # Médio
-                    else: factor = 0.3               # Fraco
-                elif action == 'SELL':
-                    factor = 1.0 # Venda full
-                    
-                t['reason'] = t.get('reason', '') + f" | RSI: {val_rsi:.1f} (x{factor})"
-            except:
-                factor = 1.0
-                
+            # Busca Volatilidade na data de cada trade
+            atr_values = _values_at(atr_pct, trade_ts, 0.02)
+        
+        factors = np.select(
+            [atr_values > 0.04, atr_values > 0.025, atr_values < 0.01],
+            [0.3, 0.6, 1.0],   # Caos / Agitado / Calmo (Full)
+            default=0.8        # Normal
+        )
+        labels = [f" | Volat.: {v:.2%} (x{f})" for v, f in zip(atr_values.tolist(), factors.tolist())]
+
+    elif method == "agressivo_rsi":
+        trade_ts = pd.DatetimeIndex(pd.to_datetime([t['timestamp'] for t in trades]))
+        rsi_values = np.full(n, 50.0)
+        
+        if 'rsi' in df.columns:
+            rsi_values = _values_at(df['rsi'], trade_ts, 50.0)
+        
+        is_buy = np.array([t.get('action') == 'BUY' for t in trades], dtype=bool)
+        buy_factors = np.select(
+            [rsi_values < 25, rsi_values < 35],
+            [1.0, 0.6],        # Oversold extremo -> Full / Médio
+            default=0.3        # Fraco
+        )
+        factors = np.where(is_buy, buy_factors, 1.0) # Venda full
+        labels = [f" | RSI: {v:.1f} (x{f})" for v, f in zip(rsi_values.tolist(), factors.tolist())]
+    
+    processed_trades = []
+    
+    for i, t in enumerate(trades):
+        factor = factors[i].item()
+        if labels is not None:
+            t['reason'] = t.get('reason', '') + labels[i]
         t['size_factor'] = factor
         processed_trades.append(t)
         
@@ -6,26 +6,247 @@ Salva e carrega estratégias como arquivos JSON.
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from pathlib import Path
 
+# orjson é opcional: parse/serialização em C, bem mais rápido que o json padrão
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+
 
 # Diretório para salvar estratégias (relativo à raiz do projeto)
 STRATEGIES_DIR = Path(__file__).parent.parent.parent / "saved_strategies"
 
 
+# Manifesto com os metadados de todas as estratégias salvas.
+# Evita abrir e parsear cada arquivo para listar/localizar estratégias.
+# Começa com '.': sanitize_filename troca '.' por '_', então nenhum nome de
+# estratégia gera esse arquivo.
+INDEX_FILENAME = ".index.json"
+
+# Sidecar por estratégia (<nome>.meta.json) só com os metadados da listagem.
+# Reconstruir o manifesto lê os sidecars em vez das configs completas.
+META_SUFFIX = ".meta.json"
+
+# A partir de quantos arquivos a reconstrução do manifesto usa threads
+_PARALLEL_MIN_FILES = 16
+
+# Cache do manifesto: {diretório: ({filename: st_mtime_ns}, listagem, {nome: filename})}
+# Criar, remover ou reescrever um arquivo muda esse mapa e invalida o cache
+# (o mtime do diretório não pega edições no lugar de um arquivo existente).
+_INDEX_CACHE: Dict[str, tuple] = {}
+
+
 def ensure_dir_exists():
     """Garante que o diretório de estratégias existe."""
     STRATEGIES_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# Tabela de tradução ASCII: mantém alfanuméricos, '-' e '_'; o resto vira '_'
+_SAFE_TABLE = str.maketrans({
+    chr(i): chr(i) if chr(i).isalnum() or chr(i) in '-_' else '_'
+    for i in range(128)
+})
+
+
 def sanitize_filename(name: str) -> str:
     """Converte nome para um filename seguro."""
     # Remove caracteres especiais e espaços
-    safe = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in name)
+    safe = name.translate(_SAFE_TABLE)
+    if not safe.isascii():
+        # Caracteres não-ASCII (raros): mantém só letras/dígitos unicode
+        safe = "".join(c if c.isascii() or c.isalnum() else '_' for c in safe)
     return safe.lower()[:50]  # Limita tamanho
 
 
+# =============================================================================
+# MANIFESTO (.index.json)
+# =============================================================================
+
+def _index_path() -> Path:
+    """Caminho do manifesto dentro do diretório de estratégias."""
+    return STRATEGIES_DIR / INDEX_FILENAME
+
+
+def _strategy_files() -> Dict[str, int]:
+    """{filename: st_mtime_ns} dos arquivos de estratégia (ignora o manifesto e os sidecars)."""
+    files = {}
+    with os.scandir(STRATEGIES_DIR) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith(".json") and name != INDEX_FILENAME and not name.endswith(META_SUFFIX):
+                files[name] = entry.stat().st_mtime_ns
+    return files
+
+
+def _meta_path(filepath: Path) -> Path:
+    """Caminho do sidecar de metadados de um arquivo de estratégia."""
+    return filepath.with_name(filepath.stem + META_SUFFIX)
+
+
+def _summarize(config: Dict, filename: str) -> Dict:
+    """Extrai os metadados de uma estratégia para o manifesto/listagem."""
+    return {
+        "name": config.get("name", Path(filename).stem),
+        "filename": filename,
+        "buy_rules_count": len(config.get("buy_rules", [])),
+        "sell_rules_count": len(config.get("sell_rules", [])),
+        "buy_logic": config.get("buy_logic", "AND"),
+        "sell_logic": config.get("sell_logic", "AND"),
+    }
+
+
+def _write_index(index: Dict[str, Dict]) -> None:
+    """Grava o manifesto de forma atômica (arquivo temporário + rename)."""
+    tmp_path = _index_path().with_suffix(".json.tmp")
+    tmp_path.write_bytes(_dumps(index))
+    os.replace(tmp_path, _index_path())
+    _INDEX_CACHE.pop(str(STRATEGIES_DIR), None)
+
+
+def _load_one_for_list(filepath: Path) -> Optional[Dict]:
+    """
+    Devolve os metadados de um arquivo de estratégia (None se inválido).
+    
+    Usa o sidecar .meta.json se estiver em dia com o arquivo; senão parseia a
+    config completa e grava o sidecar (migração de arquivos antigos/externos).
+    """
+    meta_path = _meta_path(filepath)
+    try:
+        if meta_path.stat().st_mtime_ns >= filepath.stat().st_mtime_ns:
+            return dict(_loads(meta_path.read_bytes()), filename=filepath.name)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    
+    try:
+        entry = _summarize(_loads(filepath.read_bytes()), filepath.name)
+    except (json.JSONDecodeError, KeyError):
+        return None
+    
+    meta_path.write_bytes(_dumps(entry))
+    return entry
+
+
+def _index_entry(filename: str, mtime_ns: int) -> Dict:
+    """
+    Entrada do manifesto: metadados + st_mtime_ns do arquivo resumido.
+    
+    Arquivo inválido vira {"filename", "invalid": True} com o mtime: é
+    reavaliado quando o arquivo mudar (ex: corrigido), não fica para sempre.
+    """
+    entry = _load_one_for_list(STRATEGIES_DIR / filename)
+    if entry is None:
+        entry = {"filename": filename, "invalid": True}
+    return dict(entry, mtime_ns=mtime_ns)
+
+
+def _refresh_entries(index: Dict[str, Dict], files: Dict[str, int], names: List[str]) -> None:
+    """Resume de novo os arquivos `names` no manifesto (threads se forem muitos)."""
+    if len(names) < _PARALLEL_MIN_FILES:
+        entries = [_index_entry(name, files[name]) for name in names]
+    else:
+        # Leitura é dominada por IO: threads sobrepõem as leituras de disco
+        with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as ex:
+            entries = list(ex.map(_index_entry, names, [files[name] for name in names]))
+    index.update(zip(names, entries))
+
+
+def _rebuild_index() -> Dict[str, Dict]:
+    """Reconstrói o manifesto lendo todos os arquivos de estratégia (ou os sidecars em dia)."""
+    files = _strategy_files()
+    index: Dict[str, Dict] = {}
+    _refresh_entries(index, files, list(files))
+    _write_index(index)
+    return index
+
+
+def _load_index(files: Optional[Dict[str, int]] = None) -> Dict[str, Dict]:
+    """
+    Carrega o manifesto {filename: metadados} em dia com os arquivos.
+    
+    Reconstrói se o manifesto estiver ausente ou corrompido; senão tira as
+    entradas de arquivos removidos e resume de novo só os arquivos novos ou
+    com st_mtime_ns diferente do registrado (editados fora do app).
+    """
+    try:
+        index = _loads(_index_path().read_bytes())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return _rebuild_index()
+    if not isinstance(index, dict):
+        return _rebuild_index()
+    
+    if files is None:
+        files = _strategy_files()
+    stale = [
+        name for name, mtime_ns in files.items()
+        if not isinstance(index.get(name), dict) or index[name].get("mtime_ns") != mtime_ns
+    ]
+    removed = [name for name in index if name not in files]
+    
+    if stale or removed:
+        for name in removed:
+            del index[name]
+        _refresh_entries(index, files, stale)
+        _write_index(index)
+    
+    return index
+
+
+def _cached_index() -> tuple:
+    """
+    Listagem ordenada e mapa {nome de exibição: filename}, cacheados pelos mtimes dos arquivos.
+    
+    Returns:
+        (strategies, by_name)
+    """
+    key = str(STRATEGIES_DIR)
+    files = _strategy_files()
+    cached = _INDEX_CACHE.get(key)
+    if cached is not None and cached[0] == files:
+        return cached[1], cached[2]
+    
+    entries = [
+        {k: v for k, v in entry.items() if k != "mtime_ns"}
+        for entry in _load_index(files).values() if not entry.get("invalid")
+    ]
+    strategies = sorted(entries, key=lambda x: x["name"].lower())
+    by_name = {entry["name"]: entry["filename"] for entry in entries}
+    
+    _INDEX_CACHE[key] = (files, strategies, by_name)
+    return strategies, by_name
+
+
+def _filename_for(name: str) -> Optional[str]:
+    """
+    Arquivo da estratégia pelo nome de exibição (None se não existir).
+    
+    O mapa do manifesto já está em dia pelos mtimes (_cached_index): um nome
+    ausente dele não existe, sem reparsear nem gravar nada.
+    """
+    return _cached_index()[1].get(name)
+
+
+# =============================================================================
+# API PÚBLICA
+# =============================================================================
+
 def save_strategy(name: str, config: Dict) -> str:
     """
     Salva uma estratégia customizada como JSON.
@@ -38,6 +259,7 @@ def save_strategy(name: str, config: Dict) -> str:
         Caminho do arquivo salvo
     """
     ensure_dir_exists()
+    index = _load_index()
     
     # Garante que o nome está na config
     config["name"] = name
@@ -45,8 +267,12 @@ def save_strategy(name: str, config: Dict) -> str:
     filename = sanitize_filename(name) + ".json"
     filepath = STRATEGIES_DIR / filename
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False, default=str)
+    filepath.write_bytes(_dumps(config))
+    
+    entry = _summarize(config, filename)
+    _meta_path(filepath).write_bytes(_dumps(entry))
+    index[filename] = dict(entry, mtime_ns=filepath.stat().st_mtime_ns)
+    _write_index(index)
     
     return str(filepath)
 
@@ -68,19 +294,13 @@ def load_strategy(name: str) -> Optional[Dict]:
     filepath = STRATEGIES_DIR / filename
     
     if not filepath.exists():
-        # Tenta encontrar pelo nome exato
-        for f in STRATEGIES_DIR.glob("*.json"):
-            try:
-                with open(f, 'r', encoding='utf-8') as file:
-                    config = json.load(file)
-                    if config.get("name") == name:
-                        return config
-            except (json.JSONDecodeError, KeyError):
-                continue
-        return None
+        # Tenta encontrar pelo nome exato (via manifesto)
+        filename = _filename_for(name)
+        if filename is None:
+            return None
+        filepath = STRATEGIES_DIR / filename
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return _loads(filepath.read_bytes())
 
 
 def list_strategies() -> List[Dict]:
@@ -93,23 +313,8 @@ def list_strategies() -> List[Dict]:
     """
     ensure_dir_exists()
     
-    strategies = []
-    for filepath in STRATEGIES_DIR.glob("*.json"):
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                strategies.append({
-                    "name": config.get("name", filepath.stem),
-                    "filename": filepath.name,
-                    "buy_rules_count": len(config.get("buy_rules", [])),
-                    "sell_rules_count": len(config.get("sell_rules", [])),
-                    "buy_logic": config.get("buy_logic", "AND"),
-                    "sell_logic": config.get("sell_logic", "AND"),
-                })
-        except (json.JSONDecodeError, KeyError):
-            continue
-    
-    return sorted(strategies, key=lambda x: x["name"].lower())
+    strategies, _ = _cached_index()
+    return list(strategies)
 
 
 def delete_strategy(name: str) -> bool:
@@ -125,24 +330,21 @@ def delete_strategy(name: str) -> bool:
     ensure_dir_exists()
     
     filename = sanitize_filename(name) + ".json"
+    
+    if not (STRATEGIES_DIR / filename).exists():
+        # Tenta encontrar pelo nome exato (via manifesto)
+        filename = _filename_for(name)
+        if filename is None:
+            return False
+    
+    index = _load_index()
     filepath = STRATEGIES_DIR / filename
+    filepath.unlink()
+    _meta_path(filepath).unlink(missing_ok=True)
+    index.pop(filename, None)
+    _write_index(index)
     
-    if filepath.exists():
-        filepath.unlink()
-        return True
-    
-    # Tenta encontrar pelo nome exato
-    for f in STRATEGIES_DIR.glob("*.json"):
-        try:
-            with open(f, 'r', encoding='utf-8') as file:
-                config = json.load(file)
-                if config.get("name") == name:
-                    f.unlink()
-                    return True
-        except (json.JSONDecodeError, KeyError):
-            continue
-    
-    return False
+    return True
 
 
 def strategy_exists(name: str) -> bool:
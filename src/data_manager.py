@@ -11,7 +11,14 @@ Suporta Linux, Windows e Mac.
 
 import os
 import time
+import json
+import queue
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import Optional, List, Dict, Any, Callable
 
 import pandas as pd
@@ -24,8 +31,197 @@ try:
 except ImportError:
     HAS_STREAMLIT = False
 
+# Cache em disco opcional para os downloads via CCXT
+try:
+    import diskcache
+    HAS_DISKCACHE = True
+except ImportError:
+    HAS_DISKCACHE = False
+
+# orjson opcional para o parse das mensagens de tick (bem mais rápido que json)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 load_dotenv()
 
+# Credenciais lidas uma vez no import (após o .env), não a cada DataManager()
+_BINANCE_API_KEY = os.getenv("BINANCE_API_KEY")
+_BINANCE_API_SECRET = os.getenv("BINANCE_API_SECRET")
+_CTRADER_ACCOUNT_ID = os.getenv("CTRADER_ACCOUNT_ID")
+
+# Diretório do cache de candles CCXT (relativo ao diretório de execução, como data/)
+CCXT_CACHE_DIR = os.path.join(".cache", "ccxt")
+
+# Tempo (s) que o resultado completo (com o candle atual, ainda aberto) fica no cache
+CCXT_LIVE_TTL = 60
+
+_ccxt_cache = None
+
+
+def _get_ccxt_cache():
+    """Abre (uma vez) o cache em disco do CCXT. None se diskcache não estiver instalado."""
+    global _ccxt_cache
+    if _ccxt_cache is None and HAS_DISKCACHE:
+        _ccxt_cache = diskcache.Cache(CCXT_CACHE_DIR)
+    return _ccxt_cache
+
+
+def _clear_simulated_flag() -> None:
+    """Reseta flag de dados simulados (dados reais obtidos)."""
+    if HAS_STREAMLIT:
+        try:
+            st.session_state.using_simulated_data = False
+        except:
+            pass
+
+
+def _ccxt_cache_key(exchange_id: str, symbol: str, tf: str) -> str:
+    """
+    Chave determinística dos candles fechados: exchange, par e timeframe.
+    
+    Não inclui a janela pedida: o histórico fechado nunca muda, então a
+    mesma entrada cresce a cada download (só os candles novos são baixados).
+    """
+    raw = f"{exchange_id}|{symbol}|{tf}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+# Colunas OHLCV reduzidas para float32 na ingestão (metade da memória)
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Timeframes aceitos (formato app/cTrader) -> formato da API, imutáveis
+_TF_BINANCE = MappingProxyType({
+    "1m": "1m", "5m": "5m", "15m": "15m", "30m": "30m",
+    "1h": "1h", "4h": "4h", "1d": "1d",
+    "M1": "1m", "M5": "5m", "M15": "15m", "M30": "30m",
+    "H1": "1h", "H4": "4h", "D1": "1d"
+})
+_TF_CCXT = MappingProxyType({
+    '1m': '1m', '5m': '5m', '15m': '15m', '30m': '30m',
+    '1h': '1h', '4h': '4h', '1d': '1d', '1w': '1w',
+    'M1': '1m', 'M5': '5m', 'M15': '15m', 'M30': '30m',
+    'H1': '1h', 'H4': '4h', 'D1': '1d',
+})
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas OHLCV para float32.
+    
+    Para no float32 (não desce para float16) para preservar as casas decimais
+    dos preços. O índice de timestamps não é alterado.
+    """
+    cols = [c for c in OHLCV_COLUMNS if c in df.columns]
+    if cols:
+        df[cols] = df[cols].astype(np.float32)
+    return df
+
+
+def _apply_engine(df: pd.DataFrame, engine: str) -> pd.DataFrame:
+    """
+    Converte o DataFrame para o backend pedido.
+    
+    "pyarrow" usa colunas Arrow (float32 nativo, acesso zero-copy às colunas);
+    "numpy" mantém o DataFrame como está.
+    """
+    if engine == "pyarrow":
+        return df.convert_dtypes(dtype_backend="pyarrow")
+    return df
+
+
+class _TickHub:
+    """
+    Loop único de ingestão de ticks.
+    
+    Uma única task (`_reader`) consome as mensagens cruas do socket, faz o
+    parse uma vez e distribui por símbolo para a asyncio.Queue de cada
+    assinante; cada callback roda na sua própria task consumidora.
+    Tudo roda num event loop em thread dedicada (daemon), iniciada sob demanda.
+    """
+    
+    def __init__(self):
+        self._inbox: queue.SimpleQueue = queue.SimpleQueue()
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="tick-ingestion", daemon=True
+                )
+                self._thread.start()
+                asyncio.run_coroutine_threadsafe(self._reader(), self._loop)
+        return self._loop
+    
+    def subscribe(self, symbols: List[str], callback: Callable[[str, float, float], None]) -> None:
+        """Cria a fila do assinante e a task que chama o callback."""
+        loop = self._ensure_started()
+        asyncio.run_coroutine_threadsafe(self._add(symbols, callback), loop).result()
+    
+    def feed(self, message) -> None:
+        """
+        Entrega uma mensagem crua (bytes/str JSON com symbol, bid, ask) ao loop.
+        
+        Chamado pelo dono do socket (qualquer thread); não bloqueia.
+        """
+        self._inbox.put(message)
+    
+    def stop(self) -> None:
+        """Encerra o loop de ingestão (as assinaturas são descartadas)."""
+        if self._loop is None:
+            return
+        self._inbox.put(None)  # Libera o reader bloqueado no inbox
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1)
+        self._loop.close()
+        self._loop = self._thread = None
+        self._subscribers = {}
+        # Inbox nova: o None de parada (ou ticks antigos) não chega ao próximo loop
+        self._inbox = queue.SimpleQueue()
+    
+    async def _shutdown(self) -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _add(self, symbols, callback) -> None:
+        subscriber_queue: asyncio.Queue = asyncio.Queue()
+        for symbol in symbols:
+            self._subscribers.setdefault(symbol, []).append(subscriber_queue)
+        asyncio.get_running_loop().create_task(self._consume(subscriber_queue, callback))
+    
+    async def _reader(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(None, self._inbox.get)
+            if message is None:
+                return
+            try:
+                tick = _json_loads(message)
+                symbol, bid, ask = tick["symbol"], float(tick["bid"]), float(tick["ask"])
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"[DataManager] Tick inválido ignorado: {e}")
+                continue
+            for subscriber_queue in self._subscribers.get(symbol, ()):
+                subscriber_queue.put_nowait((symbol, bid, ask))
+    
+    @staticmethod
+    async def _consume(subscriber_queue: asyncio.Queue, callback) -> None:
+        while True:
+            symbol, bid, ask = await subscriber_queue.get()
+            try:
+                callback(symbol, bid, ask)
+            except Exception as e:
+                print(f"[DataManager] Erro no callback de tick ({symbol}): {e}")
+
 
 class DataManager:
     """
@@ -37,17 +233,57 @@ class DataManager:
     - Binance API: Dados históricos (limitado a 1000 candles)
     """
     
+    __slots__ = (
+        'binance_api_key', 'binance_api_secret', 'ctrader_account_id',
+        '_price_cache', '_tick_hub', '_binance_client',
+    )
+    
     def __init__(self):
         # Binance (para dados históricos)
-        self.binance_api_key = os.getenv("BINANCE_API_KEY")
-        self.binance_api_secret = os.getenv("BINANCE_API_SECRET")
+        self.binance_api_key = _BINANCE_API_KEY
+        self.binance_api_secret = _BINANCE_API_SECRET
         
         # cTrader (para dados em tempo real)
-        self.ctrader_account_id = os.getenv("CTRADER_ACCOUNT_ID")
+        self.ctrader_account_id = _CTRADER_ACCOUNT_ID
         
         # Cache de dados
         self._price_cache: Dict[str, pd.DataFrame] = {}
-        self._tick_callbacks: List[Callable] = []
+        self._tick_hub = _TickHub()
+        
+        # Cliente Binance criado sob demanda e reutilizado (mantém a conexão HTTP)
+        self._binance_client = None
+    
+    def _get_binance_client(self):
+        """
+        Cliente Spot da Binance, criado uma vez por DataManager.
+        
+        A sessão HTTP do cliente ganha um pool keep-alive e retry com backoff,
+        então chamadas repetidas reaproveitam a conexão TCP/TLS.
+        Levanta ImportError se binance-connector não estiver instalado.
+        """
+        if self._binance_client is None:
+            from binance.spot import Spot
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            client = Spot(
+                api_key=self.binance_api_key,
+                api_secret=self.binance_api_secret
+            )
+            
+            session = getattr(client, "session", None)
+            if session is not None:
+                retry = Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET"]),
+                )
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+                session.mount("https://", adapter)
+            
+            self._binance_client = client
+        return self._binance_client
         
     def get_historical_data(
         self,
@@ -55,7 +291,8 @@ class DataManager:
         timeframe: str = "1h",
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        limit: int = 1000
+        limit: int = 1000,
+        engine: str = "numpy"
     ) -> pd.DataFrame:
         """
         Obtém dados históricos OHLCV da Binance.
@@ -66,26 +303,19 @@ class DataManager:
             start_date: Data inicial (formato: YYYY-MM-DD)
             end_date: Data final (formato: YYYY-MM-DD)
             limit: Número máximo de velas
+            engine: "numpy" (padrão) ou "pyarrow" para colunas Arrow (menos memória)
             
         Returns:
             DataFrame com colunas: open, high, low, close, volume
         """
+        if engine not in ("numpy", "pyarrow"):
+            raise ValueError(f"engine inválido: {engine!r} (use 'numpy' ou 'pyarrow')")
+        
         try:
-            from binance.spot import Spot
-            
-            client = Spot(
-                api_key=self.binance_api_key,
-                api_secret=self.binance_api_secret
-            )
+            client = self._get_binance_client()
             
             # Converte timeframe para formato Binance
-            tf_map = {
-                "1m": "1m", "5m": "5m", "15m": "15m", "30m": "30m",
-                "1h": "1h", "4h": "4h", "1d": "1d",
-                "M1": "1m", "M5": "5m", "M15": "15m", "M30": "30m",
-                "H1": "1h", "H4": "4h", "D1": "1d"
-            }
-            interval = tf_map.get(timeframe, "1h")
+            interval = _TF_BINANCE.get(timeframe, "1h")
             
             # Limit logic for Binance (Max 1000 per request)
             BINANCE_LIMIT = 1000
@@ -144,21 +374,21 @@ class DataManager:
             # Limpa e formata
             df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
             df = df.set_index("timestamp")
-            df = df[["open", "high", "low", "close", "volume"]].astype(float)
+            df = _optimize_dtypes(df[OHLCV_COLUMNS].astype(float))
             
             # Remove duplicates just in case
             df = df[~df.index.duplicated(keep='first')]
             df = df.sort_index()
             
             print(f"[DataManager] Obtidos {len(df)} candles de {symbol} ({timeframe}) - Limit pedido: {limit}")
-            return df
+            return _apply_engine(df, engine)
             
         except ImportError:
             print("[DataManager] binance-connector não instalado")
-            return self._generate_simulated_data(symbol, limit)
+            return _apply_engine(self._generate_simulated_data(symbol, limit), engine)
         except Exception as e:
             print(f"[DataManager] Erro ao obter dados: {e}")
-            return self._generate_simulated_data(symbol, limit)
+            return _apply_engine(self._generate_simulated_data(symbol, limit), engine)
     
     def get_ccxt_historical_data(
         self,
@@ -181,13 +411,7 @@ class DataManager:
             return self._generate_simulated_data(symbol.replace("/", ""), days * 24)
         
         # Converte timeframe
-        tf_mapping = {
-            '1m': '1m', '5m': '5m', '15m': '15m', '30m': '30m',
-            '1h': '1h', '4h': '4h', '1d': '1d', '1w': '1w',
-            'M1': '1m', 'M5': '5m', 'M15': '15m', 'M30': '30m',
-            'H1': '1h', 'H4': '4h', 'D1': '1d',
-        }
-        tf = tf_mapping.get(timeframe, '1h')
+        tf = _TF_CCXT.get(timeframe, '1h')
         
         last_error = None
         
@@ -205,63 +429,115 @@ class DataManager:
                     'timeout': 30000,  # 30 segundos timeout
                 })
                 
-                # Calcula timestamps
+                # Calcula timestamps (alinhados ao início do candle)
                 now = datetime.now()
+                now_ms = int(now.timestamp() * 1000)
+                tf_ms = exchange.parse_timeframe(tf) * 1000
                 since = int((now - timedelta(days=days)).timestamp() * 1000)
+                since -= since % tf_ms
+                end_bucket = now_ms - now_ms % tf_ms  # Início do candle atual (aberto)
                 
-                # Paginação automática
-                all_ohlcv = []
+                # Cache em disco: candles fechados nunca mudam (sem expiração);
+                # só os posteriores ao último candle em cache são baixados
+                cache = _get_ccxt_cache()
+                cache_key = _ccxt_cache_key(ex_id, symbol, tf)
+                live_key = f"{cache_key}:live:{since}:{end_bucket}"
+                closed_df = None
+                fetch_since = since
+                if cache is not None:
+                    live_df = cache.get(live_key)
+                    if live_df is not None:
+                        print(f"[CCXT] ✅ {len(live_df)} candles de {ex_id} (cache)")
+                        _clear_simulated_flag()
+                        return live_df
+                    closed_df = cache.get(cache_key)
+                    if closed_df is not None and len(closed_df) and closed_df.index[0].value // 10**6 <= since:
+                        fetch_since = closed_df.index[-1].value // 10**6 + tf_ms
+                    else:
+                        # Cache vazio ou mais curto que a janela pedida: baixa tudo de novo
+                        closed_df = None
+                
+                # Paginação automática em buffer NumPy pré-alocado
+                # (evita a lista de listas com floats Python boxeados)
+                buf = np.empty((max(now_ms - fetch_since, 0) // tf_ms + 2, 6), dtype=np.float64)
+                cursor = 0
                 limit_per_request = 1000
                 
                 print(f"[CCXT] Baixando {symbol} ({tf}) - últimos {days} dias de {ex_id}...")
                 
-                while True:
-                    ohlcv = exchange.fetch_ohlcv(
+                def fetch_page(page_since, wait=0.0):
+                    # Rate limit aplicado na thread de download, fora do caminho crítico
+                    if wait:
+                        time.sleep(wait)
+                    return exchange.fetch_ohlcv(
                         symbol=symbol,
                         timeframe=tf,
-                        since=since,
+                        since=page_since,
                         limit=limit_per_request
                     )
+                
+                # Pipeline: a próxima página é baixada enquanto a atual é copiada para o buffer
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    future = pool.submit(fetch_page, fetch_since)
                     
-                    if not ohlcv:
-                        break
-                    
-                    all_ohlcv.extend(ohlcv)
-                    
-                    # Próxima página
-                    last_timestamp = ohlcv[-1][0]
-                    since = last_timestamp + 1
-                    
-                    # Para se chegou ao presente
-                    if last_timestamp >= int(now.timestamp() * 1000):
-                        break
-                    
-                    # Rate limit
-                    time.sleep(exchange.rateLimit / 1000)
+                    while True:
+                        ohlcv = future.result()
+                        
+                        if not ohlcv:
+                            break
+                        
+                        # Próxima página (para se chegou ao presente)
+                        last_timestamp = ohlcv[-1][0]
+                        reached_now = last_timestamp >= now_ms
+                        if not reached_now:
+                            future = pool.submit(fetch_page, last_timestamp + 1, exchange.rateLimit / 1000)
+                        
+                        chunk = np.asarray(ohlcv, dtype=np.float64)
+                        if cursor + len(chunk) > len(buf):
+                            # Exchange devolveu mais candles que o estimado: dobra o buffer
+                            grow = max(len(buf), len(chunk))
+                            buf = np.concatenate([buf, np.empty((grow, 6), dtype=np.float64)])
+                        buf[cursor:cursor + len(chunk)] = chunk
+                        cursor += len(chunk)
+                        
+                        if reached_now:
+                            break
                 
-                if not all_ohlcv:
+                if cursor == 0 and closed_df is None:
                     print(f"[CCXT] Nenhum dado retornado de {ex_id}")
                     continue
                 
-                # Converte para DataFrame
-                df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                df = df.set_index('timestamp')
-                df = df.astype(float)
+                # Remove duplicatas/ordena no buffer (paginação já vem ordenada: só se necessário)
+                data = buf[:cursor]
+                ts = data[:, 0]
+                if cursor > 1 and (np.diff(ts) <= 0).any():
+                    order = np.argsort(ts, kind='stable')
+                    ts_sorted = ts[order]
+                    # Mantém a última ocorrência de cada timestamp (dado mais recente)
+                    last = np.append(ts_sorted[1:] != ts_sorted[:-1], True)
+                    data = data[order[last]]
                 
-                # Remove duplicatas
-                df = df[~df.index.duplicated(keep='last')]
-                df = df.sort_index()
+                # Converte para DataFrame (uma coluna por vez a partir do buffer)
+                df = pd.DataFrame(
+                    {col: data[:, i + 1] for i, col in enumerate(OHLCV_COLUMNS)},
+                    index=pd.to_datetime(data[:, 0].astype(np.int64), unit='ms').rename('timestamp')
+                )
+                df = _optimize_dtypes(df)
+                if closed_df is not None:
+                    # A busca começou depois do último candle em cache:
+                    # a concatenação já sai ordenada e sem sobreposição
+                    df = pd.concat([closed_df, df])
                 
-                print(f"[CCXT] ✅ Obtidos {len(df)} candles de {ex_id} ({df.index[0].date()} a {df.index[-1].date()})")
+                if cache is not None:
+                    # Histórico fechado inteiro, sem expiração; o resultado da janela por CCXT_LIVE_TTL
+                    cache.set(cache_key, df[df.index < pd.to_datetime(end_bucket, unit='ms')])
+                df = df[df.index >= pd.to_datetime(since, unit='ms')]
+                if cache is not None:
+                    cache.set(live_key, df, expire=CCXT_LIVE_TTL)
                 
-                # Reseta flag de dados simulados
-                if HAS_STREAMLIT:
-                    try:
-                        st.session_state.using_simulated_data = False
-                    except:
-                        pass
+                print(f"[CCXT] ✅ Obtidos {len(df)} candles de {ex_id} ({df.index[0].date()} a {df.index[-1].date()})")
                 
+                _clear_simulated_flag()
                 return df
                 
             except Exception as e:
@@ -309,17 +585,22 @@ class DataManager:
         # Random walk para preço
         np.random.seed(42)
         returns = np.random.normal(0.0001, 0.02, bars)
-        price = base_price * np.cumprod(1 + returns)
+        close = base_price * np.cumprod(1 + returns)
         
-        # Gera OHLCV
-        df = pd.DataFrame(index=dates)
-        df["close"] = price
-        df["open"] = df["close"].shift(1).fillna(base_price)
-        df["high"] = df[["open", "close"]].max(axis=1) * (1 + np.random.uniform(0, 0.01, bars))
-        df["low"] = df[["open", "close"]].min(axis=1) * (1 - np.random.uniform(0, 0.01, bars))
-        df["volume"] = np.random.uniform(100, 10000, bars)
+        # Open = close anterior (primeira barra abre no preço base)
+        open_ = np.empty_like(close)
+        open_[0] = base_price
+        open_[1:] = close[:-1]
         
-        return df
+        # Gera OHLCV em NumPy; uma linha por coluna (contígua) já em float32
+        data = np.empty((len(OHLCV_COLUMNS), bars), dtype=np.float32)
+        data[0] = open_
+        data[1] = np.maximum(open_, close) * (1 + np.random.uniform(0, 0.01, bars))
+        data[2] = np.minimum(open_, close) * (1 - np.random.uniform(0, 0.01, bars))
+        data[3] = close
+        data[4] = np.random.uniform(100, 10000, bars)
+        
+        return pd.DataFrame(dict(zip(OHLCV_COLUMNS, data)), index=dates)
     
     def get_ctrader_data(
         self,
@@ -377,34 +658,76 @@ class DataManager:
         """
         Inscreve para receber ticks em tempo real via cTrader.
         
+        O socket tem um único dono (o loop de ingestão); cada assinante
+        recebe só os símbolos pedidos, na sua própria fila.
+        
         Args:
             symbols: Lista de símbolos para monitorar
             callback: Função chamada com (symbol, bid, ask)
         """
-        self._tick_callbacks.append(callback)
+        self._tick_hub.subscribe(symbols, callback)
         
         try:
             from ctrader_open_api.messages.OpenApiMessages_pb2 import ProtoOASubscribeSpotsReq
             
-            # Em produção, enviar request de subscription
+            # Em produção, enviar request de subscription; o reader do socket
+            # entrega cada mensagem via feed_tick()
             print(f"[DataManager] Subscribed to ticks: {symbols}")
             
         except ImportError:
             print("[DataManager] Tick subscription não disponível (modo simulação)")
     
+    def feed_tick(self, message) -> None:
+        """Entrega uma mensagem de tick crua (JSON com symbol, bid, ask) ao loop de ingestão."""
+        self._tick_hub.feed(message)
+    
     def save_to_parquet(self, df: pd.DataFrame, filename: str) -> None:
-        """Salva DataFrame em formato Parquet para eficiência."""
+        """Salva DataFrame em formato Parquet (ZSTD + dicionário) para eficiência."""
         os.makedirs("data", exist_ok=True)
         filepath = os.path.join("data", filename)
-        df.to_parquet(filepath)
+        df.to_parquet(
+            filepath,
+            engine="pyarrow",
+            compression="zstd",
+            compression_level=3,
+            use_dictionary=True,
+            row_group_size=65536,
+        )
         print(f"[DataManager] Dados salvos em: {filepath}")
     
-    def load_from_parquet(self, filename: str) -> pd.DataFrame:
-        """Carrega DataFrame de arquivo Parquet."""
+    def load_from_parquet(
+        self,
+        filename: str,
+        columns: Optional[List[str]] = None,
+        engine: str = "numpy"
+    ) -> pd.DataFrame:
+        """
+        Carrega DataFrame de arquivo Parquet (memory-mapped).
+        
+        Args:
+            filename: Nome do arquivo dentro de data/
+            columns: Carrega só essas colunas (None = todas), ex: ['close', 'bb_lower', 'bb_upper']
+            engine: "numpy" (padrão) ou "pyarrow": colunas ficam nos buffers Arrow
+                lidos do arquivo, sem a cópia Arrow -> NumPy
+        """
+        if engine not in ("numpy", "pyarrow"):
+            raise ValueError(f"engine inválido: {engine!r} (use 'numpy' ou 'pyarrow')")
+        
         filepath = os.path.join("data", filename)
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
-        return pd.read_parquet(filepath)
+        
+        if engine == "pyarrow":
+            import pyarrow.parquet as pq
+            # read_pandas inclui a coluna do índice (metadados do pandas)
+            table = pq.read_pandas(filepath, columns=columns, memory_map=True)
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+            # Índice de tempo volta a ser DatetimeIndex (resto do app depende disso)
+            if pd.api.types.is_datetime64_any_dtype(df.index.dtype):
+                df.index = pd.DatetimeIndex(df.index)
+            return df
+        
+        return pd.read_parquet(filepath, engine="pyarrow", columns=columns, memory_map=True)
     
     def download_and_save(
         self,
@@ -1,8 +1,11 @@
 """
 Strategies Registry - Auto-descoberta e registro de estratégias.
 
-Este módulo escaneia automaticamente todos os arquivos de estratégia
-e expõe um dicionário STRATEGIES com todas as estratégias disponíveis.
+Este módulo escaneia todos os arquivos de estratégia e expõe um mapeamento
+STRATEGIES (slug -> classe) com todas as estratégias disponíveis.
+
+A descoberta é preguiçosa: os arquivos são lidos apenas via AST (sem import),
+e cada módulo só é importado quando sua classe é acessada pela primeira vez.
 
 Uso:
     from src.strategies import STRATEGIES, get_strategy
@@ -16,54 +19,142 @@ Uso:
     trades = strategy.apply(df, rsi_buy=25, rsi_sell=75)
 """
 
+import ast
 import importlib
 import pkgutil
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, Type, Optional
+from typing import Dict, Iterator, Tuple, Type, Optional, TYPE_CHECKING
 
-from .base import BaseStrategy
+if TYPE_CHECKING:
+    from .base import BaseStrategy, Trade, TradeBatch, apply_strategies
 
 
-# Dicionário global de estratégias registradas
-STRATEGIES: Dict[str, Type[BaseStrategy]] = {}
+# Slug default de BaseStrategy (classe sem `slug = ...` próprio)
+_DEFAULT_SLUG = "unnamed"
 
 
-def _discover_strategies():
+def _scan_module(path: Path) -> Dict[str, str]:
     """
-    Descobre automaticamente todas as estratégias no diretório.
+    Lê o AST de um arquivo e devolve {slug: nome da classe}.
     
-    Escaneia todos os arquivos .py (exceto __init__.py e base.py),
-    importa os módulos e registra classes que herdam de BaseStrategy.
+    Considera classes que herdam diretamente de BaseStrategy; o slug vem da
+    atribuição `slug = "..."` no corpo da classe.
+    """
+    tree = ast.parse(path.read_bytes(), filename=str(path))
+    found = {}
+    
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        
+        base_names = {
+            base.id if isinstance(base, ast.Name) else getattr(base, 'attr', None)
+            for base in node.bases
+        }
+        if 'BaseStrategy' not in base_names:
+            continue
+        
+        slug = _DEFAULT_SLUG
+        for stmt in node.body:
+            if isinstance(stmt, ast.Assign):
+                targets, value = stmt.targets, stmt.value
+            elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+                targets, value = [stmt.target], stmt.value
+            else:
+                continue
+            if (any(isinstance(t, ast.Name) and t.id == 'slug' for t in targets)
+                    and isinstance(value, ast.Constant) and isinstance(value.value, str)):
+                slug = value.value
+        
+        found[slug] = node.name
+    
+    return found
+
+
+def _discover_strategies() -> Dict[str, Tuple[str, str]]:
+    """
+    Descobre todas as estratégias no diretório sem importá-las.
+    
+    Escaneia todos os arquivos .py (exceto __init__.py e base.py) e devolve
+    {slug: (nome do módulo, nome da classe)}.
     """
     package_dir = Path(__file__).parent
+    index = {}
     
     for module_info in pkgutil.iter_modules([str(package_dir)]):
         # Pula arquivos especiais
-        if module_info.name in ('base', '__init__'):
+        if module_info.name in ('base', '__init__') or module_info.name.startswith('_'):
             continue
         
         try:
-            # Importa o módulo
-            module = importlib.import_module(f'.{module_info.name}', package=__name__)
-            
-            # Procura classes que herdam de BaseStrategy
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                
-                # Verifica se é uma classe que herda de BaseStrategy
-                if (isinstance(attr, type) and 
-                    issubclass(attr, BaseStrategy) and 
-                    attr is not BaseStrategy):
-                    
-                    # Registra a estratégia pelo slug
-                    STRATEGIES[attr.slug] = attr
-                    
-        except Exception as e:
+            for slug, class_name in _scan_module(package_dir / f"{module_info.name}.py").items():
+                index[slug] = (module_info.name, class_name)
+        except (OSError, SyntaxError) as e:
             # Log de erro mas não quebra o sistema
             print(f"⚠️ Erro ao carregar estratégia '{module_info.name}': {e}")
+    
+    return index
+
+
+class _LazyRegistry(Mapping):
+    """
+    Mapeamento slug -> classe que importa o módulo da estratégia sob demanda.
+    
+    As chaves vêm do scan via AST; a classe é importada no primeiro acesso
+    e memoizada.
+    """
+    
+    def __init__(self, index: Dict[str, Tuple[str, str]]):
+        self._index = index
+        self._classes: Dict[str, Type["BaseStrategy"]] = {}
+    
+    def __getitem__(self, slug: str) -> Type["BaseStrategy"]:
+        cls = self._classes.get(slug)
+        if cls is not None:
+            return cls
+        
+        module_name, class_name = self._index[slug]
+        try:
+            module = importlib.import_module(f'.{module_name}', package=__name__)
+            cls = getattr(module, class_name)
+        except Exception as e:
+            # Log de erro e remove do registro (mesmo efeito do scan antigo)
+            print(f"⚠️ Erro ao carregar estratégia '{module_name}': {e}")
+            del self._index[slug]
+            raise KeyError(slug) from e
+        
+        self._classes[slug] = cls
+        return cls
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._index))
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __contains__(self, slug) -> bool:
+        return slug in self._index
+    
+    def items(self):
+        """Pares (slug, classe), ignorando estratégias que falharem ao importar."""
+        for slug in list(self._index):
+            try:
+                yield slug, self[slug]
+            except KeyError:
+                continue
+    
+    def values(self):
+        """Classes registradas, ignorando estratégias que falharem ao importar."""
+        for _, cls in self.items():
+            yield cls
+
+
+# Mapeamento global de estratégias registradas (slug -> classe, import sob demanda)
+STRATEGIES: Mapping = _LazyRegistry(_discover_strategies())
 
 
-def get_strategy(slug: str) -> Optional[BaseStrategy]:
+def get_strategy(slug: str) -> Optional["BaseStrategy"]:
     """
     Retorna uma instância da estratégia pelo slug.
     
@@ -101,7 +192,7 @@ def list_strategies() -> Dict[str, dict]:
     }
 
 
-def get_strategies_by_category(category: str) -> Dict[str, Type[BaseStrategy]]:
+def get_strategies_by_category(category: str) -> Dict[str, Type["BaseStrategy"]]:
     """
     Filtra estratégias por categoria.
     
@@ -118,13 +209,20 @@ def get_strategies_by_category(category: str) -> Dict[str, Type[BaseStrategy]]:
     }
 
 
-# Auto-descoberta ao importar o módulo
-_discover_strategies()
+def __getattr__(name):
+    # Classes de base.py (e pandas, por tabela) só são importadas quando pedidas
+    if name in ('BaseStrategy', 'Trade', 'TradeBatch', 'apply_strategies'):
+        from . import base
+        return getattr(base, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Expõe a classe base para quem quiser criar novas estratégias
 __all__ = [
     'BaseStrategy',
+    'Trade',
+    'TradeBatch',
+    'apply_strategies',
     'STRATEGIES',
     'get_strategy',
     'list_strategies',
@@ -0,0 +1,308 @@
+"""
+Kernels numéricos compartilhados pelas estratégias.
+
+Loops sequenciais que não dá para vetorizar (dependem do estado anterior),
+compilados com numba quando disponível. A assinatura explícita faz a
+compilação no import e `cache=True` grava o código nativo em disco, então
+só o primeiro import da máquina paga o custo de compilação.
+
+Os kernels rodam com `nogil=True`: várias moedas avaliadas em threads
+(ver CustomStrategy.apply_many) executam os loops nativos em paralelo.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.core._njit import njit, HAS_NUMBA
+
+
+@njit('Tuple((i8[:], i8[:]))(b1[:], b1[:])', cache=True, nogil=True, boundscheck=False)
+def resolve_positions(buy_mask, sell_mask):
+    """
+    Resolve a alternância BUY/SELL (uma posição por vez) a partir dos sinais.
+
+    Compra só fora de posição, vende só em posição. O estado alterna sem
+    desvio: `toggle = (buy & ~state) | (sell & state)`; `state ^= toggle`.
+
+    Returns:
+        (buy_idx, sell_idx): índices dos candles de compra e de venda.
+        Os trades se intercalam começando por compra
+        (len(buy_idx) == len(sell_idx) ou len(sell_idx) + 1).
+    """
+    n = buy_mask.shape[0]
+    buy_idx = np.empty(n, dtype=np.int64)
+    sell_idx = np.empty(n, dtype=np.int64)
+    n_buy = 0
+    n_sell = 0
+    state = 0
+
+    for i in range(n):
+        toggle = (int(buy_mask[i]) & (state ^ 1)) | (int(sell_mask[i]) & state)
+        # Escreve sempre; o contador só avança quando há troca de estado
+        buy_idx[n_buy] = i
+        sell_idx[n_sell] = i
+        n_buy += toggle & (state ^ 1)
+        n_sell += toggle & state
+        state ^= toggle
+
+    return buy_idx[:n_buy], sell_idx[:n_sell]
+
+
+@njit('Tuple((i8[:], i8[:]))(i8[:], b1[:])', cache=True, nogil=True, boundscheck=False)
+def resolve_events(events, event_is_buy):
+    """
+    resolve_positions só sobre os candles com sinal (`np.flatnonzero` da
+    máscara de eventos): percorre K eventos em vez dos N candles.
+
+    `event_is_buy[k]` diz se o evento k é sinal de compra (senão, de venda).
+
+    Returns:
+        (buy_idx, sell_idx): como em resolve_positions
+    """
+    k = events.shape[0]
+    buy_idx = np.empty(k, dtype=np.int64)
+    sell_idx = np.empty(k, dtype=np.int64)
+    n_buy = 0
+    n_sell = 0
+    state = 0
+
+    for j in range(k):
+        buy = int(event_is_buy[j])
+        # Sinal de compra fora de posição ou de venda em posição troca o estado
+        toggle = buy ^ state
+        buy_idx[n_buy] = events[j]
+        sell_idx[n_sell] = events[j]
+        n_buy += toggle & (state ^ 1)
+        n_sell += toggle & state
+        state ^= toggle
+
+    return buy_idx[:n_buy], sell_idx[:n_sell]
+
+
+def interleave_positions(buy_idx: np.ndarray, sell_idx: np.ndarray):
+    """
+    Intercala os índices de resolve_positions em ordem cronológica.
+
+    Returns:
+        (idx, is_buy): índice do candle de cada trade e se é compra
+    """
+    n = len(buy_idx) + len(sell_idx)
+    idx = np.empty(n, dtype=np.int64)
+    idx[0::2] = buy_idx
+    idx[1::2] = sell_idx
+    is_buy = np.zeros(n, dtype=np.bool_)
+    is_buy[0::2] = True
+    return idx, is_buy
+
+
+@njit('b1[:](f8[:], f8[:])', cache=True, nogil=True, boundscheck=False)
+def crosses_above(a, b):
+    """
+    True nos candles em que `a > b` passa a valer (era falso no candle anterior).
+
+    Comparações com NaN são falsas; o primeiro candle nunca é cruzamento.
+    Para "cruza para baixo" use crosses_above(b, a).
+    """
+    n = a.shape[0]
+    out = np.empty(n, dtype=np.bool_)
+    if n == 0:
+        return out
+    out[0] = False
+    prev = a[0] > b[0]
+    for i in range(1, n):
+        cur = a[i] > b[i]
+        out[i] = cur and not prev
+        prev = cur
+    return out
+
+
+def sign_crosses(diff: np.ndarray):
+    """
+    Cruzamentos de duas séries a partir de `diff = a - b` (sem laço nem desvio).
+    
+    Cruza para cima: diff <= 0 no candle anterior e > 0 no atual; para baixo:
+    >= 0 e depois < 0. NaN compara como False, então não gera cruzamento.
+    
+    Returns:
+        (up, down): máscaras dos candles 1..n-1 (índice 0 = segundo candle)
+    """
+    prev, curr = diff[:-1], diff[1:]
+    return (prev <= 0) & (curr > 0), (prev >= 0) & (curr < 0)
+
+
+@njit('f8[:](f8[:], i8, b1)', cache=True, nogil=True, boundscheck=False)
+def _rolling_extreme(a, window, take_max):
+    """
+    Máxima (ou mínima) móvel com fila monotônica de índices: O(N) total.
+
+    Mesmo resultado de `rolling(window).max()/min()` do pandas: NaN até a
+    janela encher e em toda janela que contém NaN.
+    """
+    n = a.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    last_nan = -window - 1
+
+    for i in range(n):
+        x = a[i]
+        if np.isnan(x):
+            last_nan = i
+        else:
+            # Remove do fim os candidatos dominados pelo valor novo
+            if take_max:
+                while tail > head and a[dq[tail - 1]] <= x:
+                    tail -= 1
+            else:
+                while tail > head and a[dq[tail - 1]] >= x:
+                    tail -= 1
+            dq[tail] = i
+            tail += 1
+        # Remove do início o que saiu da janela
+        while tail > head and dq[head] <= i - window:
+            head += 1
+
+        if i < window - 1 or last_nan > i - window:
+            out[i] = np.nan
+        else:
+            out[i] = a[dq[head]]
+    return out
+
+
+def _rolling(values, window: int, take_max: bool) -> np.ndarray:
+    if isinstance(values, pd.Series):
+        # Backends nullable/pyarrow: nulls viram NaN
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if not HAS_NUMBA:
+        # Sem numba o loop em Python seria mais lento que o rolling do pandas
+        rolling = pd.Series(values, dtype=np.float64).rolling(window=window)
+        return (rolling.max() if take_max else rolling.min()).to_numpy()
+    # Cópia float64 gravável (colunas do pandas podem ser read-only)
+    return _rolling_extreme(np.array(values, dtype=np.float64), window, take_max)
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    """Máxima dos últimos `window` valores (equivale a rolling(window).max())."""
+    return _rolling(values, window, True)
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    """Mínima dos últimos `window` valores (equivale a rolling(window).min())."""
+    return _rolling(values, window, False)
+
+
+@njit('f8[:](f8[:], i8)', cache=True, nogil=True, boundscheck=False)
+def _rolling_mean_kernel(a, window):
+    """
+    Média móvel por soma corrente (soma o que entra, subtrai o que sai): O(N).
+    
+    Mesma aritmética do `rolling(window).mean()` do pandas (somas com
+    compensação de Kahan, sinal e sequência de valores iguais), resultado
+    idêntico bit a bit: NaN até a janela encher e em toda janela com NaN.
+    """
+    n = a.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same_ct = 0
+    prev_value = a[0] if n else 0.0
+
+    for i in range(n):
+        # Sai o valor de i - window (NaN não entrou na soma)
+        if i >= window:
+            val = a[i - window]
+            if val == val:
+                nobs -= 1
+                y = -val - comp_remove
+                t = sum_x + y
+                comp_remove = t - sum_x - y
+                sum_x = t
+                if math.copysign(1.0, val) < 0:
+                    neg_ct -= 1
+        # Entra o valor de i
+        val = a[i]
+        if val == val:
+            nobs += 1
+            y = val - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if math.copysign(1.0, val) < 0:
+                neg_ct += 1
+            # Sequência de valores iguais: devolve o próprio valor (sem resíduo de ponto flutuante)
+            if val == prev_value:
+                same_ct += 1
+            else:
+                same_ct = 1
+            prev_value = val
+
+        if nobs >= window and nobs > 0:
+            result = sum_x / nobs
+            if same_ct >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+    return out
+
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """Média dos últimos `window` valores (equivale a rolling(window).mean()); array novo."""
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if not HAS_NUMBA:
+        return pd.Series(values, dtype=np.float64).rolling(window=window).mean().to_numpy(copy=True)
+    return _rolling_mean_kernel(np.require(values, np.float64, ('C', 'W')), window)
+
+
+@njit('f8[:](f8[:], f8)', cache=True, nogil=True, boundscheck=False)
+def _ema_kernel(values, alpha):
+    """
+    Recorrência da EMA com a mesma aritmética do `ewm(adjust=False).mean()`
+    do pandas (resultado idêntico bit a bit).
+
+    NaN antes do primeiro valor dá NaN; NaN no meio repete a última média e
+    desconta o peso dela (ignore_na=False), como no pandas.
+    """
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    old_wt_factor = 1.0 - alpha
+    old_wt = 1.0
+    weighted = values[0]
+    out[0] = weighted
+
+    for i in range(1, n):
+        cur = values[i]
+        is_observation = cur == cur
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                # Série constante: evita erro numérico
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+
+def ema(values, span: int) -> np.ndarray:
+    """EMA de `span` períodos (equivale a ewm(span=span, adjust=False).mean())."""
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if not HAS_NUMBA:
+        return pd.Series(values, dtype=np.float64).ewm(span=span, adjust=False).mean().to_numpy()
+    return _ema_kernel(np.array(values, dtype=np.float64), 2.0 / (span + 1.0))
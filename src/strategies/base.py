@@ -4,10 +4,195 @@ BaseStrategy - Classe abstrata para estratégias de trading.
 Todas as estratégias devem herdar desta classe e implementar o método apply().
 """
 
+import importlib.util
+import warnings
+import weakref
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Any, Mapping, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+from ._kernels import ema
+
+
+def _box_timestamps(index: pd.Index) -> list:
+    """
+    Converte um índice de timestamps para objetos Python (para os dicts de trade).
+    
+    Índice datetime sem timezone converte o array datetime64 cru em lote
+    (datetime.datetime via .tolist(), sem criar um pd.Timestamp por item).
+    Índices com timezone ou não-datetime usam o caminho do pandas.
+    """
+    if isinstance(index, pd.DatetimeIndex) and index.tz is None:
+        return index.values.astype('datetime64[us]').tolist()
+    return list(index)
+
+
+def _column_array(df: pd.DataFrame, col: str, shared: Optional[Dict[Any, np.ndarray]] = None) -> np.ndarray:
+    """
+    Coluna como array float64 (nulls viram NaN).
+    
+    Com `shared`, cada coluna é extraída uma vez e reaproveitada pelas
+    estratégias que rodam sobre o mesmo df (ver apply_strategies).
+    """
+    return _shared_array(shared, col, lambda: df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def _ema_array(df: pd.DataFrame, period: int, shared: Optional[Dict[Any, np.ndarray]] = None) -> np.ndarray:
+    """
+    EMA de `period`: coluna ema<period> do df ou calculada do close como
+    array local (o df não é copiado nem recebe coluna nova).
+    """
+    col = f'ema{period}'
+    if col in df.columns:
+        return _column_array(df, col, shared)
+    close = _column_array(df, 'close', shared)
+    return _shared_array(shared, ('ema', period), lambda: ema(close, period))
+
+
+def _shared_array(shared: Optional[Dict[Any, np.ndarray]], key, compute) -> np.ndarray:
+    """`compute()` memoizado em `shared[key]` (sem cache se `shared` for None)."""
+    if shared is None:
+        return compute()
+    values = shared.get(key)
+    if values is None:
+        values = shared[key] = compute()
+    return values
+
+
+# Cache por DataFrame: {id(df): (weakref(df), {chave: valor})}. A entrada sai
+# junto com o df (callback do weakref), então o cache não segura frames vivos.
+# Usado pelas janelas do Donchian e pelos eventos de _scan() (ver _events_key).
+# (Assume df imutável após carregado, como no resto do app.)
+_FRAME_CACHE: Dict[int, Tuple[weakref.ref, Dict[Any, Any]]] = {}
+
+
+def _evict_frame(ref: weakref.ref, key: int) -> None:
+    """Remove a entrada do df coletado (se ainda for a dele)."""
+    entry = _FRAME_CACHE.get(key)
+    if entry is not None and entry[0] is ref:
+        del _FRAME_CACHE[key]
+
+
+def _frame_cache(df: pd.DataFrame) -> Dict[Any, Any]:
+    """Dicionário de memoização ligado ao df (valores não podem referenciar o df)."""
+    key = id(df)
+    entry = _FRAME_CACHE.get(key)
+    if entry is None or entry[0]() is not df:
+        entry = _FRAME_CACHE[key] = (weakref.ref(df, lambda ref: _evict_frame(ref, key)), {})
+    return entry[1]
+
+
+@dataclass(slots=True)
+class Trade:
+    """Um trade gerado por uma estratégia (sem o __dict__ de um dict por trade)."""
+    action: str
+    price: float
+    amount: float
+    coin: str
+    timestamp: datetime
+    reason: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato dict usado pelo resto do app (portfolio, UI, JSON)."""
+        return {
+            "action": self.action,
+            "price": self.price,
+            "amount": self.amount,
+            "coin": self.coin,
+            "timestamp": self.timestamp,
+            "reason": self.reason,
+        }
+
+
+@dataclass(slots=True)
+class TradeBatch:
+    """
+    Trades em colunas (SoA): um array por campo em vez de um objeto por trade.
+    
+    Use `to_records()` para o formato List[Dict] dos consumidores existentes.
+    `reason` pode ser uma função sem argumentos que devolve os textos: eles
+    só são formatados quando lidos (reasons(), to_records(), iteração), então
+    quem usa só preços/timestamps (ex: varreduras) não paga as f-strings.
+    """
+    action: np.ndarray          # "BUY" / "SELL"
+    price: np.ndarray           # float64
+    amount: np.ndarray          # float64
+    timestamp: pd.Index         # índice do DataFrame nas barras dos trades
+    reason: Any                 # array de str, ou função que o devolve
+    coin: str = "Fixed"
+    
+    @classmethod
+    def from_events(cls, df: pd.DataFrame, idx: np.ndarray, is_buy: np.ndarray,
+                    reason, coin: str = "Fixed", close: Optional[np.ndarray] = None) -> "TradeBatch":
+        """
+        Batch dos trades nos candles `idx` (preço = close do candle).
+        
+        `reason` é um texto por trade (lista ou array) ou uma função que
+        devolve esses textos (formatados só quando lidos). `close` evita
+        extrair de novo a coluna quando o array já existe.
+        """
+        if close is None:
+            close = df['close'].to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(
+            action=np.where(is_buy, "BUY", "SELL"),
+            price=close[idx],
+            amount=np.ones(len(idx)),
+            timestamp=df.index[idx],
+            reason=reason if callable(reason) else np.asarray(reason, dtype=object),
+            coin=coin,
+        )
+    
+    @classmethod
+    def empty(cls, df: pd.DataFrame, coin: str = "Fixed") -> "TradeBatch":
+        """Batch sem trades (indicadores ausentes)."""
+        return cls(
+            action=np.empty(0, dtype="<U4"),
+            price=np.empty(0, dtype=np.float64),
+            amount=np.empty(0, dtype=np.float64),
+            timestamp=df.index[:0],
+            reason=np.empty(0, dtype=object),
+            coin=coin,
+        )
+    
+    def __len__(self) -> int:
+        return len(self.price)
+    
+    def reasons(self) -> np.ndarray:
+        """Textos dos trades (formata na primeira leitura se `reason` for função)."""
+        if callable(self.reason):
+            self.reason = np.asarray(self.reason(), dtype=object)
+        return self.reason
+    
+    def __iter__(self) -> Iterator[Trade]:
+        for action, price, amount, ts, reason in zip(
+            self.action.tolist(), self.price.tolist(), self.amount.tolist(),
+            _box_timestamps(self.timestamp), self.reasons().tolist()
+        ):
+            yield Trade(action, price, amount, self.coin, ts, reason)
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Converte para a lista de dicts de trade (conversão em lote por coluna)."""
+        coin = self.coin
+        return [
+            {
+                "action": action,
+                "price": price,
+                "amount": amount,
+                "coin": coin,
+                "timestamp": ts,
+                "reason": reason,
+            }
+            for action, price, amount, ts, reason in zip(
+                self.action.tolist(), self.price.tolist(), self.amount.tolist(),
+                _box_timestamps(self.timestamp), self.reasons().tolist()
+            )
+        ]
+
 
 class BaseStrategy(ABC):
     """
@@ -57,20 +242,165 @@ class BaseStrategy(ABC):
         """
         pass
     
+    def apply_grid(self, df: pd.DataFrame, param_grid: Iterable[Dict[str, Any]]) -> List[List[Dict]]:
+        """
+        Aplica a estratégia com cada combinação de parâmetros (varredura).
+        
+        Returns:
+            Uma lista de trades por combinação, na ordem de `param_grid`.
+            Estratégias com kernel de varredura próprio sobrescrevem este método.
+        """
+        return [self.apply(df, **params) for params in param_grid]
+    
+    # === VARREDURA EM ARRAYS (opcional) ===
+    # Estratégias que implementam _scan() listam aqui as colunas que leem;
+    # apply_batch() extrai os arrays, pula o aquecimento e monta os trades.
+    required_columns: Tuple[str, ...] = ()
+    
+    def apply_batch(self, df: pd.DataFrame, **params) -> TradeBatch:
+        """
+        Como apply(), mas devolve os trades em colunas (TradeBatch).
+        
+        Implementação padrão para estratégias com _scan(): a subclasse só
+        define `required_columns`, _scan() e _reasons(); o apply() dela é
+        `self.apply_batch(df, **params).to_records()`. DataFrames polars são
+        convertidos aqui (_as_pandas), para todas as estratégias.
+        """
+        return self._scan_batch(self._as_pandas(df), self._validated_params(params))
+    
+    def _scan_batch(self, df: pd.DataFrame, p: Mapping[str, Any],
+                    shared: Optional[Dict[Any, np.ndarray]] = None) -> TradeBatch:
+        """apply_batch com parâmetros já validados e arrays compartilhados (ver apply_strategies)."""
+        arrays = self._arrays(df, p, shared)
+        if arrays is None:
+            return TradeBatch.empty(df)
+        
+        # Eventos memoizados por df quando a estratégia declara de que dependem
+        key = self._events_key(df, p)
+        cache = _frame_cache(df) if key is not None else None
+        events = cache.get((type(self), key)) if cache is not None else None
+        if events is None:
+            events = self._scan_events(arrays, p)
+            if cache is not None:
+                cache[(type(self), key)] = events
+        idx, is_buy, detail = events
+        # Textos só quando alguém ler os trades (to_records/iteração)
+        close = arrays['close'] if 'close' in arrays else _column_array(df, 'close', shared)
+        return TradeBatch.from_events(df, idx, is_buy, lambda: self._reasons(df, arrays, idx, is_buy, detail, p),
+                                      close=close)
+    
+    def _scan_events(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        """_scan() sobre os arrays sem o aquecimento; `idx` volta absoluto (read-only)."""
+        # Aquecimento: começa um candle antes do primeiro em que todos os
+        # indicadores existem (cruzamentos olham o candle anterior). O close
+        # não conta: preço NaN no início não é aquecimento de indicador.
+        indicators = [values for col, values in arrays.items() if col != 'close']
+        start = max(self._first_valid(*indicators) - 1, 0) if indicators else 0
+        
+        idx, is_buy, detail = self._scan({col: values[start:] for col, values in arrays.items()}, p)
+        idx = idx + start
+        # Podem ficar no cache de _frame_cache: ninguém altera os eventos
+        idx.flags.writeable = False
+        is_buy.flags.writeable = False
+        return idx, is_buy, detail
+    
+    def _events_key(self, df: pd.DataFrame, p: Mapping[str, Any]):
+        """
+        Chave dos eventos de _scan() para memoizar por df (None = não memoiza).
+        
+        Sobrescreva quando os trades dependem de poucos dados do df (ex:
+        Trend Following só da coluna EMA resolvida): varreduras que repetem
+        a chave no mesmo df pulam a varredura (ver _frame_cache).
+        """
+        return None
+    
+    def _arrays(self, df: pd.DataFrame, p: Mapping[str, Any],
+                shared: Optional[Dict[Any, np.ndarray]] = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Arrays float64 das `required_columns` (None se faltar alguma coluna).
+        
+        Sobrescreva para acrescentar séries calculadas (ex: EMA ausente do df),
+        lendo colunas com _column_array(df, col, shared). `shared` é o cache
+        de arrays entre estratégias do mesmo df (ver apply_strategies).
+        Os arrays podem ser read-only: copie antes de passar a kernels numba.
+        
+        float64 de propósito: em float32 um RSI de 29.999999999 vira 30.0 e
+        as comparações com os limiares (e o sinal de MACD - Signal) mudam,
+        gerando trades diferentes dos calculados sobre o df.
+        """
+        if not all(col in df.columns for col in self.required_columns):
+            return None
+        return {col: _column_array(df, col, shared) for col in self.required_columns}
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        """
+        Detecta os trades a partir dos arrays já sem o aquecimento.
+        
+        Returns:
+            (idx, is_buy, detail): candle de cada trade (relativo aos arrays
+            recebidos), se é compra, e um dado opcional por trade repassado a
+            _reasons() (ex: valor calculado no kernel), ou None.
+        """
+        raise NotImplementedError(f"{type(self).__name__} não implementa _scan()")
+    
+    def _reasons(self, df: pd.DataFrame, arrays: Dict[str, np.ndarray], idx: np.ndarray,
+                 is_buy: np.ndarray, detail, p: Mapping[str, Any]) -> list:
+        """Texto de cada trade (`idx` absoluto nos `arrays` completos)."""
+        raise NotImplementedError(f"{type(self).__name__} não implementa _reasons()")
+    
+    # Preflight já executado para esta classe (ver preflight())
+    _preflight_done: bool = False
+    
+    @classmethod
+    def preflight(cls) -> None:
+        """
+        Verificações de ambiente, uma vez por classe.
+        
+        Avisa se o bottleneck não estiver instalado: quando presente, o pandas
+        usa seus kernels em C nas reduções com NaN (mean/std/min/max das séries
+        de indicadores).
+        """
+        if cls._preflight_done:
+            return
+        cls._preflight_done = True
+        if importlib.util.find_spec("bottleneck") is None:
+            warnings.warn(
+                "bottleneck não instalado: reduções com NaN do pandas nos indicadores ficam mais lentas. "
+                "Instale com `pip install bottleneck`.",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+    
+    @cached_property
+    def default_params(self) -> Mapping[str, Any]:
+        """Defaults dos parâmetros (somente leitura; `parameters` é atributo de classe)."""
+        return MappingProxyType({
+            name: config.get("default", 0) 
+            for name, config in self.parameters.items()
+        })
+    
     def get_default_params(self) -> Dict[str, Any]:
         """Retorna os valores default de todos os parâmetros."""
-        return {
+        return dict(self.default_params)
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _validate_cached(cls: type, params_items: Tuple[Tuple[str, type, Any], ...]) -> Mapping[str, Any]:
+        """Validação memoizada por (classe, parâmetros ordenados com tipo)."""
+        params_items = ((name, value) for name, _, value in params_items)
+        return MappingProxyType(cls._validate(cls.parameters, params_items))
+    
+    @staticmethod
+    def _validate(parameters: Dict[str, Dict[str, Any]], params_items) -> Dict[str, Any]:
+        """Preenche defaults e aplica limites min/max."""
+        validated = {
             name: config.get("default", 0) 
-            for name, config in self.parameters.items()
+            for name, config in parameters.items()
         }
-    
-    def validate_params(self, **params) -> Dict[str, Any]:
-        """Valida e preenche parâmetros com defaults se necessário."""
-        validated = self.get_default_params()
         
-        for name, value in params.items():
-            if name in self.parameters:
-                config = self.parameters[name]
+        for name, value in params_items:
+            if name in parameters:
+                config = parameters[name]
                 # Aplica limites min/max se definidos
                 if "min" in config:
                     value = max(config["min"], value)
@@ -80,5 +410,81 @@ class BaseStrategy(ABC):
                 
         return validated
     
+    def validate_params(self, **params) -> Dict[str, Any]:
+        """Valida e preenche parâmetros com defaults se necessário."""
+        return dict(self._validated_params(params))
+    
+    def _validated_params(self, params: Dict[str, Any]) -> Mapping[str, Any]:
+        """
+        Como validate_params, mas devolve o mapeamento do cache sem copiar
+        (somente leitura). Para o caminho quente (apply_batch/varreduras).
+        """
+        # Itens ordenados: {a: 1, b: 2} e {b: 2, a: 1} caem na mesma entrada do cache.
+        # O tipo vai na chave: 30, 30.0 e True são iguais para o hash, mas não
+        # podem devolver o valor validado um do outro.
+        try:
+            key = tuple(sorted((k, type(v), v) for k, v in params.items()))
+            return BaseStrategy._validate_cached(type(self), key)
+        except TypeError:
+            # Valor não-hashable (ex: lista): valida sem cache
+            return self._validate(self.parameters, sorted(params.items()))
+    
+    @staticmethod
+    def _as_pandas(df) -> pd.DataFrame:
+        """
+        Aceita DataFrames polars convertendo para pandas na entrada.
+        
+        Detecção por duck typing (sem importar polars, que é opcional).
+        A coluna de tempo do polars vira o índice, como no resto do app.
+        """
+        if isinstance(df, pd.DataFrame) or not hasattr(df, "to_pandas"):
+            return df
+        
+        pdf = df.to_pandas(use_pyarrow_extension_array=True)
+        for col in ("timestamp", "time", "date"):
+            if col in pdf.columns:
+                return pdf.set_index(col)
+        return pdf
+    
+    @staticmethod
+    def _first_valid(*arrays: np.ndarray) -> int:
+        """
+        Fim do aquecimento: primeiro candle em que todos os arrays são não-NaN.
+        
+        Devolve len(array) se nenhum candle for válido. As varreduras começam
+        aqui em vez de testar NaN candle a candle no prefixo.
+        """
+        valid = ~np.isnan(arrays[0])
+        for values in arrays[1:]:
+            valid &= ~np.isnan(values)
+        first = int(np.argmax(valid)) if len(valid) else 0
+        return first if len(valid) and valid[first] else len(valid)
+    
     def __repr__(self) -> str:
         return f"<Strategy: {self.name} ({self.slug})>"
+
+
+def apply_strategies(df: pd.DataFrame, runs: Iterable[Tuple["BaseStrategy", Mapping[str, Any]]]) -> List[List[Dict]]:
+    """
+    Aplica várias estratégias (ou a mesma com vários parâmetros) ao mesmo df.
+    
+    As estratégias com _scan() compartilham os arrays: close, rsi, macd...
+    são extraídos do df uma única vez (e EMAs calculadas, uma vez por
+    período) em vez de uma vez por estratégia. As demais usam apply().
+    
+    Args:
+        runs: pares (estratégia, parâmetros)
+        
+    Returns:
+        Uma lista de trades por par, na ordem de `runs` (igual a apply()).
+    """
+    df = BaseStrategy._as_pandas(df)  # polars: converte uma vez para todas
+    shared: Dict[Any, np.ndarray] = {}
+    results = []
+    for strategy, params in runs:
+        if type(strategy)._scan is BaseStrategy._scan:
+            results.append(strategy.apply(df, **params))
+        else:
+            p = strategy._validated_params(dict(params))
+            results.append(strategy._scan_batch(df, p, shared).to_records())
+    return results
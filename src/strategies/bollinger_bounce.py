@@ -4,9 +4,11 @@ Bollinger Bounce Strategy - Reversão nas Bandas de Bollinger.
 Compra quando preço toca banda inferior, vende quando toca banda superior.
 """
 
+import numpy as np
 import pandas as pd
 from typing import List, Dict
-from .base import BaseStrategy
+from .base import BaseStrategy, TradeBatch
+from ._kernels import resolve_positions, interleave_positions
 
 
 class BollingerBounceStrategy(BaseStrategy):
@@ -53,54 +55,58 @@ class BollingerBounceStrategy(BaseStrategy):
     
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia de Bollinger Bounce."""
+        return self.apply_batch(df, **params).to_records()
+    
+    def apply_batch(self, df: pd.DataFrame, **params) -> TradeBatch:
+        """Como apply(), mas devolve os trades em colunas (TradeBatch)."""
+        
+        self.preflight()
         
         # Valida parâmetros
         p = self.validate_params(**params)
         threshold = p["touch_threshold"] / 100  # Converte % para decimal
         
-        trades = []
-        in_position = False
+        df = self._as_pandas(df)
         
         # Verifica se Bollinger Bands existem
         if 'bb_lower' not in df.columns or 'bb_upper' not in df.columns:
-            return []
+            return self._empty_batch(df)
+        
+        close = df['close'].to_numpy(dtype=np.float64, na_value=np.nan)
+        lower = df['bb_lower'].to_numpy(dtype=np.float64, na_value=np.nan)
+        upper = df['bb_upper'].to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        # Contrato: comparações com NaN dão False (IEEE-754), então barras sem
+        # bandas (aquecimento) ou com close NaN nunca geram sinal, sem isnan.
+        # lower <= upper só é False se alguma banda for NaN (largura >= 0).
+        bands_ok = lower <= upper
         
-        for i in range(len(df)):
-            price = df['close'].iloc[i]
-            lower = df['bb_lower'].iloc[i]
-            upper = df['bb_upper'].iloc[i]
-            ts = df.index[i]
-            
-            # Skip se valores forem NaN
-            if pd.isna(lower) or pd.isna(upper):
-                continue
-            
-            # Calcula limiares ajustados
-            lower_threshold = lower * (1 + threshold)
-            upper_threshold = upper * (1 - threshold)
-            
-            # Buy: Preço toca ou ultrapassa banda inferior
-            if price <= lower_threshold and not in_position:
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"BB Bounce ↑ (Price ≤ Lower Band)"
-                })
-                in_position = True
-            
-            # Sell: Preço toca ou ultrapassa banda superior
-            elif price >= upper_threshold and in_position:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"BB Bounce ↓ (Price ≥ Upper Band)"
-                })
-                in_position = False
+        # Pula o aquecimento: a varredura começa na primeira banda válida
+        first = int(np.argmax(bands_ok)) if len(bands_ok) else 0
+        if not len(bands_ok) or not bands_ok[first]:
+            return self._empty_batch(df)
+        c, lo, up, ok = close[first:], lower[first:], upper[first:], bands_ok[first:]
         
-        return trades
+        # Buy: Preço toca ou ultrapassa banda inferior (limiar ajustado)
+        buy_mask = ok & (c <= lo * (1 + threshold))
+        # Sell: Preço toca ou ultrapassa banda superior (limiar ajustado)
+        sell_mask = ok & (c >= up * (1 - threshold))
+        
+        idx, is_buy = interleave_positions(*resolve_positions(buy_mask, sell_mask))
+        idx += first
+        return self._batch(df, idx, close[idx], is_buy)
+    
+    @classmethod
+    def _empty_batch(cls, df: pd.DataFrame) -> TradeBatch:
+        return cls._batch(df, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), np.empty(0, dtype=np.bool_))
+    
+    @staticmethod
+    def _batch(df: pd.DataFrame, idx: np.ndarray, prices: np.ndarray, is_buy: np.ndarray) -> TradeBatch:
+        return TradeBatch(
+            action=np.where(is_buy, "BUY", "SELL"),
+            price=prices,
+            amount=np.ones(len(idx)),
+            timestamp=df.index[idx],
+            reason=np.where(is_buy, "BB Bounce ↑ (Price ≤ Lower Band)", "BB Bounce ↓ (Price ≥ Upper Band)"),
+            coin="Fixed",
+        )
@@ -4,56 +4,91 @@ CustomStrategy - Engine para estratégias dinâmicas criadas pelo usuário.
 Permite criar estratégias combinando múltiplas regras com operadores lógicos (AND/OR).
 """
 
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from src.core import indicators as ind
+from .base import _box_timestamps
+from ._kernels import resolve_positions, interleave_positions, crosses_above, rolling_max, rolling_min
 
 
 # =============================================================================
 # DEFINIÇÃO DOS INDICADORES DISPONÍVEIS
 # =============================================================================
 
+def _bollinger_all(df: pd.DataFrame, period: int = 20, **p) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """Bandas de Bollinger e %B numa única passada de rolling mean/std: (upper, lower, pctb)."""
+    close = df['close']
+    upper, _, lower = ind.calc_bollinger_bands(close, period)
+    pctb = (close - lower) / (upper - lower + 1e-10)
+    return upper, lower, pctb
+
+
+def _highest(series: pd.Series, period: int) -> pd.Series:
+    """Máxima móvel (kernel compilado) alinhada ao índice da série."""
+    return pd.Series(rolling_max(series, period), index=series.index)
+
+
+def _lowest(series: pd.Series, period: int) -> pd.Series:
+    """Mínima móvel (kernel compilado) alinhada ao índice da série."""
+    return pd.Series(rolling_min(series, period), index=series.index)
+
+
+# Indicadores que saem de um mesmo cálculo (tupla): {chave composta: função}.
+# Entradas com "_compound_key" calculam a tupla uma vez por avaliação e pegam
+# o elemento "_tuple_index".
+COMPOUND_CALCS = {
+    "bollinger": _bollinger_all,
+    "macd": lambda df, **p: ind.calc_macd(df['close']),
+    "stoch": lambda df, period=14, **p: ind.calc_stochastic(df['close'], df['high'], df['low'], period),
+}
+
 AVAILABLE_INDICATORS = {
     # Preços (valor atual do candle)
     "close": {
         "label": "Preço de Fechamento",
         "category": "price",
         "params": [],
-        "calc": lambda df, **p: df['close']
+        "calc": itemgetter('close')
     },
     "high": {
         "label": "Preço Máximo",
         "category": "price",
         "params": [],
-        "calc": lambda df, **p: df['high']
+        "calc": itemgetter('high')
     },
     "low": {
         "label": "Preço Mínimo",
         "category": "price",
         "params": [],
-        "calc": lambda df, **p: df['low']
+        "calc": itemgetter('low')
     },
     "open": {
         "label": "Preço de Abertura",
         "category": "price",
         "params": [],
-        "calc": lambda df, **p: df['open']
+        "calc": itemgetter('open')
     },
     # Preços com período (máximo/mínimo de N candles)
     "highest": {
         "label": "Máximo N Candles",
         "category": "price",
         "params": [{"name": "period", "default": 20, "min": 2, "max": 200, "label": "Período"}],
-        "calc": lambda df, period=20, **p: df['high'].rolling(window=period).max()
+        "calc": lambda df, period=20, **p: _highest(df['high'], period)
     },
     "lowest": {
         "label": "Mínimo N Candles",
         "category": "price",
         "params": [{"name": "period", "default": 20, "min": 2, "max": 200, "label": "Período"}],
-        "calc": lambda df, period=20, **p: df['low'].rolling(window=period).min()
+        "calc": lambda df, period=20, **p: _lowest(df['low'], period)
     },
     "close_avg": {
         "label": "Fechamento Médio",
@@ -91,25 +126,33 @@ AVAILABLE_INDICATORS = {
         "label": "MACD (Linha)",
         "category": "oscillator",
         "params": [],
-        "calc": lambda df, **p: ind.calc_macd(df['close'])[0]
+        "calc": lambda df, **p: ind.calc_macd(df['close'])[0],
+        "_compound_key": "macd",
+        "_tuple_index": 0,
     },
     "macd_signal": {
         "label": "MACD (Sinal)",
         "category": "oscillator",
         "params": [],
-        "calc": lambda df, **p: ind.calc_macd(df['close'])[1]
+        "calc": lambda df, **p: ind.calc_macd(df['close'])[1],
+        "_compound_key": "macd",
+        "_tuple_index": 1,
     },
     "stoch_k": {
         "label": "Stochastic %K",
         "category": "oscillator",
         "params": [{"name": "period", "default": 14, "min": 5, "max": 50, "label": "Período"}],
-        "calc": lambda df, period=14, **p: ind.calc_stochastic(df['close'], df['high'], df['low'], period)[0]
+        "calc": lambda df, period=14, **p: ind.calc_stochastic(df['close'], df['high'], df['low'], period)[0],
+        "_compound_key": "stoch",
+        "_tuple_index": 0,
     },
     "stoch_d": {
         "label": "Stochastic %D",
         "category": "oscillator",
         "params": [{"name": "period", "default": 14, "min": 5, "max": 50, "label": "Período"}],
-        "calc": lambda df, period=14, **p: ind.calc_stochastic(df['close'], df['high'], df['low'], period)[1]
+        "calc": lambda df, period=14, **p: ind.calc_stochastic(df['close'], df['high'], df['low'], period)[1],
+        "_compound_key": "stoch",
+        "_tuple_index": 1,
     },
     
     # Volatilidade
@@ -123,19 +166,25 @@ AVAILABLE_INDICATORS = {
         "label": "Bollinger Upper",
         "category": "volatility",
         "params": [{"name": "period", "default": 20, "min": 5, "max": 50, "label": "Período"}],
-        "calc": lambda df, period=20, **p: ind.calc_bollinger_bands(df['close'], period)[0]
+        "calc": lambda df, period=20, **p: _bollinger_all(df, period)[0],
+        "_compound_key": "bollinger",
+        "_tuple_index": 0,
     },
     "bollinger_lower": {
         "label": "Bollinger Lower",
         "category": "volatility",
         "params": [{"name": "period", "default": 20, "min": 5, "max": 50, "label": "Período"}],
-        "calc": lambda df, period=20, **p: ind.calc_bollinger_bands(df['close'], period)[2]
+        "calc": lambda df, period=20, **p: _bollinger_all(df, period)[1],
+        "_compound_key": "bollinger",
+        "_tuple_index": 1,
     },
     "bollinger_pctb": {
         "label": "Bollinger %B",
         "category": "volatility",
         "params": [{"name": "period", "default": 20, "min": 5, "max": 50, "label": "Período"}],
-        "calc": lambda df, period=20, **p: ind.calc_bollinger_pctb(df['close'], period)
+        "calc": lambda df, period=20, **p: _bollinger_all(df, period)[2],
+        "_compound_key": "bollinger",
+        "_tuple_index": 2,
     },
     
     # Estatísticos
@@ -171,7 +220,7 @@ AVAILABLE_INDICATORS = {
         "label": "Volume",
         "category": "volume",
         "params": [],
-        "calc": lambda df, **p: df['volume']
+        "calc": itemgetter('volume')
     },
     "volume_ratio": {
         "label": "Volume Ratio",
@@ -185,25 +234,67 @@ AVAILABLE_INDICATORS = {
         "label": "Donchian Upper",
         "category": "channel",
         "params": [{"name": "period", "default": 20, "min": 5, "max": 100, "label": "Período"}],
-        "calc": lambda df, period=20, **p: ind.calc_donchian(df['high'], df['low'], period)[0]
+        "calc": lambda df, period=20, **p: _highest(df['high'], period)
     },
     "donchian_lower": {
         "label": "Donchian Lower",
         "category": "channel",
         "params": [{"name": "period", "default": 20, "min": 5, "max": 100, "label": "Período"}],
-        "calc": lambda df, period=20, **p: ind.calc_donchian(df['high'], df['low'], period)[1]
+        "calc": lambda df, period=20, **p: _lowest(df['low'], period)
     },
 }
 
+# Tabelas planas para o caminho quente (um lookup em vez de config + campo)
+_INDICATOR_CALC = {k: v["calc"] for k, v in AVAILABLE_INDICATORS.items()}
+# Sem parâmetros: chamados só com o df (itemgetter não aceita kwargs)
+_INDICATOR_NO_PARAMS = frozenset(k for k, v in AVAILABLE_INDICATORS.items() if not v["params"])
+_INDICATOR_COMPOUND = {
+    k: (v["_compound_key"], v["_tuple_index"])
+    for k, v in AVAILABLE_INDICATORS.items() if "_compound_key" in v
+}
+
+
+def _as_float_array(value, n: int) -> np.ndarray:
+    """Série/constante como array float64 gravável (entrada dos kernels compilados)."""
+    if np.ndim(value) == 0:
+        return np.full(n, value, dtype=np.float64)
+    return np.array(value, dtype=np.float64)
+
+
+def _crosses_above(a: pd.Series, b) -> pd.Series:
+    """a cruza b para cima: (a > b) agora e não no candle anterior."""
+    out = crosses_above(_as_float_array(a, len(a)), _as_float_array(b, len(a)))
+    return pd.Series(out, index=a.index)
+
+
+def _crosses_below(a: pd.Series, b) -> pd.Series:
+    """a cruza b para baixo: (a < b) agora e não no candle anterior."""
+    out = crosses_above(_as_float_array(b, len(a)), _as_float_array(a, len(a)))
+    return pd.Series(out, index=a.index)
+
+
+def _equals(a: pd.Series, b) -> pd.Series:
+    """
+    a ≈ b com tolerância relativa de 0,1% sobre b (mesma regra do np.isclose).
+
+    A tolerância sai de b de uma vez (escalar quando b é constante), então a
+    comparação é uma subtração, um abs e um <=, sem os temporários do isclose.
+    """
+    a_arr = np.asarray(a, dtype=np.float64)
+    b_arr = np.asarray(b, dtype=np.float64)
+    tol = 1e-3 * np.abs(b_arr) + 1e-8
+    return pd.Series(np.abs(a_arr - b_arr) <= tol, index=a.index)
+
+
 # Operadores disponíveis
 AVAILABLE_OPERATORS = {
     ">": {"label": "Maior que", "func": lambda a, b: a > b},
     "<": {"label": "Menor que", "func": lambda a, b: a < b},
     ">=": {"label": "Maior ou igual", "func": lambda a, b: a >= b},
     "<=": {"label": "Menor ou igual", "func": lambda a, b: a <= b},
-    "==": {"label": "Igual a", "func": lambda a, b: np.isclose(a, b, rtol=1e-3)},
-    "crosses_above": {"label": "Cruza para cima", "func": lambda a, b: (a > b).astype(int).diff() == 1},
-    "crosses_below": {"label": "Cruza para baixo", "func": lambda a, b: (a < b).astype(int).diff() == 1},
+    "==": {"label": "Igual a", "func": _equals},
+    "crosses_above": {"label": "Cruza para cima", "func": _crosses_above},
+    "crosses_below": {"label": "Cruza para baixo", "func": _crosses_below},
 }
 
 # Categorias para organização na UI
@@ -223,7 +314,100 @@ INDICATOR_CATEGORIES = {
 # ENGINE DE AVALIAÇÃO DE REGRAS
 # =============================================================================
 
-def evaluate_rule(df: pd.DataFrame, rule: Dict) -> pd.Series:
+# Cache de indicadores de uma avaliação: {(indicador, params): série}
+# (e {("*" + chave composta, params): tupla} para os indicadores compostos;
+# o "*" separa a chave composta "macd" do indicador "macd")
+IndicatorCache = Dict[Tuple[str, frozenset], Any]
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class _FastDF:
+    """
+    DataFrame com as colunas OHLCV extraídas uma única vez por avaliação.
+
+    `df['close']` num DataFrame resolve a coluna (e cria a Series) a cada
+    chamada; aqui os calcs de AVAILABLE_INDICATORS recebem sempre o mesmo
+    objeto. Qualquer outro acesso é repassado ao DataFrame original.
+    """
+    
+    __slots__ = ("_df", "_columns", "index")
+    
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._columns = {c: df[c] for c in OHLCV_COLUMNS if c in df.columns}
+        self.index = df.index
+    
+    def __getitem__(self, key):
+        column = self._columns.get(key) if isinstance(key, str) else None
+        return self._df[key] if column is None else column
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def __getattr__(self, name):
+        return getattr(self._df, name)
+
+
+def _fast_df(df) -> _FastDF:
+    """Envolve o df em _FastDF (sem reembrulhar)."""
+    return df if isinstance(df, _FastDF) else _FastDF(df)
+
+
+def _calc_indicator(df: pd.DataFrame, indicator: str, params: Dict, cache: IndicatorCache) -> pd.Series:
+    """Calcula um indicador uma única vez por (indicador, params) dentro da avaliação."""
+    key = (indicator, frozenset(params.items()))
+    value = cache.get(key)
+    if value is None:
+        value = _calc_resolved(df, indicator, params, key, cache)
+    return value
+
+
+def _calc_resolved(df: pd.DataFrame, indicator: str, params: Dict, key: Tuple, cache: IndicatorCache) -> pd.Series:
+    """Calcula um indicador com a chave de cache já pronta."""
+    value = cache.get(key)
+    if value is None:
+        compound = _INDICATOR_COMPOUND.get(indicator)
+        if compound is None:
+            try:
+                calc = _INDICATOR_CALC[indicator]
+            except KeyError:
+                raise ValueError(f"Indicador desconhecido: {indicator}") from None
+            value = calc(df) if indicator in _INDICATOR_NO_PARAMS else calc(df, **params)
+        else:
+            # Tupla compartilhada entre os indicadores do mesmo cálculo
+            compound_key, tuple_index = compound
+            tuple_key = ("*" + compound_key, key[1])
+            values = cache.get(tuple_key)
+            if values is None:
+                values = cache[tuple_key] = COMPOUND_CALCS[compound_key](df, **params)
+            value = values[tuple_index]
+        cache[key] = value
+    return value
+
+
+def _to_bool_array(values) -> np.ndarray:
+    """Resultado de regra como array booleano (NaN vira False)."""
+    if isinstance(values, pd.Series) and values.dtype != np.bool_:
+        # Nullable/pyarrow/float: NaN -> False na própria conversão, sem array object
+        return values.to_numpy(dtype=np.bool_, na_value=False)
+    arr = np.asarray(values)
+    if arr.dtype != np.bool_:
+        arr = np.where(pd.isna(arr), False, arr).astype(bool)
+    return arr
+
+
+def _combine(masks: List[np.ndarray], logic: str) -> np.ndarray:
+    """Combina as máscaras booleanas com AND/OR numa única redução NumPy."""
+    if len(masks) == 1:
+        return masks[0]
+    stacked = np.stack(masks)
+    if logic == "AND":
+        return np.logical_and.reduce(stacked, axis=0)
+    return np.logical_or.reduce(stacked, axis=0)  # OR
+
+
+def evaluate_rule(df: pd.DataFrame, rule: Dict, cache: Optional[IndicatorCache] = None) -> pd.Series:
     """
     Avalia uma única regra e retorna uma série booleana.
     
@@ -237,26 +421,24 @@ def evaluate_rule(df: pd.DataFrame, rule: Dict) -> pd.Series:
                 "value_type": "constant",  # ou "indicator"
                 "value": 30,  # ou {"indicator": "sma", "params": {...}}
             }
+        cache: Cache de indicadores compartilhado entre as regras do mesmo df
     
     Returns:
         pd.Series booleana indicando onde a regra é satisfeita
     """
-    # Calcula o indicador do lado esquerdo
-    ind_config = AVAILABLE_INDICATORS.get(rule["indicator"])
-    if not ind_config:
-        raise ValueError(f"Indicador desconhecido: {rule['indicator']}")
+    if cache is None:
+        cache = {}
+    df = _fast_df(df)
     
-    left_value = ind_config["calc"](df, **rule.get("params", {}))
+    # Calcula o indicador do lado esquerdo
+    left_value = _calc_indicator(df, rule["indicator"], rule.get("params", {}), cache)
     
     # Calcula o lado direito (constante ou outro indicador)
     if rule.get("value_type", "constant") == "constant":
         right_value = rule["value"]
     else:
         # É outro indicador
-        right_config = AVAILABLE_INDICATORS.get(rule["value"]["indicator"])
-        if not right_config:
-            raise ValueError(f"Indicador desconhecido: {rule['value']['indicator']}")
-        right_value = right_config["calc"](df, **rule["value"].get("params", {}))
+        right_value = _calc_indicator(df, rule["value"]["indicator"], rule["value"].get("params", {}), cache)
     
     # Aplica o operador
     op_config = AVAILABLE_OPERATORS.get(rule["operator"])
@@ -266,7 +448,12 @@ def evaluate_rule(df: pd.DataFrame, rule: Dict) -> pd.Series:
     return op_config["func"](left_value, right_value)
 
 
-def evaluate_rules(df: pd.DataFrame, rules: List[Dict], logic: str = "AND") -> pd.Series:
+def evaluate_rules(
+    df: pd.DataFrame,
+    rules: List[Dict],
+    logic: str = "AND",
+    cache: Optional[IndicatorCache] = None
+) -> pd.Series:
     """
     Avalia múltiplas regras combinadas com AND ou OR.
     
@@ -274,44 +461,50 @@ def evaluate_rules(df: pd.DataFrame, rules: List[Dict], logic: str = "AND") -> p
         df: DataFrame com dados OHLCV
         rules: Lista de regras
         logic: "AND" ou "OR"
+        cache: Cache de indicadores compartilhado entre as regras do mesmo df
     
     Returns:
         pd.Series booleana combinada
     """
     if not rules:
-        return pd.Series([False] * len(df), index=df.index)
-    
-    results = [evaluate_rule(df, rule) for rule in rules]
+        return pd.Series(np.zeros(len(df), dtype=bool), index=df.index)
     
-    if logic == "AND":
-        combined = results[0]
-        for r in results[1:]:
-            combined = combined & r
-    else:  # OR
-        combined = results[0]
-        for r in results[1:]:
-            combined = combined | r
-    
-    return combined.fillna(False)
+    if cache is None:
+        cache = {}
+    df = _fast_df(df)
+    return pd.Series(_rules_mask(df, rules, logic, cache), index=df.index)
+
+
+def _rules_mask(df: _FastDF, rules: List[Dict], logic: str, cache: IndicatorCache) -> np.ndarray:
+    """evaluate_rules como array booleano (sem alinhamento de índice)."""
+    if not rules:
+        return np.zeros(len(df), dtype=bool)
+    return _combine([_to_bool_array(evaluate_rule(df, rule, cache)) for rule in rules], logic)
 
 
-def evaluate_group(df: pd.DataFrame, group: Dict) -> pd.Series:
+def evaluate_group(df: pd.DataFrame, group: Dict, cache: Optional[IndicatorCache] = None) -> pd.Series:
     """
     Avalia um grupo de regras.
     
     Args:
         df: DataFrame com dados OHLCV
         group: {"rules": [...], "logic": "AND"|"OR"}
+        cache: Cache de indicadores compartilhado entre as regras do mesmo df
     
     Returns:
         pd.Series booleana do grupo
     """
     rules = group.get("rules", [])
     logic = group.get("logic", "AND")
-    return evaluate_rules(df, rules, logic)
+    return evaluate_rules(df, rules, logic, cache)
 
 
-def evaluate_groups(df: pd.DataFrame, groups: List[Dict], groups_logic: str = "OR") -> pd.Series:
+def evaluate_groups(
+    df: pd.DataFrame,
+    groups: List[Dict],
+    groups_logic: str = "OR",
+    cache: Optional[IndicatorCache] = None
+) -> pd.Series:
     """
     Avalia múltiplos grupos combinados com AND ou OR.
     
@@ -319,37 +512,141 @@ def evaluate_groups(df: pd.DataFrame, groups: List[Dict], groups_logic: str = "O
         df: DataFrame com dados OHLCV
         groups: Lista de grupos [{"rules": [...], "logic": "AND"}, ...]
         groups_logic: Lógica entre grupos ("AND" ou "OR")
+        cache: Cache de indicadores compartilhado entre as regras do mesmo df
     
     Returns:
         pd.Series booleana combinada de todos os grupos
     """
     if not groups:
-        return pd.Series([False] * len(df), index=df.index)
+        return pd.Series(np.zeros(len(df), dtype=bool), index=df.index)
     
-    results = [evaluate_group(df, group) for group in groups]
+    if cache is None:
+        cache = {}
+    df = _fast_df(df)
     
-    if groups_logic == "AND":
-        combined = results[0]
-        for r in results[1:]:
-            combined = combined & r
-    else:  # OR
-        combined = results[0]
-        for r in results[1:]:
-            combined = combined | r
+    # Tudo em arrays booleanos; a Series só no retorno
+    masks = [
+        _rules_mask(df, group.get("rules", []), group.get("logic", "AND"), cache)
+        for group in groups
+    ]
+    return pd.Series(_combine(masks, groups_logic), index=df.index)
+
+
+# Regra resolvida uma vez: indicadores validados, params, chaves de cache e
+# função do operador (o lado direito é a constante quando right_is_const).
+_CompiledRule = namedtuple(
+    "_CompiledRule",
+    "left left_params left_key op_func right_is_const right right_params right_key",
+)
+
+
+def _resolve_indicator(indicator: str, params: Dict) -> Tuple[str, Dict, Tuple]:
+    """Valida o indicador e monta (indicador, params, chave de cache)."""
+    if indicator not in _INDICATOR_CALC:
+        raise ValueError(f"Indicador desconhecido: {indicator}")
+    return indicator, params, (indicator, frozenset(params.items()))
+
+
+def compile_rule(rule: Dict) -> _CompiledRule:
+    """Resolve os lookups de uma regra (indicadores, operador, tipo do valor)."""
+    op_config = AVAILABLE_OPERATORS.get(rule["operator"])
+    if not op_config:
+        raise ValueError(f"Operador desconhecido: {rule['operator']}")
+    
+    left = _resolve_indicator(rule["indicator"], rule.get("params", {}))
+    if rule.get("value_type", "constant") == "constant":
+        return _CompiledRule(*left, op_config["func"], True, rule["value"], None, None)
     
-    return combined.fillna(False)
+    right = _resolve_indicator(rule["value"]["indicator"], rule["value"].get("params", {}))
+    return _CompiledRule(*left, op_config["func"], False, *right)
+
+
+def compile_groups(groups: List[Dict]) -> List[Tuple[List[_CompiledRule], str]]:
+    """Compila grupos em [(regras compiladas, lógica), ...]."""
+    return [
+        ([compile_rule(rule) for rule in group.get("rules", [])], group.get("logic", "AND"))
+        for group in groups
+    ]
+
+
+def evaluate_compiled_rule(df: pd.DataFrame, crule: _CompiledRule, cache: IndicatorCache) -> pd.Series:
+    """Avalia uma regra compilada (sem lookups de dicionário por avaliação)."""
+    left_value = _calc_resolved(df, crule.left, crule.left_params, crule.left_key, cache)
+    if crule.right_is_const:
+        right_value = crule.right
+    else:
+        right_value = _calc_resolved(df, crule.right, crule.right_params, crule.right_key, cache)
+    return crule.op_func(left_value, right_value)
+
+
+def evaluate_compiled_groups(
+    df: pd.DataFrame,
+    groups: List[Tuple[List[_CompiledRule], str]],
+    groups_logic: str,
+    cache: IndicatorCache
+) -> np.ndarray:
+    """Equivalente a evaluate_groups para grupos de compile_groups, como array booleano."""
+    masks = []
+    for crules, logic in groups:
+        if not crules:
+            masks.append(np.zeros(len(df), dtype=bool))
+        else:
+            masks.append(_combine(
+                [_to_bool_array(evaluate_compiled_rule(df, c, cache)) for c in crules], logic
+            ))
+    if not masks:
+        return np.zeros(len(df), dtype=bool)
+    return _combine(masks, groups_logic)
 
 
 # =============================================================================
 # FORMATAÇÃO DE REGRAS (LINGUAGEM NATURAL)
 # =============================================================================
 
+def _canon(value):
+    """
+    Versão hashable de uma regra/grupo (chave do cache de formatação).
+    
+    dict -> frozenset de pares; list e escalares levam o tipo junto, para
+    30 e 30.0 (formatados diferente) não caírem na mesma chave.
+    """
+    if isinstance(value, dict):
+        return frozenset((k, _canon(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return (list, tuple(_canon(v) for v in value))
+    return (type(value), value)
+
+
+def _thaw(value):
+    """Inverso de _canon."""
+    if isinstance(value, frozenset):
+        return {k: _thaw(v) for k, v in value}
+    kind, item = value
+    if kind is list:
+        return [_thaw(v) for v in item]
+    return item
+
+
 def format_rule(rule: Dict) -> str:
     """
     Formata uma regra em linguagem natural legível.
     
     Exemplo: "RSI(14) < 30" ou "Close > SMA(20)"
+    
+    Memoizado pelo conteúdo da regra (a UI reformata as mesmas regras a cada redraw).
     """
+    try:
+        return _format_rule_cached(_canon(rule))
+    except TypeError:  # valor não-hashable
+        return _format_rule(rule)
+
+
+@lru_cache(maxsize=512)
+def _format_rule_cached(canon: frozenset) -> str:
+    return _format_rule(_thaw(canon))
+
+
+def _format_rule(rule: Dict) -> str:
     # Indicador principal
     ind_key = rule.get("indicator", "close")
     ind_config = AVAILABLE_INDICATORS.get(ind_key, {})
@@ -404,7 +701,19 @@ def format_rule(rule: Dict) -> str:
 
 
 def format_group(group: Dict) -> str:
-    """Formata um grupo de regras."""
+    """Formata um grupo de regras (memoizado como format_rule)."""
+    try:
+        return _format_group_cached(_canon(group))
+    except TypeError:  # valor não-hashable
+        return _format_group(group)
+
+
+@lru_cache(maxsize=512)
+def _format_group_cached(canon: frozenset) -> str:
+    return _format_group(_thaw(canon))
+
+
+def _format_group(group: Dict) -> str:
     rules = group.get("rules", [])
     logic = group.get("logic", "AND")
     
@@ -494,6 +803,14 @@ class CustomStrategy:
         self.sell_rules = self.config.get("sell_rules", [])
         self.buy_logic = self.config.get("buy_logic", "AND")
         self.sell_logic = self.config.get("sell_logic", "AND")
+        
+        # Regras resolvidas uma vez (regras planas viram um grupo único)
+        self._compiled_buy_groups = compile_groups(
+            self.buy_groups or [{"rules": self.buy_rules, "logic": self.buy_logic}]
+        )
+        self._compiled_sell_groups = compile_groups(
+            self.sell_groups or [{"rules": self.sell_rules, "logic": self.sell_logic}]
+        )
     
     def apply(self, df: pd.DataFrame, coin: str = "SOL/USDT") -> List[Dict]:
         """
@@ -508,48 +825,69 @@ class CustomStrategy:
         """
         trades = []
         
-        # Usa grupos se disponível, senão usa regras planas
-        if self.buy_groups:
-            buy_signals = evaluate_groups(df, self.buy_groups, self.buy_groups_logic)
-        else:
-            buy_signals = evaluate_rules(df, self.buy_rules, self.buy_logic)
+        # Indicadores (e colunas OHLCV) calculados uma vez para compra e venda
+        cache: IndicatorCache = {}
+        fast = _fast_df(df)
         
-        if self.sell_groups:
-            sell_signals = evaluate_groups(df, self.sell_groups, self.sell_groups_logic)
-        else:
-            sell_signals = evaluate_rules(df, self.sell_rules, self.sell_logic)
+        buy_signals = evaluate_compiled_groups(
+            fast, self._compiled_buy_groups, self.buy_groups_logic, cache
+        )
+        sell_signals = evaluate_compiled_groups(
+            fast, self._compiled_sell_groups, self.sell_groups_logic, cache
+        )
         
-        # Gera trades alternando compra/venda
-        position_open = False
+        # Gera trades alternando compra/venda (máquina de estados compilada)
+        # (kernel exige arrays graváveis; máscaras vindas do pandas podem ser read-only)
+        buy_idx, sell_idx = resolve_positions(
+            np.require(buy_signals, np.bool_, ("C", "W")),
+            np.require(sell_signals, np.bool_, ("C", "W")),
+        )
+        idx, is_buy = interleave_positions(buy_idx, sell_idx)
         
-        for i in range(len(df)):
-            timestamp = df.index[i]
-            price = df['close'].iloc[i]
-            
-            if not position_open and buy_signals.iloc[i]:
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 0,  # Será ajustado pelo portfolio
-                    "timestamp": timestamp,
-                    "coin": coin,
-                    "reason": f"[Custom] {self.name} - Regra de Compra"
-                })
-                position_open = True
-                
-            elif position_open and sell_signals.iloc[i]:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 0,
-                    "timestamp": timestamp,
-                    "coin": coin,
-                    "reason": f"[Custom] {self.name} - Regra de Venda"
-                })
-                position_open = False
+        # Dicts só nos candles com trade
+        prices = fast['close'].to_numpy()[idx].tolist()
+        timestamps = _box_timestamps(df.index[idx])
+        buy_reason = f"[Custom] {self.name} - Regra de Compra"
+        sell_reason = f"[Custom] {self.name} - Regra de Venda"
+        
+        for price, timestamp, buy in zip(prices, timestamps, is_buy.tolist()):
+            trades.append({
+                "action": "BUY" if buy else "SELL",
+                "price": price,
+                "amount": 0,  # Será ajustado pelo portfolio
+                "timestamp": timestamp,
+                "coin": coin,
+                "reason": buy_reason if buy else sell_reason
+            })
         
         return trades
     
+    def apply_many(
+        self,
+        dfs: Dict[str, pd.DataFrame],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Aplica a estratégia em várias moedas em paralelo (uma thread por df).
+        
+        Os kernels numba e boa parte do pandas/NumPy liberam o GIL, então
+        cada moeda roda seu pipeline numérico num núcleo.
+        
+        Args:
+            dfs: {par: DataFrame OHLCV}
+            max_workers: Threads (padrão: núcleos da máquina)
+        
+        Returns:
+            {par: lista de trades}
+        """
+        if not dfs:
+            return {}
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(dfs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {coin: pool.submit(self.apply, df, coin) for coin, df in dfs.items()}
+            return {coin: future.result() for coin, future in futures.items()}
+    
     def get_total_rules_count(self) -> tuple:
         """Retorna contagem total de regras (buy, sell)."""
         buy_count = sum(len(g.get("rules", [])) for g in self.buy_groups)
@@ -4,9 +4,29 @@ Donchian Channel Breakout Strategy - Rompimento de máximas/mínimas.
 Estratégia usada pelos lendários Turtle Traders nos anos 80.
 """
 
+import numpy as np
 import pandas as pd
 from typing import List, Dict
-from .base import BaseStrategy
+from .base import BaseStrategy, _frame_cache
+from ._kernels import rolling_max, rolling_min
+
+
+def _rolling_extreme(df: pd.DataFrame, column: str, period: int) -> np.ndarray:
+    """
+    Máxima móvel de 'high' / mínima móvel de 'low', memoizada por df.
+    
+    Fica no cache por DataFrame da base (_frame_cache): varreduras de
+    parâmetros/moedas sobre o mesmo df reaproveitam as janelas.
+    """
+    windows = _frame_cache(df)
+    key = ('donchian', column, period)
+    values = windows.get(key)
+    if values is None:
+        rolling = rolling_max if column == "high" else rolling_min
+        values = rolling(df[column], period)
+        values.flags.writeable = False  # compartilhado entre chamadas
+        windows[key] = values
+    return values
 
 
 class DonchianBreakoutStrategy(BaseStrategy):
@@ -80,6 +100,7 @@ Os Turtles usavam período de **20 dias para entrada** e **10 dias para saída**
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia Donchian Breakout."""
         
+        df = self._as_pandas(df)
         p = self.validate_params(**params)
         entry_period = p["entry_period"]
         exit_period = p["exit_period"]
@@ -87,59 +108,62 @@ Os Turtles usavam período de **20 dias para entrada** e **10 dias para saída**
         trades = []
         in_position = False
         
-        df = df.copy()
-        
-        # Calcula canais de Donchian
+        # Calcula canais de Donchian (memoizados por df, sem copiar o df)
         # Entry channel (mais largo)
-        df['donchian_high'] = df['high'].rolling(window=entry_period).max()
-        df['donchian_low'] = df['low'].rolling(window=entry_period).min()
+        donchian_high = _rolling_extreme(df, 'high', entry_period)
+        donchian_low = _rolling_extreme(df, 'low', entry_period)
         
         # Exit channel (mais estreito)
-        df['exit_high'] = df['high'].rolling(window=exit_period).max()
-        df['exit_low'] = df['low'].rolling(window=exit_period).min()
+        exit_low = _rolling_extreme(df, 'low', exit_period)
         
-        for i in range(max(entry_period, exit_period) + 1, len(df)):
-            price = df['close'].iloc[i]
-            high = df['high'].iloc[i]
-            low = df['low'].iloc[i]
-            
-            # Usamos valores do período ANTERIOR para evitar look-ahead bias
-            prev_donchian_high = df['donchian_high'].iloc[i-1]
-            prev_donchian_low = df['donchian_low'].iloc[i-1]
-            prev_exit_low = df['exit_low'].iloc[i-1]
-            
-            ts = df.index[i]
-            
-            # Skip NaN
-            if pd.isna(prev_donchian_high) or pd.isna(prev_donchian_low):
-                continue
-            
+        close_a = df['close'].to_numpy()
+        high_a = df['high'].to_numpy()
+        low_a = df['low'].to_numpy()
+        index = df.index
+        
+        # Valores do período ANTERIOR para evitar look-ahead bias
+        prev_donchian_high = np.concatenate(([np.nan], donchian_high[:-1]))
+        prev_donchian_low = np.concatenate(([np.nan], donchian_low[:-1]))
+        prev_exit_low = np.concatenate(([np.nan], exit_low[:-1]))
+        
+        # Sinais vetorizados (NaN compara como False); skip NaN do canal de entrada
+        valid = ~(np.isnan(prev_donchian_high) | np.isnan(prev_donchian_low))
+        valid[:max(entry_period, exit_period) + 1] = False
+        # Breakout de alta: Preço rompe a máxima dos últimos N períodos
+        buy_signal = valid & (high_a > prev_donchian_high)
+        # Breakout de baixa: Preço rompe a mínima (usando exit period menor)
+        sell_signal = valid & (low_a < prev_exit_low)
+        
+        # Loop só nos candles com algum sinal (entrada e saída podem ocorrer no mesmo candle);
+        # o loop só resolve a posição, os dicts/textos saem depois
+        events = []
+        for i in np.flatnonzero(buy_signal | sell_signal).tolist():
             # === ENTRADA ===
-            # Breakout de alta: Preço rompe a máxima dos últimos N períodos
-            if not in_position:
-                if high > prev_donchian_high:
-                    trades.append({
-                        "action": "BUY",
-                        "price": price,
-                        "amount": 1.0,
-                        "coin": "Fixed",
-                        "timestamp": ts,
-                        "reason": f"🚀 Breakout! (High={high:.2f} > {entry_period}p Max={prev_donchian_high:.2f})"
-                    })
-                    in_position = True
+            if not in_position and buy_signal[i]:
+                events.append((i, True))
+                in_position = True
             
             # === SAÍDA ===
-            # Breakout de baixa: Preço rompe a mínima (usando exit period menor)
-            if in_position:
-                if low < prev_exit_low:
-                    trades.append({
-                        "action": "SELL",
-                        "price": price,
-                        "amount": 1.0,
-                        "coin": "Fixed",
-                        "timestamp": ts,
-                        "reason": f"📉 Exit (Low={low:.2f} < {exit_period}p Min={prev_exit_low:.2f})"
-                    })
-                    in_position = False
+            if in_position and sell_signal[i]:
+                events.append((i, False))
+                in_position = False
+        
+        # Templates com o período resolvido uma vez; só os valores por trade
+        buy_reason = "🚀 Breakout! (High={:.2f} > %dp Max={:.2f})" % entry_period
+        sell_reason = "📉 Exit (Low={:.2f} < %dp Min={:.2f})" % exit_period
+        
+        for i, is_buy in events:
+            if is_buy:
+                reason = buy_reason.format(high_a[i], prev_donchian_high[i])
+            else:
+                reason = sell_reason.format(low_a[i], prev_exit_low[i])
+            trades.append({
+                "action": "BUY" if is_buy else "SELL",
+                "price": close_a[i],
+                "amount": 1.0,
+                "coin": "Fixed",
+                "timestamp": index[i],
+                "reason": reason
+            })
         
         return trades
@@ -4,9 +4,76 @@ EMA + RSI Combo Strategy - Estratégia híbrida que combina tendência e momentu
 Filtra sinais falsos exigindo confirmação de tendência E momentum.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-from .base import BaseStrategy
+from typing import Any, Dict, List, Mapping
+from src.core._njit import njit
+from .base import BaseStrategy, _column_array, _ema_array
+
+
+# Tipos de evento devolvidos por _ema_rsi_combo_loop
+_ENTRY, _RECOVERY, _TREND_REVERSAL, _TAKE_PROFIT = 0, 1, 2, 3
+
+
+@njit('Tuple((i8[:], i1[:]))(f8[:], f8[:], f8[:], f8, f8)', cache=True, nogil=True, boundscheck=False)
+def _ema_rsi_combo_loop(close, ema, rsi, rsi_overbought, rsi_oversold):
+    """
+    Máquina de estados da estratégia (compilada com numba quando disponível).
+    
+    Entrada e saída podem ocorrer no mesmo candle, então não dá para usar
+    resolve_positions: o loop segue a ordem compra -> venda de cada candle.
+    
+    Returns:
+        (idx, kind): candle e tipo de cada evento (_ENTRY, _RECOVERY, ...)
+    """
+    n = close.shape[0]
+    idx = np.empty(n * 2, dtype=np.int64)
+    kind = np.empty(n * 2, dtype=np.int8)
+    n_events = 0
+    in_position = False
+    
+    for i in range(1, n):
+        price = close[i]
+        prev_price = close[i - 1]
+        
+        # Skip NaN
+        if np.isnan(ema[i]) or np.isnan(rsi[i]) or np.isnan(ema[i - 1]):
+            continue
+        
+        # === CONDIÇÕES DE COMPRA ===
+        if not in_position:
+            ema_crossover_up = prev_price <= ema[i - 1] and price > ema[i]
+            rsi_recovery = rsi[i] > rsi_oversold and rsi[i - 1] <= rsi_oversold
+            
+            # Entrada principal: Cruzamento de EMA + RSI não sobrecomprado
+            if ema_crossover_up and rsi[i] < rsi_overbought:
+                idx[n_events] = i
+                kind[n_events] = _ENTRY
+                n_events += 1
+                in_position = True
+            # Entrada secundária: Em tendência de alta + RSI saindo de sobrevenda
+            elif price > ema[i] and rsi_recovery:
+                idx[n_events] = i
+                kind[n_events] = _RECOVERY
+                n_events += 1
+                in_position = True
+        
+        # === CONDIÇÕES DE VENDA ===
+        if in_position:
+            # Saída 1: Preço cruzou EMA para baixo (tendência reverteu)
+            if prev_price >= ema[i - 1] and price < ema[i]:
+                idx[n_events] = i
+                kind[n_events] = _TREND_REVERSAL
+                n_events += 1
+                in_position = False
+            # Saída 2: RSI atingiu sobrecompra (take profit)
+            elif rsi[i] >= rsi_overbought:
+                idx[n_events] = i
+                kind[n_events] = _TAKE_PROFIT
+                n_events += 1
+                in_position = False
+    
+    return idx[:n_events], kind[:n_events]
 
 
 class EMARSIComboStrategy(BaseStrategy):
@@ -90,108 +157,52 @@ Esta estratégia é excelente para **Day Trading** em timeframe de 1h. Os filtro
         }
     }
     
+    required_columns = ('close', 'rsi')
+    
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia EMA + RSI Combo."""
-        
-        p = self.validate_params(**params)
-        ema_period = p["ema_period"]
-        rsi_overbought = p["rsi_overbought"]
-        rsi_oversold = p["rsi_oversold"]
-        
-        trades = []
-        in_position = False
-        entry_price = 0
-        
-        # Prepara dados
-        df = df.copy()
-        
-        # Tenta usar EMA existente ou calcula
+        return self.apply_batch(df, **params).to_records()
+    
+    @staticmethod
+    def _ema_column(df: pd.DataFrame, ema_period: int) -> str:
+        """Coluna EMA usada: a do período, senão a primeira 'ema*' do df."""
         ema_col = f'ema{ema_period}'
-        if ema_col not in df.columns:
-            # Tenta usar outra EMA próxima
-            available = [c for c in df.columns if c.startswith('ema')]
-            if available:
-                ema_col = available[0]  # Usa a primeira disponível
+        if ema_col in df.columns:
+            return ema_col
+        # Tenta usar outra EMA próxima (para na primeira encontrada)
+        return next((c for c in df.columns if c.startswith('ema')), ema_col)
+    
+    def _arrays(self, df: pd.DataFrame, p: Mapping[str, Any], shared=None):
+        arrays = super()._arrays(df, p, shared)
+        if arrays is None:
+            return None
+        # EMA existente ou calculada (como array local, sem copiar o df)
+        ema_col = self._ema_column(df, p["ema_period"])
+        if ema_col in df.columns:
+            arrays['ema'] = _column_array(df, ema_col, shared)
+        else:
+            arrays['ema'] = _ema_array(df, p["ema_period"], shared)
+        return arrays
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        # Cópias graváveis para o kernel (colunas do pandas podem ser read-only).
+        # NaN no meio da série continua sendo tratado dentro do kernel.
+        close, ema, rsi = (np.require(arrays[col], np.float64, ('C', 'W')) for col in ('close', 'ema', 'rsi'))
+        idx, kind = _ema_rsi_combo_loop(close, ema, rsi, float(p["rsi_overbought"]), float(p["rsi_oversold"]))
+        return idx, kind <= _RECOVERY, kind
+    
+    def _reasons(self, df, arrays, idx, is_buy, kind, p) -> list:
+        # Textos só para os eventos
+        ema_label = self._ema_column(df, p["ema_period"]).upper()
+        rsi_overbought = p["rsi_overbought"]
+        reasons = []
+        for value, k in zip(arrays['rsi'][idx].tolist(), kind.tolist()):
+            if k == _ENTRY:
+                reasons.append(f"EMA+RSI Entry (Price > {ema_label}, RSI={value:.0f})")
+            elif k == _RECOVERY:
+                reasons.append(f"RSI Recovery in Uptrend (RSI={value:.0f})")
+            elif k == _TREND_REVERSAL:
+                reasons.append(f"Trend Reversal (Price < {ema_label})")
             else:
-                df[ema_col] = df['close'].ewm(span=ema_period, adjust=False).mean()
-        
-        if 'rsi' not in df.columns:
-            return []
-        
-        for i in range(1, len(df)):
-            price = df['close'].iloc[i]
-            ema = df[ema_col].iloc[i]
-            rsi = df['rsi'].iloc[i]
-            prev_price = df['close'].iloc[i-1]
-            prev_ema = df[ema_col].iloc[i-1]
-            ts = df.index[i]
-            
-            # Skip NaN
-            if pd.isna(ema) or pd.isna(rsi) or pd.isna(prev_ema):
-                continue
-            
-            # === CONDIÇÕES DE COMPRA ===
-            # 1. Preço cruzou EMA para cima (ou está acima e RSI saiu de sobrevenda)
-            # 2. RSI não está sobrecomprado
-            
-            ema_crossover_up = prev_price <= prev_ema and price > ema
-            rsi_recovery = rsi > rsi_oversold and df['rsi'].iloc[i-1] <= rsi_oversold
-            
-            if not in_position:
-                # Entrada principal: Cruzamento de EMA + RSI não sobrecomprado
-                if ema_crossover_up and rsi < rsi_overbought:
-                    trades.append({
-                        "action": "BUY",
-                        "price": price,
-                        "amount": 1.0,
-                        "coin": "Fixed",
-                        "timestamp": ts,
-                        "reason": f"EMA+RSI Entry (Price > {ema_col.upper()}, RSI={rsi:.0f})"
-                    })
-                    in_position = True
-                    entry_price = price
-                
-                # Entrada secundária: Em tendência de alta + RSI saindo de sobrevenda
-                elif price > ema and rsi_recovery:
-                    trades.append({
-                        "action": "BUY",
-                        "price": price,
-                        "amount": 1.0,
-                        "coin": "Fixed",
-                        "timestamp": ts,
-                        "reason": f"RSI Recovery in Uptrend (RSI={rsi:.0f})"
-                    })
-                    in_position = True
-                    entry_price = price
-            
-            # === CONDIÇÕES DE VENDA ===
-            if in_position:
-                # Saída 1: Preço cruzou EMA para baixo (tendência reverteu)
-                ema_crossover_down = prev_price >= prev_ema and price < ema
-                
-                # Saída 2: RSI atingiu sobrecompra (take profit)
-                rsi_overbought_exit = rsi >= rsi_overbought
-                
-                if ema_crossover_down:
-                    trades.append({
-                        "action": "SELL",
-                        "price": price,
-                        "amount": 1.0,
-                        "coin": "Fixed",
-                        "timestamp": ts,
-                        "reason": f"Trend Reversal (Price < {ema_col.upper()})"
-                    })
-                    in_position = False
-                    
-                elif rsi_overbought_exit:
-                    trades.append({
-                        "action": "SELL",
-                        "price": price,
-                        "amount": 1.0,
-                        "coin": "Fixed",
-                        "timestamp": ts,
-                        "reason": f"Take Profit (RSI={rsi:.0f} ≥ {rsi_overbought})"
-                    })
-                    in_position = False
-        
-        return trades
+                reasons.append(f"Take Profit (RSI={value:.0f} ≥ {rsi_overbought})")
+        return reasons
@@ -4,9 +4,11 @@ Golden Cross / Death Cross Strategy - Cruzamento de EMAs de longo prazo.
 Estratégia clássica para identificar grandes ciclos de mercado.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-from .base import BaseStrategy
+from typing import Any, Dict, List, Mapping
+from .base import BaseStrategy, _ema_array
+from ._kernels import resolve_positions, interleave_positions, sign_crosses
 
 
 class GoldenCrossStrategy(BaseStrategy):
@@ -76,66 +78,34 @@ Combine com outras estratégias: Use Golden Cross para definir a direção e est
         }
     }
     
+    required_columns = ('close',)
+    
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia Golden Cross / Death Cross."""
+        return self.apply_batch(df, **params).to_records()
+    
+    def _arrays(self, df: pd.DataFrame, p: Mapping[str, Any], shared=None):
+        arrays = super()._arrays(df, p, shared)
+        if arrays is None:
+            return None
+        # EMAs existentes ou calculadas como arrays locais (sem copiar o df)
+        arrays['ema_fast'] = _ema_array(df, p["fast_period"], shared)
+        arrays['ema_slow'] = _ema_array(df, p["slow_period"], shared)
+        return arrays
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        # Cruzamento = troca de sinal de (EMA rápida - EMA lenta) entre dois
+        # candles (NaN compara como False: candles sem EMA nunca geram sinal)
+        # Golden Cross: EMA rápida cruza EMA lenta para cima
+        # Death Cross: EMA rápida cruza EMA lenta para baixo
+        golden_cross, death_cross = sign_crosses(arrays['ema_fast'] - arrays['ema_slow'])
         
-        p = self.validate_params(**params)
-        fast_period = p["fast_period"]
-        slow_period = p["slow_period"]
-        
-        trades = []
-        in_position = False
-        
-        # Tenta usar EMAs existentes ou calcula novas
-        df = df.copy()
-        
-        fast_col = f'ema{fast_period}'
-        slow_col = f'ema{slow_period}'
-        
-        # Calcula EMAs se não existirem
-        if fast_col not in df.columns:
-            df[fast_col] = df['close'].ewm(span=fast_period, adjust=False).mean()
-        if slow_col not in df.columns:
-            df[slow_col] = df['close'].ewm(span=slow_period, adjust=False).mean()
-        
-        for i in range(1, len(df)):
-            fast_ema = df[fast_col].iloc[i]
-            slow_ema = df[slow_col].iloc[i]
-            prev_fast = df[fast_col].iloc[i-1]
-            prev_slow = df[slow_col].iloc[i-1]
-            price = df['close'].iloc[i]
-            ts = df.index[i]
-            
-            # Skip NaN
-            if pd.isna(fast_ema) or pd.isna(slow_ema) or pd.isna(prev_fast) or pd.isna(prev_slow):
-                continue
-            
-            # Golden Cross: EMA rápida cruza EMA lenta para cima
-            golden_cross = prev_fast <= prev_slow and fast_ema > slow_ema
-            
-            if golden_cross and not in_position:
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"✨ Golden Cross (EMA{fast_period} > EMA{slow_period})"
-                })
-                in_position = True
-            
-            # Death Cross: EMA rápida cruza EMA lenta para baixo
-            death_cross = prev_fast >= prev_slow and fast_ema < slow_ema
-            
-            if death_cross and in_position:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"💀 Death Cross (EMA{fast_period} < EMA{slow_period})"
-                })
-                in_position = False
-        
-        return trades
+        idx, is_buy = interleave_positions(*resolve_positions(golden_cross, death_cross))
+        idx += 1  # máscaras começam no segundo candle
+        return idx, is_buy, None
+    
+    def _reasons(self, df, arrays, idx, is_buy, detail, p) -> list:
+        fast_period, slow_period = p["fast_period"], p["slow_period"]
+        buy_reason = f"✨ Golden Cross (EMA{fast_period} > EMA{slow_period})"
+        sell_reason = f"💀 Death Cross (EMA{fast_period} < EMA{slow_period})"
+        return np.where(is_buy, buy_reason, sell_reason)
@@ -4,9 +4,11 @@ MACD Crossover Strategy - Momentum baseado em cruzamento MACD/Signal.
 Uma das estratégias mais clássicas e comprovadas do mercado.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-from .base import BaseStrategy
+from typing import Any, Dict, List, Mapping
+from .base import BaseStrategy, _column_array
+from ._kernels import resolve_positions, interleave_positions, sign_crosses
 
 
 class MACDCrossoverStrategy(BaseStrategy):
@@ -64,67 +66,38 @@ Use o histograma como confirmação: barras crescentes confirmam força do movim
         }
     }
     
+    required_columns = ('macd', 'macd_signal')
+    
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia de MACD Crossover."""
+        return self.apply_batch(df, **params).to_records()
+    
+    def _arrays(self, df: pd.DataFrame, p: Mapping[str, Any], shared=None):
+        arrays = super()._arrays(df, p, shared)
+        # Histograma: só é lido quando o filtro está ativo (sem a coluna,
+        # _scan usa o próprio MACD - Signal)
+        if arrays is not None and p["require_positive_histogram"] == 1 and 'macd_hist' in df.columns:
+            arrays['macd_hist'] = _column_array(df, 'macd_hist', shared)
+        return arrays
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        # Cruzamento = troca de sinal de MACD - Signal entre dois candles
+        # (NaN compara como False: candles sem MACD nunca geram sinal)
+        diff = arrays['macd'] - arrays['macd_signal']
+        # Buy: MACD cruza Signal para cima / Sell: MACD cruza Signal para baixo
+        buy_mask, sell_mask = sign_crosses(diff)
+        if p["require_positive_histogram"] == 1:
+            # Filtro opcional de histograma
+            hist = arrays.get('macd_hist', diff)
+            buy_mask &= ~(hist[1:] <= 0)
         
-        p = self.validate_params(**params)
-        require_hist = p["require_positive_histogram"] == 1
-        
-        trades = []
-        in_position = False
-        
-        # Verifica se MACD existe
-        if 'macd' not in df.columns or 'macd_signal' not in df.columns:
-            return []
-        
-        # Calcula histograma se não existir
-        if 'macd_hist' not in df.columns:
-            df = df.copy()
-            df['macd_hist'] = df['macd'] - df['macd_signal']
-        
-        for i in range(1, len(df)):
-            macd = df['macd'].iloc[i]
-            signal = df['macd_signal'].iloc[i]
-            prev_macd = df['macd'].iloc[i-1]
-            prev_signal = df['macd_signal'].iloc[i-1]
-            hist = df['macd_hist'].iloc[i]
-            price = df['close'].iloc[i]
-            ts = df.index[i]
-            
-            # Skip NaN
-            if pd.isna(macd) or pd.isna(signal) or pd.isna(prev_macd) or pd.isna(prev_signal):
-                continue
-            
-            # Buy: MACD cruza Signal para cima
-            crossover_up = prev_macd <= prev_signal and macd > signal
-            
-            if crossover_up and not in_position:
-                # Filtro opcional de histograma
-                if require_hist and hist <= 0:
-                    continue
-                    
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"MACD Crossover ↑ (MACD={macd:.2f} > Signal={signal:.2f})"
-                })
-                in_position = True
-            
-            # Sell: MACD cruza Signal para baixo
-            crossover_down = prev_macd >= prev_signal and macd < signal
-            
-            if crossover_down and in_position:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"MACD Crossover ↓ (MACD={macd:.2f} < Signal={signal:.2f})"
-                })
-                in_position = False
-        
-        return trades
+        idx, is_buy = interleave_positions(*resolve_positions(buy_mask, sell_mask))
+        idx += 1  # máscaras começam no segundo candle
+        return idx, is_buy, None
+    
+    def _reasons(self, df, arrays, idx, is_buy, detail, p) -> list:
+        return [
+            f"MACD Crossover ↑ (MACD={m:.2f} > Signal={sg:.2f})" if buy
+            else f"MACD Crossover ↓ (MACD={m:.2f} < Signal={sg:.2f})"
+            for m, sg, buy in zip(arrays['macd'][idx].tolist(), arrays['macd_signal'][idx].tolist(), is_buy.tolist())
+        ]
@@ -4,9 +4,11 @@ MACD + RSI Combo Strategy - Confluência de dois indicadores clássicos.
 Só entra quando MACD e RSI concordam, reduzindo sinais falsos.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import Any, Dict, List, Mapping
 from .base import BaseStrategy
+from ._kernels import resolve_positions, interleave_positions, sign_crosses
 
 
 class MACDRSIComboStrategy(BaseStrategy):
@@ -73,65 +75,36 @@ Esta estratégia exige **confluência** entre dois indicadores clássicos:
         }
     }
     
+    required_columns = ('macd', 'macd_signal', 'rsi')
+    
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia MACD + RSI Combo."""
+        return self.apply_batch(df, **params).to_records()
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        # Não é preciso testar NaN candle a candle: toda comparação com NaN
+        # é falsa, então NaN não gera cruzamento nem trade
+        curr_rsi = arrays['rsi'][1:]
         
-        p = self.validate_params(**params)
-        rsi_max_buy = p["rsi_max_buy"]
-        rsi_min_sell = p["rsi_min_sell"]
-        
-        trades = []
-        in_position = False
-        
-        # Verifica indicadores necessários
-        if 'macd' not in df.columns or 'macd_signal' not in df.columns:
-            return []
-        if 'rsi' not in df.columns:
-            return []
+        # MACD Crossovers
+        macd_cross_up, macd_cross_down = sign_crosses(arrays['macd'] - arrays['macd_signal'])
         
-        for i in range(1, len(df)):
-            macd = df['macd'].iloc[i]
-            signal = df['macd_signal'].iloc[i]
-            prev_macd = df['macd'].iloc[i-1]
-            prev_signal = df['macd_signal'].iloc[i-1]
-            rsi = df['rsi'].iloc[i]
-            price = df['close'].iloc[i]
-            ts = df.index[i]
-            
-            # Skip NaN
-            if pd.isna(macd) or pd.isna(signal) or pd.isna(rsi):
-                continue
-            if pd.isna(prev_macd) or pd.isna(prev_signal):
-                continue
-            
-            # MACD Crossovers
-            macd_cross_up = prev_macd <= prev_signal and macd > signal
-            macd_cross_down = prev_macd >= prev_signal and macd < signal
-            
-            # === COMPRA ===
-            # MACD cruza para cima + RSI não está sobrecomprado
-            if macd_cross_up and rsi < rsi_max_buy and not in_position:
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"🔗 MACD↑ + RSI OK ({rsi:.0f} < {rsi_max_buy})"
-                })
-                in_position = True
-            
-            # === VENDA ===
-            # MACD cruza para baixo + RSI não está sobrevendido
-            elif macd_cross_down and rsi > rsi_min_sell and in_position:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"🔗 MACD↓ + RSI OK ({rsi:.0f} > {rsi_min_sell})"
-                })
-                in_position = False
+        # === COMPRA ===
+        # MACD cruza para cima + RSI não está sobrecomprado
+        buy_mask = macd_cross_up & (curr_rsi < p["rsi_max_buy"])
+        # === VENDA ===
+        # MACD cruza para baixo + RSI não está sobrevendido
+        sell_mask = macd_cross_down & (curr_rsi > p["rsi_min_sell"])
         
-        return trades
+        # Compra só fora de posição, vende só em posição
+        idx, is_buy = interleave_positions(*resolve_positions(buy_mask, sell_mask))
+        idx += 1  # máscaras começam no segundo candle
+        return idx, is_buy, None
+    
+    def _reasons(self, df, arrays, idx, is_buy, detail, p) -> list:
+        rsi_max_buy, rsi_min_sell = p["rsi_max_buy"], p["rsi_min_sell"]
+        return [
+            f"🔗 MACD↑ + RSI OK ({value:.0f} < {rsi_max_buy})" if buy
+            else f"🔗 MACD↓ + RSI OK ({value:.0f} > {rsi_min_sell})"
+            for value, buy in zip(arrays['rsi'][idx].tolist(), is_buy.tolist())
+        ]
@@ -4,9 +4,67 @@ RSI Reversal Strategy - Reversão à Média baseada em RSI.
 Compra quando RSI indica sobrevendido, vende quando sobrecomprado.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-from .base import BaseStrategy
+from typing import Any, Dict, Iterable, List, Mapping
+from src.core._njit import njit, prange
+from .base import BaseStrategy, TradeBatch
+from ._kernels import resolve_positions, interleave_positions
+
+
+@njit('i8(f8[:], f8, f8, i8[:], b1)', cache=True, nogil=True, boundscheck=False)
+def _rsi_reversal_scan(rsi, rsi_buy, rsi_sell, out, write):
+    """
+    Varredura sequencial de um par (rsi_buy, rsi_sell).
+    
+    Conta os trades (BUY/SELL alternados, começando por BUY) e, se `write`,
+    grava os candles em `out`.
+    """
+    n_events = 0
+    in_position = False
+    for i in range(1, rsi.shape[0]):
+        prev_rsi = rsi[i - 1]
+        curr_rsi = rsi[i]
+        if not in_position:
+            hit = prev_rsi < rsi_buy and curr_rsi >= rsi_buy
+        else:
+            hit = prev_rsi > rsi_sell and curr_rsi <= rsi_sell
+        if hit:
+            if write:
+                out[n_events] = i
+            n_events += 1
+            in_position = not in_position
+    return n_events
+
+
+@njit('i8[:](f8[:], f8[:], f8[:])', parallel=True, cache=True, nogil=True)
+def _rsi_reversal_batch(rsi, rsi_buys, rsi_sells):
+    """
+    Varredura de vários pares de limiares, um por thread (prange).
+    
+    O mesmo array de RSI é lido por todas as combinações (fica no cache).
+    Duas passadas (contagem, depois escrita) para alocar só o necessário.
+    
+    Returns:
+        offsets (n_params + 1) seguidos dos candles de todas as combinações:
+        os trades da combinação k são out[n+1 + offsets[k] : n+1 + offsets[k+1]].
+    """
+    n_params = rsi_buys.shape[0]
+    dummy = np.empty(0, dtype=np.int64)
+    counts = np.empty(n_params, dtype=np.int64)
+    for k in prange(n_params):
+        counts[k] = _rsi_reversal_scan(rsi, rsi_buys[k], rsi_sells[k], dummy, False)
+    
+    offsets = np.zeros(n_params + 1, dtype=np.int64)
+    for k in range(n_params):
+        offsets[k + 1] = offsets[k] + counts[k]
+    
+    out = np.empty(n_params + 1 + offsets[n_params], dtype=np.int64)
+    out[:n_params + 1] = offsets
+    for k in prange(n_params):
+        start = n_params + 1 + offsets[k]
+        _rsi_reversal_scan(rsi, rsi_buys[k], rsi_sells[k], out[start:start + counts[k]], True)
+    return out
 
 
 class RSIReversalStrategy(BaseStrategy):
@@ -56,53 +114,57 @@ class RSIReversalStrategy(BaseStrategy):
         }
     }
     
+    required_columns = ('rsi',)
+    
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia de RSI Reversal."""
+        return self.apply_batch(df, **params).to_records()
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        rsi = arrays['rsi']
+        prev_rsi, curr_rsi = rsi[:-1], rsi[1:]
         
-        # Valida parâmetros
-        p = self.validate_params(**params)
-        rsi_buy = p["rsi_buy"]
-        rsi_sell = p["rsi_sell"]
-        
-        trades = []
-        in_position = False
+        # Cruzamentos vetorizados (comparações com NaN dão False, então
+        # candles sem RSI nunca geram sinal)
+        # Buy: RSI cruza o limiar inferior para cima (reversão de sobrevendido)
+        buy_mask = (prev_rsi < p["rsi_buy"]) & (curr_rsi >= p["rsi_buy"])
+        # Sell: RSI cruza o limiar superior para baixo (reversão de sobrecomprado)
+        sell_mask = (prev_rsi > p["rsi_sell"]) & (curr_rsi <= p["rsi_sell"])
         
-        # Verifica se RSI existe no DataFrame
+        # Alternância BUY/SELL só nos candles com cruzamento
+        idx, is_buy = interleave_positions(*resolve_positions(buy_mask, sell_mask))
+        idx += 1  # máscaras começam no segundo candle
+        return idx, is_buy, None
+    
+    def _reasons(self, df, arrays, idx, is_buy, detail, p) -> list:
+        rsi_buy, rsi_sell = p["rsi_buy"], p["rsi_sell"]
+        return [
+            f"RSI Reversal ↑ ({value:.1f} > {rsi_buy})" if buy else f"RSI Reversal ↓ ({value:.1f} < {rsi_sell})"
+            for value, buy in zip(arrays['rsi'][idx].tolist(), is_buy.tolist())
+        ]
+    
+    def apply_grid(self, df: pd.DataFrame, param_grid: Iterable[Dict[str, Any]]) -> List[List[Dict]]:
+        """Varredura de parâmetros num único kernel paralelo (uma thread por combinação)."""
+        validated = [self._validated_params(params) for params in param_grid]
         if 'rsi' not in df.columns:
+            return [[] for _ in validated]
+        if not validated:
             return []
         
-        for i in range(1, len(df)):
-            curr_rsi = df['rsi'].iloc[i]
-            prev_rsi = df['rsi'].iloc[i-1]
-            price = df['close'].iloc[i]
-            ts = df.index[i]
-            
-            # Skip se RSI for NaN
-            if pd.isna(curr_rsi) or pd.isna(prev_rsi):
-                continue
-            
-            # Buy: RSI cruza o limiar inferior para cima (reversão de sobrevendido)
-            if prev_rsi < rsi_buy and curr_rsi >= rsi_buy and not in_position:
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"RSI Reversal ↑ ({curr_rsi:.1f} > {rsi_buy})"
-                })
-                in_position = True
-            
-            # Sell: RSI cruza o limiar superior para baixo (reversão de sobrecomprado)
-            elif prev_rsi > rsi_sell and curr_rsi <= rsi_sell and in_position:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"RSI Reversal ↓ ({curr_rsi:.1f} < {rsi_sell})"
-                })
-                in_position = False
+        rsi = df['rsi'].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        rsi_buys = np.array([p["rsi_buy"] for p in validated], dtype=np.float64)
+        rsi_sells = np.array([p["rsi_sell"] for p in validated], dtype=np.float64)
+        
+        first = self._first_valid(rsi)
+        out = _rsi_reversal_batch(rsi[first:], rsi_buys, rsi_sells)
+        n_params = len(validated)
+        offsets = out[:n_params + 1]
+        events = out[n_params + 1:]
         
-        return trades
+        results = []
+        for k, p in enumerate(validated):
+            idx = events[offsets[k]:offsets[k + 1]] + first
+            is_buy = np.arange(len(idx)) % 2 == 0  # alternados, começando por BUY
+            reasons = self._reasons(df, {'rsi': rsi}, idx, is_buy, None, p)
+            results.append(TradeBatch.from_events(df, idx, is_buy, reasons).to_records())
+        return results
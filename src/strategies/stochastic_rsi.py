@@ -6,10 +6,82 @@ Combina Stochastic Oscillator com RSI para sinais mais rápidos.
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict
+from typing import Any, Dict, List, Mapping
+from src.core._njit import njit
 from .base import BaseStrategy
 
 
+@njit('Tuple((i8[:], b1[:], f8[:]))(f8[:], i8, f8, f8)', cache=True, nogil=True, boundscheck=False)
+def _stoch_rsi_events(rsi, period, oversold, overbought):
+    """
+    Stochastic RSI e sinais numa única passada (compilada com numba).
+    
+    Mín./máx. móveis do RSI com filas monotônicas de índices (mesmo resultado
+    de rolling(period).min()/max(): NaN até a janela encher e em janelas com
+    NaN); faixa zero vira NaN. Os cruzamentos e a posição saem no mesmo loop.
+    
+    Returns:
+        (idx, is_buy, stoch): candle, lado e Stochastic RSI de cada trade
+    """
+    n = rsi.shape[0]
+    min_q = np.empty(n, dtype=np.int64)
+    max_q = np.empty(n, dtype=np.int64)
+    min_head = min_tail = max_head = max_tail = 0
+    last_nan = -period - 1
+    
+    idx = np.empty(n, dtype=np.int64)
+    is_buy = np.empty(n, dtype=np.bool_)
+    values = np.empty(n, dtype=np.float64)
+    n_events = 0
+    in_position = False
+    prev_stoch = np.nan
+    
+    for i in range(n):
+        x = rsi[i]
+        if np.isnan(x):
+            last_nan = i
+        else:
+            while min_tail > min_head and rsi[min_q[min_tail - 1]] >= x:
+                min_tail -= 1
+            min_q[min_tail] = i
+            min_tail += 1
+            while max_tail > max_head and rsi[max_q[max_tail - 1]] <= x:
+                max_tail -= 1
+            max_q[max_tail] = i
+            max_tail += 1
+        while min_tail > min_head and min_q[min_head] <= i - period:
+            min_head += 1
+        while max_tail > max_head and max_q[max_head] <= i - period:
+            max_head += 1
+        
+        stoch = np.nan
+        if i >= period - 1 and last_nan <= i - period:
+            rsi_min = rsi[min_q[min_head]]
+            rsi_range = rsi[max_q[max_head]] - rsi_min
+            # Evita divisão por zero
+            if rsi_range != 0:
+                stoch = ((x - rsi_min) / rsi_range) * 100
+        
+        if not (np.isnan(stoch) or np.isnan(prev_stoch)):
+            # Buy: Stoch RSI cruza oversold para cima
+            if prev_stoch < oversold and stoch >= oversold and not in_position:
+                idx[n_events] = i
+                is_buy[n_events] = True
+                values[n_events] = stoch
+                n_events += 1
+                in_position = True
+            # Sell: Stoch RSI cruza overbought para baixo
+            elif prev_stoch > overbought and stoch <= overbought and in_position:
+                idx[n_events] = i
+                is_buy[n_events] = False
+                values[n_events] = stoch
+                n_events += 1
+                in_position = False
+        prev_stoch = stoch
+    
+    return idx[:n_events], is_buy[:n_events], values[:n_events]
+
+
 class StochasticRSIStrategy(BaseStrategy):
     """
     Estratégia usando Stochastic RSI - versão mais sensível do RSI.
@@ -80,63 +152,20 @@ Use em conjunto com EMA para filtrar: só compre se preço > EMA.
         }
     }
     
+    required_columns = ('rsi',)
+    
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia Stochastic RSI."""
-        
-        p = self.validate_params(**params)
-        stoch_period = p["stoch_period"]
-        oversold = p["oversold"]
-        overbought = p["overbought"]
-        
-        trades = []
-        in_position = False
-        
-        if 'rsi' not in df.columns:
-            return []
-        
-        df = df.copy()
-        
-        # Calcula Stochastic RSI
-        rsi_min = df['rsi'].rolling(window=stoch_period).min()
-        rsi_max = df['rsi'].rolling(window=stoch_period).max()
-        
-        # Evita divisão por zero
-        rsi_range = rsi_max - rsi_min
-        rsi_range = rsi_range.replace(0, np.nan)
-        
-        df['stoch_rsi'] = ((df['rsi'] - rsi_min) / rsi_range) * 100
-        
-        for i in range(1, len(df)):
-            stoch = df['stoch_rsi'].iloc[i]
-            prev_stoch = df['stoch_rsi'].iloc[i-1]
-            price = df['close'].iloc[i]
-            ts = df.index[i]
-            
-            if pd.isna(stoch) or pd.isna(prev_stoch):
-                continue
-            
-            # Buy: Stoch RSI cruza oversold para cima
-            if prev_stoch < oversold and stoch >= oversold and not in_position:
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"StochRSI ↑ ({stoch:.1f} > {oversold})"
-                })
-                in_position = True
-            
-            # Sell: Stoch RSI cruza overbought para baixo
-            elif prev_stoch > overbought and stoch <= overbought and in_position:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"StochRSI ↓ ({stoch:.1f} < {overbought})"
-                })
-                in_position = False
-        
-        return trades
+        return self.apply_batch(df, **params).to_records()
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        # Cópia gravável para o kernel (colunas do pandas podem ser read-only)
+        rsi = np.require(arrays['rsi'], np.float64, ('C', 'W'))
+        return _stoch_rsi_events(rsi, p["stoch_period"], float(p["oversold"]), float(p["overbought"]))
+    
+    def _reasons(self, df, arrays, idx, is_buy, stoch, p) -> list:
+        oversold, overbought = p["oversold"], p["overbought"]
+        return [
+            f"StochRSI ↑ ({value:.1f} > {oversold})" if buy else f"StochRSI ↓ ({value:.1f} < {overbought})"
+            for buy, value in zip(is_buy.tolist(), stoch.tolist())
+        ]
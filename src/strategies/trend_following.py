@@ -4,9 +4,63 @@ Trend Following Strategy - Seguidor de Tendência baseado em EMA.
 Compra quando preço cruza a EMA para cima, vende quando cruza para baixo.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-from .base import BaseStrategy
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from src.core._njit import njit
+from .base import BaseStrategy, _column_array
+from ._kernels import interleave_positions
+
+
+@lru_cache(maxsize=256)
+def _resolve_ema_column(columns: Tuple[Any, ...], ema_period: int) -> Optional[str]:
+    """
+    Resolve a coluna EMA por (colunas do df, período).
+    
+    Memoizada: numa varredura de parâmetros o mesmo df é avaliado milhares
+    de vezes e a busca pelas colunas 'ema*' só roda uma vez por período.
+    """
+    col_name = f'ema{ema_period}'
+    if col_name in columns:
+        return col_name
+    # Tenta usar a primeira EMA disponível (para na primeira encontrada)
+    return next((c for c in columns if isinstance(c, str) and c.startswith('ema')), None)
+
+
+@njit('Tuple((i8[:], i8[:]))(f8[:], f8[:])', cache=True, nogil=True, boundscheck=False)
+def _trend_loop(close, ema):
+    """
+    Cruzamentos preço/EMA e alternância de posição numa única passada.
+    
+    Sem máscaras intermediárias: cada candle compara com o anterior e já
+    decide compra/venda sem desvios: comparações com NaN são falsas, então
+    NaN no preço ou na EMA nunca cruza (sem teste de NaN nem `continue`).
+    
+    Returns:
+        (entries, exits): candles de compra e de venda (intercalados,
+        começando por compra)
+    """
+    n = close.shape[0]
+    entries = np.empty(n, dtype=np.int64)
+    exits = np.empty(n, dtype=np.int64)
+    n_entries = 0
+    n_exits = 0
+    state = 0
+    
+    for i in range(1, n):
+        # Crossover Up / Down: Preço cruza a EMA (comparações sem curto-circuito)
+        up = int(close[i - 1] < ema[i - 1]) & int(close[i] > ema[i])
+        down = int(close[i - 1] > ema[i - 1]) & int(close[i] < ema[i])
+        # Compra só fora de posição, vende só em posição (como resolve_positions)
+        toggle = (up & (state ^ 1)) | (down & state)
+        entries[n_entries] = i
+        exits[n_exits] = i
+        n_entries += toggle & (state ^ 1)
+        n_exits += toggle & state
+        state ^= toggle
+    
+    return entries[:n_entries], exits[:n_exits]
 
 
 class TrendFollowingStrategy(BaseStrategy):
@@ -51,61 +105,36 @@ class TrendFollowingStrategy(BaseStrategy):
         }
     }
     
+    required_columns = ('close',)
+    
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia de Trend Following."""
-        
-        # Valida parâmetros
-        p = self.validate_params(**params)
-        ema_period = p["ema_period"]
-        
-        trades = []
-        in_position = False
-        
-        # Tenta encontrar a coluna EMA correspondente
-        col_name = f'ema{ema_period}'
-        
-        # Se não existir a EMA específica, tenta calcular ou usar alternativa
-        if col_name not in df.columns:
-            # Tenta usar EMA mais próxima disponível
-            available_emas = [c for c in df.columns if c.startswith('ema')]
-            if not available_emas:
-                return []
-            # Usa a primeira disponível
-            col_name = available_emas[0]
-        
-        for i in range(1, len(df)):
-            price = df['close'].iloc[i]
-            ema = df[col_name].iloc[i]
-            prev_price = df['close'].iloc[i-1]
-            prev_ema = df[col_name].iloc[i-1]
-            ts = df.index[i]
-            
-            # Skip se valores forem NaN
-            if pd.isna(ema) or pd.isna(prev_ema):
-                continue
-            
-            # Crossover Up: Preço cruza EMA para cima
-            if prev_price < prev_ema and price > ema and not in_position:
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"Trend ↑ (Price > {col_name.upper()})"
-                })
-                in_position = True
-            
-            # Crossover Down: Preço cruza EMA para baixo
-            elif prev_price > prev_ema and price < ema and in_position:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"Trend ↓ (Price < {col_name.upper()})"
-                })
-                in_position = False
-        
-        return trades
+        return self.apply_batch(df, **params).to_records()
+    
+    @staticmethod
+    def _ema_column(df: pd.DataFrame, ema_period: int):
+        """Coluna EMA usada: a do período, senão a primeira 'ema*' do df (None se não houver)."""
+        return _resolve_ema_column(tuple(df.columns), ema_period)
+    
+    def _arrays(self, df: pd.DataFrame, p: Mapping[str, Any], shared=None):
+        col_name = self._ema_column(df, p["ema_period"])
+        arrays = super()._arrays(df, p, shared) if col_name is not None else None
+        if arrays is not None:
+            arrays['ema'] = _column_array(df, col_name, shared)
+        return arrays
+    
+    def _events_key(self, df: pd.DataFrame, p: Mapping[str, Any]):
+        # Os trades só dependem da coluna EMA resolvida: períodos que caem na
+        # mesma coluna (ou chamadas repetidas) reaproveitam os eventos
+        return self._ema_column(df, p["ema_period"])
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
+        # Cópias graváveis para o kernel (colunas do pandas podem ser read-only)
+        close = np.require(arrays['close'], np.float64, ('C', 'W'))
+        ema = np.require(arrays['ema'], np.float64, ('C', 'W'))
+        idx, is_buy = interleave_positions(*_trend_loop(close, ema))
+        return idx, is_buy, None
+    
+    def _reasons(self, df, arrays, idx, is_buy, detail, p) -> list:
+        label = self._ema_column(df, p["ema_period"]).upper()
+        return np.where(is_buy, f"Trend ↑ (Price > {label})", f"Trend ↓ (Price < {label})")
@@ -6,8 +6,9 @@ Volume é o "combustível" das altas - sem volume, o preço não sustenta.
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict
+from typing import Any, Dict, List, Mapping
 from .base import BaseStrategy
+from ._kernels import resolve_events, interleave_positions, rolling_mean
 
 
 class VolumeBreakoutStrategy(BaseStrategy):
@@ -73,65 +74,47 @@ Volume alto em **resistência** = distribuição (bearish).
         }
     }
     
+    required_columns = ('open', 'close', 'volume')
+    
     def apply(self, df: pd.DataFrame, **params) -> List[Dict]:
         """Aplica estratégia Volume Breakout."""
-        
-        p = self.validate_params(**params)
-        volume_period = p["volume_period"]
+        return self.apply_batch(df, **params).to_records()
+    
+    def _arrays(self, df: pd.DataFrame, p: Mapping[str, Any], shared=None):
+        arrays = super()._arrays(df, p, shared)
+        if arrays is not None:
+            volume_period = p["volume_period"]
+            volume_ma = rolling_mean(arrays['volume'], volume_period)
+            # A varredura sempre começou em volume_period: a primeira média
+            # completa (candle volume_period - 1) não opera
+            volume_ma[:volume_period] = np.nan
+            arrays['volume_ma'] = volume_ma
+        return arrays
+    
+    def _scan(self, arrays: Dict[str, np.ndarray], p: Mapping[str, Any]):
         volume_mult = p["volume_multiplier"] / 10.0  # Converte de 20 para 2.0
         
-        trades = []
-        in_position = False
+        # Spike: volume acima de X vezes a média (média NaN nunca é spike)
+        spike = arrays['volume'] > arrays['volume_ma'] * volume_mult
         
-        if 'volume' not in df.columns:
-            return []
+        # Só os candles com spike (poucos) seguem: o resto não gera sinal
+        events = np.flatnonzero(spike)
+        close, open_ = arrays['close'][events], arrays['open'][events]
         
-        df = df.copy()
+        # Direção do candle em int8: +1 alta, -1 baixa, 0 doji (ou NaN)
+        direction = (close > open_).astype(np.int8) - (close < open_)
+        signal = direction != 0
         
-        # Calcula média móvel do volume
-        df['volume_ma'] = df['volume'].rolling(window=volume_period).mean()
-        df['volume_spike'] = df['volume'] > (df['volume_ma'] * volume_mult)
-        
-        # Identifica candles de alta e baixa
-        df['bullish'] = df['close'] > df['open']
-        df['bearish'] = df['close'] < df['open']
-        
-        for i in range(volume_period, len(df)):
-            spike = df['volume_spike'].iloc[i]
-            bullish = df['bullish'].iloc[i]
-            bearish = df['bearish'].iloc[i]
-            price = df['close'].iloc[i]
-            volume = df['volume'].iloc[i]
-            vol_ma = df['volume_ma'].iloc[i]
-            ts = df.index[i]
-            
-            if pd.isna(vol_ma) or not spike:
-                continue
-            
-            vol_ratio = volume / vol_ma if vol_ma > 0 else 0
-            
-            # Buy: Volume spike + candle bullish (fechou em alta)
-            if spike and bullish and not in_position:
-                trades.append({
-                    "action": "BUY",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"📊 Volume Spike Bullish ({vol_ratio:.1f}x média)"
-                })
-                in_position = True
-            
-            # Sell: Volume spike + candle bearish (fechou em baixa)
-            elif spike and bearish and in_position:
-                trades.append({
-                    "action": "SELL",
-                    "price": price,
-                    "amount": 1.0,
-                    "coin": "Fixed",
-                    "timestamp": ts,
-                    "reason": f"📊 Volume Spike Bearish ({vol_ratio:.1f}x média)"
-                })
-                in_position = False
-        
-        return trades
+        # Buy: spike + candle bullish (fechou em alta); Sell: spike + candle bearish
+        buy_idx, sell_idx = resolve_events(events[signal], direction[signal] > 0)
+        idx, is_buy = interleave_positions(buy_idx, sell_idx)
+        return idx, is_buy, None
+    
+    def _reasons(self, df, arrays, idx, is_buy, detail, p) -> list:
+        volume, volume_ma = arrays['volume'][idx], arrays['volume_ma'][idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vol_ratio = np.where(volume_ma > 0, volume / volume_ma, 0.0)
+        return [
+            f"📊 Volume Spike {'Bullish' if buy else 'Bearish'} ({ratio:.1f}x média)"
+            for buy, ratio in zip(is_buy.tolist(), vol_ratio.tolist())
+        ]
@@ -1,15 +1,45 @@
 # src/ui/__init__.py
-"""UI components for Streamlit app."""
+"""
+UI components for Streamlit app.
+
+Os módulos das abas são importados só quando a função é acessada
+(PEP 562): `from src.ui.tab_results import ...` não carrega de tabela as
+dependências das outras abas (ex: xgboost do ML Studio).
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .sidebar import render_sidebar
+    from .tab_trading import render_trading_tab
+    from .tab_ml_studio import render_ml_studio_tab
+    from .tab_strategies import render_strategies_tab
+    from .tab_results import render_results_tab
+
+
+# Função exportada -> submódulo que a define
+_LAZY = {
+    'render_sidebar': '.sidebar',
+    'render_trading_tab': '.tab_trading',
+    'render_ml_studio_tab': '.tab_ml_studio',
+    'render_strategies_tab': '.tab_strategies',
+    'render_results_tab': '.tab_results',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        # Próximos acessos não passam mais por aqui
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from .sidebar import render_sidebar
-from .tab_trading import render_trading_tab
-from .tab_ml_studio import render_ml_studio_tab
-from .tab_strategies import render_strategies_tab
-from .tab_results import render_results_tab
 
 __all__ = [
     'render_sidebar',
-    'render_trading_tab', 
+    'render_trading_tab',
     'render_ml_studio_tab',
     'render_strategies_tab',
     'render_results_tab'
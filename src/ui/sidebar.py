@@ -2,23 +2,72 @@
 Sidebar UI component for the trading application.
 """
 
-import os
 import json
+from datetime import datetime
+from pathlib import Path
+
 import streamlit as st
 
 from src.core.data_loader import load_data, COINS, COMMISSION
+from src.core.data_fetchers import AVAILABLE_DATA_SOURCES
+from src.core.portfolio import normalize_trade, replay_trades
+
+
+# Caminhos resolvidos uma vez no import (não a cada rerun)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+TRADES_PATH = PROJECT_ROOT / 'trades.json'
+LOGO_PATH = PROJECT_ROOT / 'image' / 'gastor.png'
+
+# Textos fixos da sidebar, montados uma vez (moedas e fontes não mudam em execução)
+_BASE_TICKER = {coin: coin.split('/', 1)[0] for coin in COINS}
+_SOURCE_LABELS = {key: f"{info['icon']} {info['name']}" for key, info in AVAILABLE_DATA_SOURCES.items()}
+
+
+def _json_default(obj):
+    """Timestamps no formato str() de sempre; o resto (ex: escalares NumPy) como float."""
+    if isinstance(obj, datetime):
+        return str(obj)
+    return float(obj)
+
+
+# orjson opcional (mais rápido; datetimes e escalares NumPy via _json_default)
+try:
+    import orjson
+
+    def _dumps_trades(trades) -> bytes:
+        # PASSTHROUGH_DATETIME: datetimes vão para _json_default (mesmo texto do json padrão)
+        return orjson.dumps(
+            trades,
+            default=_json_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+except ImportError:
+    def _dumps_trades(trades) -> bytes:
+        return json.dumps(trades, indent=2, default=_json_default).encode('utf-8')
 
 
 def save_trades() -> str:
-    """Salva trades em arquivo JSON."""
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'trades.json')
-    with open(filepath, 'w') as f:
-        trades_to_save = st.session_state.trades.copy()
-        for t in trades_to_save:
-            if 'timestamp' in t:
-                t['timestamp'] = str(t['timestamp'])
-        json.dump(trades_to_save, f, indent=2)
-    return filepath
+    """
+    Salva trades em arquivo JSON (sem alterar os trades da sessão).
+    
+    Chaves internas ('_action_code' etc., prefixo '_') ficam fora do arquivo.
+    """
+    trades = [{k: v for k, v in t.items() if not k.startswith('_')} for t in st.session_state.trades]
+    TRADES_PATH.write_bytes(_dumps_trades(trades))
+    return str(TRADES_PATH)
+
+
+@st.cache_data(show_spinner=False)
+def _logo_html(path: Path, mtime: float) -> str:
+    """
+    Tag <img> do logo em base64.
+    
+    Cacheada entre reruns (cada interação roda o script inteiro); `mtime`
+    entra na chave para trocar o logo sem reiniciar o app.
+    """
+    import base64
+    img_base64 = base64.b64encode(path.read_bytes()).decode()
+    return f'<img src="data:image/png;base64,{img_base64}" style="width: 100%; height: 100%; object-fit: contain;">'
 
 
 def render_sidebar():
@@ -27,15 +76,8 @@ def render_sidebar():
     with st.sidebar:
         # --- BRANDING ---
         # --- BRANDING ---
-        # Carrega imagem dinamicamente
-        logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'image', 'gastor.png')
-        img_base64 = ""
-        if os.path.exists(logo_path):
-            import base64
-            with open(logo_path, "rb") as image_file:
-                img_base64 = base64.b64encode(image_file.read()).decode()
-        
-        logo_html = f'<img src="data:image/png;base64,{img_base64}" style="width: 100%; height: 100%; object-fit: contain;">' if img_base64 else ""
+        # Logo em cache: só relê o arquivo se ele mudar
+        logo_html = _logo_html(LOGO_PATH, LOGO_PATH.stat().st_mtime) if LOGO_PATH.exists() else ""
 
         st.markdown(f"""
         <div style="text-align: left; padding: 10px 0; margin-bottom: 20px;">
@@ -115,10 +157,7 @@ def render_sidebar():
         st.session_state.selected_timeframe = selected_tf
         
         # Data source selector
-        from src.core.data_fetchers import AVAILABLE_DATA_SOURCES
-        
-        source_options = list(AVAILABLE_DATA_SOURCES.keys())
-        source_labels = [f"{AVAILABLE_DATA_SOURCES[k]['icon']} {AVAILABLE_DATA_SOURCES[k]['name']}" for k in source_options]
+        source_options = list(_SOURCE_LABELS)
         
         if 'data_source' not in st.session_state:
             st.session_state.data_source = "auto"
@@ -128,7 +167,7 @@ def render_sidebar():
         selected_source = st.selectbox(
             "Fonte de Dados",
             options=source_options,
-            format_func=lambda x: f"{AVAILABLE_DATA_SOURCES[x]['icon']} {AVAILABLE_DATA_SOURCES[x]['name']}",
+            format_func=_SOURCE_LABELS.__getitem__,
             index=selected_source_idx,
             key='data_source_widget',
             help="Escolha a fonte de dados. 'Automático' tenta todas até uma funcionar."
@@ -190,7 +229,7 @@ def render_sidebar():
             delta_val = f"{pnl_total:+.2f}%"
             
         st.metric("Saldo Disponível", f"${st.session_state.balance:,.2f}")
-        st.metric("Posição (Moedas)", f"{st.session_state.holdings:.4f} {selected_coin.split('/')[0]}")
+        st.metric("Posição (Moedas)", f"{st.session_state.holdings:.4f} {_BASE_TICKER[selected_coin]}")
         st.metric("Valor Total", f"${portfolio_value:,.2f}", delta=delta_val)
         
         st.divider()
@@ -207,15 +246,13 @@ def render_sidebar():
 
 def _load_trades_from_file(selected_coin: str):
     """Carrega trades de arquivo JSON."""
-    filepath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'trades.json')
-    
-    if os.path.exists(filepath):
+    if TRADES_PATH.exists():
         try:
-            with open(filepath, 'r') as f:
-                loaded_trades = json.load(f)
+            # Bytes: o arquivo é UTF-8 (orjson não escapa emojis), independente do locale
+            loaded_trades = json.loads(TRADES_PATH.read_bytes())
             
             if loaded_trades:
-                st.session_state.trades = loaded_trades
+                st.session_state.trades = [normalize_trade(t) for t in loaded_trades]
                 
                 trade_coin = loaded_trades[0].get('coin', COINS[0])
                 
@@ -236,30 +273,14 @@ def _load_trades_from_file(selected_coin: str):
                             st.error(f"Erro ao baixar dados: {e}")
                             st.stop()
 
-                # Recalcula Portfólio
-                st.session_state.balance = st.session_state.initial_balance
-                st.session_state.holdings = 0.0
-                st.session_state.avg_price = 0.0
+                # Recalcula Portfólio (laço compilado sobre os arrays dos trades)
+                balance, holdings, avg_price = replay_trades(
+                    loaded_trades, st.session_state.initial_balance, COMMISSION
+                )
                 
-                for t in loaded_trades:
-                    amt = float(t['amount'])
-                    prc = float(t['price'])
-                    if t['action'] == 'BUY':
-                        cost = amt * prc
-                        fee = cost * COMMISSION
-                        st.session_state.balance -= (cost + fee)
-                        
-                        current_val = st.session_state.holdings * st.session_state.avg_price
-                        new_val = amt * prc
-                        if (st.session_state.holdings + amt) > 0:
-                            st.session_state.avg_price = (current_val + new_val) / (st.session_state.holdings + amt)
-                        st.session_state.holdings += amt
-                        
-                    elif t['action'] == 'SELL':
-                        rev = amt * prc
-                        fee = rev * COMMISSION
-                        st.session_state.balance += (rev - fee)
-                        st.session_state.holdings -= amt
+                st.session_state.balance = balance
+                st.session_state.holdings = holdings
+                st.session_state.avg_price = avg_price
                 
                 st.toast("Trades carregados e portfólio atualizado!")
                 st.rerun()
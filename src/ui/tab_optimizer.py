@@ -10,7 +10,6 @@ import itertools
 from src.strategies import STRATEGIES
 from src.core.portfolio import adjust_trade_amounts, recalculate_portfolio, apply_risk_management
 from src.core.config import get_total_fee
-import copy
 
 def run_optimizer(df, strategies_to_test, param_steps=3, optimize_execution=False):
     """
@@ -25,6 +24,9 @@ def run_optimizer(df, strategies_to_test, param_steps=3, optimize_execution=Fals
          active_coin = st.session_state.trades[0].get('coin', 'SOL/USDT')
     fee_rate = get_total_fee(active_coin)
     
+    # Taxa usada pelo adjust_trade_amounts (moeda selecionada): calculada uma vez para todo o grid
+    sim_fee_rate = get_total_fee(st.session_state.get('sb_coin', 'SOL/USDT'))
+    
     # Define Grid de Execução
     if optimize_execution:
         # Testa variações de execução
@@ -86,7 +88,8 @@ def run_optimizer(df, strategies_to_test, param_steps=3, optimize_execution=Fals
                 sizing_method = exec_cfg['sizing']
                 
                 # Copy trades & Apply Risk Management (adds size_factor)
-                trades_for_sim = copy.deepcopy(base_trades)
+                # Cópia rasa por trade basta: os valores são escalares imutáveis
+                trades_for_sim = [dict(t) for t in base_trades]
                 trades_for_sim = apply_risk_management(trades_for_sim, df, sizing_method)
                 
                 # Usa saldo inicial do usuário
@@ -105,7 +108,8 @@ def run_optimizer(df, strategies_to_test, param_steps=3, optimize_execution=Fals
                         force_close=False,  # Avalia apenas trades completos (BUY+SELL pareados)
                         last_price=last_price,
                         last_timestamp=last_ts,
-                        use_compound=use_compound
+                        use_compound=use_compound,
+                        fee_rate=sim_fee_rate
                     )
                 except:
                     continue
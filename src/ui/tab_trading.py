@@ -9,7 +9,7 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from src.core.charting import create_chart
-from src.core.portfolio import recalculate_portfolio, get_portfolio_at
+from src.core.portfolio import recalculate_portfolio, get_portfolio_at, normalize_trade
 from src.core.data_loader import COMMISSION
 
 
@@ -36,6 +36,7 @@ def register_trade(action: str, price: float, amount: float, timestamp, coin: st
         'coin': coin,
         'reason': 'Manual'
     }
+    normalize_trade(trade)
     
     st.session_state.trades.append(trade)
     recalculate_portfolio(st.session_state.trades)
@@ -229,7 +230,7 @@ def render_trading_tab(df, idx: int, current_price: float, current_time, selecte
                 "timestamp": row['timestamp'],
                 "reason": row['reason'] if pd.notna(row['reason']) else ""
             }
-            updated_trades.append(trade)
+            updated_trades.append(normalize_trade(trade))
         
         def get_hash(obj): 
             return hashlib.md5(str(obj).encode()).hexdigest()
@@ -0,0 +1,239 @@
+"""
+Testes Unitários - Estratégias Customizadas (custom_strategy.py)
+
+Testa a avaliação de regras/grupos e a geração de trades do CustomStrategy.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.strategies import custom_strategy
+from src.strategies.custom_strategy import (
+    CustomStrategy,
+    evaluate_rule,
+    evaluate_rules,
+    evaluate_groups,
+)
+
+
+def _rule(indicator="rsi", params=None, operator="<", value=30):
+    return {
+        "indicator": indicator,
+        "params": {"period": 14} if params is None else params,
+        "operator": operator,
+        "value_type": "constant",
+        "value": value,
+    }
+
+
+class TestEvaluateRules:
+    """Testes para evaluate_rule/evaluate_rules/evaluate_groups."""
+
+    def test_rule_returns_boolean_series(self, sample_ohlcv_data):
+        """Regra devolve série booleana alinhada ao índice do df."""
+        result = evaluate_rule(sample_ohlcv_data, _rule())
+
+        assert len(result) == len(sample_ohlcv_data)
+        assert (result.index == sample_ohlcv_data.index).all()
+
+    def test_empty_rules_are_false(self, sample_ohlcv_data):
+        """Sem regras/grupos nenhum candle gera sinal."""
+        assert not evaluate_rules(sample_ohlcv_data, []).any()
+        assert not evaluate_groups(sample_ohlcv_data, []).any()
+
+    def test_and_or_logic(self, sample_ohlcv_data):
+        """AND é subconjunto de cada regra; OR é superconjunto."""
+        rules = [_rule(value=50), _rule(operator=">", value=20)]
+        a = evaluate_rule(sample_ohlcv_data, rules[0]).fillna(False).astype(bool)
+        b = evaluate_rule(sample_ohlcv_data, rules[1]).fillna(False).astype(bool)
+
+        assert (evaluate_rules(sample_ohlcv_data, rules, "AND").astype(bool) == (a & b)).all()
+        assert (evaluate_rules(sample_ohlcv_data, rules, "OR").astype(bool) == (a | b)).all()
+
+    def test_single_equality_rule_returns_series(self, sample_ohlcv_data):
+        """Operador '==' vira série booleana com tolerância relativa de 0,1% (como np.isclose)."""
+        df = sample_ohlcv_data.iloc[:6].copy()
+        df["close"] = [100.0, 100.0999, 99.9001, 100.1001, 99.8999, 0.0]
+        rule = _rule(indicator="close", params={}, operator="==", value=100)
+        result = evaluate_rules(df, [rule])
+
+        assert isinstance(result, pd.Series)
+        assert result.dtype == bool
+        assert result.tolist() == [True, True, True, False, False, False]
+        assert result.tolist() == np.isclose(df["close"], 100, rtol=1e-3).tolist()
+
+    def test_indicator_computed_once_per_evaluation(self, sample_ohlcv_data, monkeypatch):
+        """Mesmo indicador/params em várias regras e grupos é calculado uma vez."""
+        calls = []
+        original = custom_strategy._INDICATOR_CALC["rsi"]
+
+        def counting(df, **params):
+            calls.append(params)
+            return original(df, **params)
+
+        monkeypatch.setitem(custom_strategy._INDICATOR_CALC, "rsi", counting)
+
+        groups = [
+            {"rules": [_rule(value=30), _rule(operator=">", value=10)], "logic": "AND"},
+            {"rules": [_rule(value=40)], "logic": "AND"},
+        ]
+        evaluate_groups(sample_ohlcv_data, groups, "OR")
+
+        assert calls == [{"period": 14}]
+
+    def test_fast_df_extracts_columns_once(self, sample_ohlcv_data):
+        """_FastDF devolve sempre a mesma coluna e repassa o resto ao DataFrame."""
+        fast = custom_strategy._fast_df(sample_ohlcv_data)
+
+        assert fast["close"] is fast["close"]
+        assert custom_strategy._fast_df(fast) is fast
+        assert len(fast) == len(sample_ohlcv_data)
+        assert fast.columns.equals(sample_ohlcv_data.columns)
+
+    def test_bollinger_lines_share_one_computation(self, sample_ohlcv_data, monkeypatch):
+        """Upper, lower e %B do mesmo período usam um único cálculo das bandas."""
+        calls = []
+        original = custom_strategy.ind.calc_bollinger_bands
+
+        def counting(data, period=20, std_dev=2.0):
+            calls.append(period)
+            return original(data, period, std_dev)
+
+        monkeypatch.setattr(custom_strategy.ind, "calc_bollinger_bands", counting)
+
+        rules = [
+            {"indicator": "close", "params": {}, "operator": "<", "value_type": "indicator",
+             "value": {"indicator": "bollinger_lower", "params": {"period": 20}}},
+            {"indicator": "close", "params": {}, "operator": ">", "value_type": "indicator",
+             "value": {"indicator": "bollinger_upper", "params": {"period": 20}}},
+            _rule(indicator="bollinger_pctb", params={"period": 20}, value=0.2),
+        ]
+        evaluate_rules(sample_ohlcv_data, rules, "OR")
+
+        assert calls == [20]
+
+    def test_macd_lines_share_one_computation(self, sample_ohlcv_data, monkeypatch):
+        """macd e macd_signal saem de um único calc_macd (chave composta != nome do indicador)."""
+        calls = []
+        original = custom_strategy.ind.calc_macd
+
+        def counting(data):
+            calls.append(1)
+            return original(data)
+
+        monkeypatch.setattr(custom_strategy.ind, "calc_macd", counting)
+
+        rule = {"indicator": "macd", "params": {}, "operator": "crosses_above", "value_type": "indicator",
+                "value": {"indicator": "macd_signal", "params": {}}}
+        result = evaluate_rules(sample_ohlcv_data, [rule])
+
+        assert calls == [1]
+        assert result.dtype == bool
+
+
+class TestCrossOperators:
+    """Testes para os operadores de cruzamento."""
+
+    def test_crosses_above_and_below(self):
+        """Cruzamento só no candle da virada; NaN e primeiro candle nunca cruzam."""
+        a = pd.Series([1.0, 3.0, 3.0, 1.0, float("nan"), 3.0])
+        b = pd.Series([2.0, 2.0, 2.0, 2.0, 2.0, 2.0])
+        above = custom_strategy.AVAILABLE_OPERATORS["crosses_above"]["func"]
+        below = custom_strategy.AVAILABLE_OPERATORS["crosses_below"]["func"]
+
+        assert above(a, b).tolist() == [False, True, False, False, False, True]
+        assert below(a, b).tolist() == [False, False, False, True, False, False]
+        assert above(a, 2).tolist() == above(a, b).tolist()
+
+    def test_equals_uses_relative_tolerance(self):
+        """'==' aceita 0,1% de diferença relativa a b; NaN nunca é igual."""
+        equals = custom_strategy.AVAILABLE_OPERATORS["=="]["func"]
+        a = pd.Series([100.0, 100.09, 100.2, float("nan")])
+
+        assert equals(a, 100).tolist() == [True, True, False, False]
+        assert equals(a, pd.Series([100.0] * 4)).tolist() == [True, True, False, False]
+
+
+class TestFormatting:
+    """Testes para format_rule/format_group."""
+
+    def test_format_is_memoized_by_content(self):
+        """Mesma regra (outro dict) vem do cache; 30 e 30.0 não colidem."""
+        custom_strategy._format_rule_cached.cache_clear()
+        rule = _rule(value=30)
+
+        assert custom_strategy.format_rule(rule) == "RSI(14) < 30"
+        assert custom_strategy.format_rule(_rule(value=30)) == "RSI(14) < 30"
+        assert custom_strategy._format_rule_cached.cache_info().hits == 1
+        assert custom_strategy.format_rule(_rule(value=30.0)) == "RSI(14) < 30.0"
+        assert custom_strategy.format_group({"rules": [rule, rule], "logic": "OR"}) == "RSI(14) < 30 OR RSI(14) < 30"
+
+
+class TestCustomStrategyApply:
+    """Testes para CustomStrategy.apply."""
+
+    def test_trades_alternate_buy_sell(self, sample_ohlcv_data):
+        """Trades alternam BUY/SELL começando por BUY."""
+        strategy = CustomStrategy({
+            "name": "RSI",
+            "buy_rules": [_rule(value=40)],
+            "sell_rules": [_rule(operator=">", value=60)],
+        })
+        trades = strategy.apply(sample_ohlcv_data)
+
+        assert len(trades) > 0
+        assert [t["action"] for t in trades] == ["BUY", "SELL"] * (len(trades) // 2) + ["BUY"] * (len(trades) % 2)
+        for trade in trades:
+            assert trade["price"] == sample_ohlcv_data.loc[trade["timestamp"], "close"]
+            assert trade["coin"] == "SOL/USDT"
+
+    def test_compiled_groups_match_evaluate_groups(self, sample_ohlcv_data):
+        """Caminho compilado do apply gera os mesmos sinais que evaluate_groups."""
+        groups = [
+            {"rules": [_rule(value=40), _rule(indicator="close", params={}, operator=">",
+                                              value={"indicator": "sma", "params": {"period": 20}})],
+             "logic": "OR"},
+            {"rules": [], "logic": "AND"},
+        ]
+        groups[0]["rules"][1]["value_type"] = "indicator"
+        compiled = custom_strategy.compile_groups(groups)
+
+        expected = evaluate_groups(sample_ohlcv_data, groups, "OR")
+        result = custom_strategy.evaluate_compiled_groups(sample_ohlcv_data, compiled, "OR", {})
+
+        assert (result == expected).all()
+
+    def test_unknown_indicator_fails_on_init(self):
+        """Indicador inexistente é detectado ao compilar a estratégia."""
+        with pytest.raises(ValueError, match="Indicador desconhecido"):
+            CustomStrategy({"buy_rules": [_rule(indicator="nope")], "sell_rules": []})
+
+    def test_nullable_frame_matches_numpy(self, sample_ohlcv_data):
+        """Colunas pyarrow (resultados de regra nullable) geram os mesmos trades."""
+        pytest.importorskip("pyarrow")
+        strategy = CustomStrategy({
+            "name": "Close",
+            "buy_rules": [_rule(indicator="close", params={}, value=104)],
+            "sell_rules": [_rule(indicator="close", params={}, operator=">", value=112)],
+        })
+        arrow_df = sample_ohlcv_data.convert_dtypes(dtype_backend="pyarrow")
+
+        trades = strategy.apply(arrow_df)
+        assert trades
+        assert [t["timestamp"] for t in trades] == [t["timestamp"] for t in strategy.apply(sample_ohlcv_data)]
+
+    def test_apply_many_matches_apply_per_coin(self, sample_ohlcv_data):
+        """apply_many (threads) devolve o mesmo que apply moeda a moeda."""
+        strategy = CustomStrategy({
+            "name": "RSI",
+            "buy_rules": [_rule(value=40)],
+            "sell_rules": [_rule(operator=">", value=60)],
+        })
+        dfs = {"SOL/USDT": sample_ohlcv_data, "BTC/USDT": sample_ohlcv_data.iloc[::-1].set_axis(sample_ohlcv_data.index)}
+
+        result = strategy.apply_many(dfs, max_workers=2)
+
+        assert list(result) == list(dfs)
+        for coin, df in dfs.items():
+            assert result[coin] == strategy.apply(df, coin=coin)
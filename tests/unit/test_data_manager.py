@@ -0,0 +1,145 @@
+"""
+Testes Unitários - Data Manager (data_manager.py)
+
+Testa o loop de ingestão de ticks (_TickHub): distribuição por símbolo,
+mensagens inválidas e encerramento; e o cache em disco dos candles CCXT.
+"""
+
+import sys
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import src.data_manager as data_manager
+from src.data_manager import DataManager, _TickHub
+
+
+def _collector(expected: int):
+    """Callback que guarda os ticks recebidos e sinaliza ao chegar em `expected`."""
+    received = []
+    done = threading.Event()
+    
+    def callback(symbol, bid, ask):
+        received.append((symbol, bid, ask))
+        if len(received) >= expected:
+            done.set()
+    
+    return callback, received, done
+
+
+@pytest.fixture
+def hub():
+    hub = _TickHub()
+    yield hub
+    hub.stop()
+
+
+class TestTickHub:
+    """Testes para _TickHub."""
+    
+    def test_dispatches_each_symbol_to_its_subscribers(self, hub):
+        """Cada assinante recebe só os símbolos pedidos, na ordem de chegada."""
+        btc_cb, btc, btc_done = _collector(2)
+        all_cb, both, both_done = _collector(3)
+        hub.subscribe(["BTC/USDT"], btc_cb)
+        hub.subscribe(["BTC/USDT", "ETH/USDT"], all_cb)
+        
+        hub.feed(b'{"symbol": "BTC/USDT", "bid": 100.0, "ask": 100.5}')
+        hub.feed('{"symbol": "ETH/USDT", "bid": "10", "ask": "10.1"}')
+        hub.feed(b'{"symbol": "SOL/USDT", "bid": 1.0, "ask": 1.1}')
+        hub.feed(b'{"symbol": "BTC/USDT", "bid": 101.0, "ask": 101.5}')
+        
+        assert btc_done.wait(2) and both_done.wait(2)
+        assert btc == [("BTC/USDT", 100.0, 100.5), ("BTC/USDT", 101.0, 101.5)]
+        assert both == [("BTC/USDT", 100.0, 100.5), ("ETH/USDT", 10.0, 10.1), ("BTC/USDT", 101.0, 101.5)]
+    
+    def test_invalid_messages_are_skipped(self, hub):
+        """JSON quebrado, campo ausente ou preço não numérico: ignorado, o loop segue."""
+        callback, received, done = _collector(1)
+        hub.subscribe(["BTC/USDT"], callback)
+        
+        hub.feed(b'{"symbol": "BTC/USDT"')
+        hub.feed(b'{"symbol": "BTC/USDT", "bid": 100.0}')
+        hub.feed(b'{"symbol": "BTC/USDT", "bid": "abc", "ask": 1.0}')
+        hub.feed(b'{"symbol": "BTC/USDT", "bid": 100.0, "ask": 100.5}')
+        
+        assert done.wait(2)
+        assert received == [("BTC/USDT", 100.0, 100.5)]
+    
+    def test_stop_joins_the_thread_and_allows_restart(self, hub):
+        """stop() encerra a thread do loop; uma nova assinatura sobe outro loop."""
+        callback, received, done = _collector(1)
+        hub.subscribe(["BTC/USDT"], callback)
+        thread = hub._thread
+        
+        hub.stop()
+        
+        assert not thread.is_alive()
+        assert hub._loop is None and hub._thread is None
+        hub.stop()  # Idempotente
+        
+        hub.subscribe(["BTC/USDT"], callback)
+        hub.feed(b'{"symbol": "BTC/USDT", "bid": 100.0, "ask": 100.5}')
+        assert done.wait(2)
+        assert received == [("BTC/USDT", 100.0, 100.5)]
+
+
+class _FrozenDatetime(datetime):
+    """datetime com now() fixo (a janela pedida não anda entre as chamadas)."""
+    
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 6, 1, 12, 30)
+
+
+class _FakeExchange:
+    """Exchange CCXT falsa: candles de 1h até agora, 1000 por página; conta as páginas."""
+    
+    rateLimit = 0
+    pages = 0
+    
+    def __init__(self, config):
+        pass
+    
+    def parse_timeframe(self, tf):
+        return 3600
+    
+    def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        type(self).pages += 1
+        tf_ms = 3600 * 1000
+        start = -(-since // tf_ms) * tf_ms
+        now_ms = int(data_manager.datetime.now().timestamp() * 1000)
+        return [[ts, 1.0, 2.0, 0.5, 1.5, 10.0] for ts in range(start, now_ms + 1, tf_ms)][:limit]
+
+
+class TestCcxtCache:
+    """Testes para o cache em disco de get_ccxt_historical_data."""
+    
+    def test_second_call_only_fetches_new_candles(self, tmp_path, monkeypatch):
+        """Candles fechados ficam em cache sem expirar; a 2ª chamada baixa só o candle aberto."""
+        diskcache = pytest.importorskip("diskcache")
+        cache = diskcache.Cache(str(tmp_path))
+        monkeypatch.setattr(data_manager, "_ccxt_cache", cache)
+        monkeypatch.setitem(sys.modules, "ccxt", SimpleNamespace(binance=_FakeExchange))
+        monkeypatch.setattr(_FakeExchange, "pages", 0)
+        monkeypatch.setattr(data_manager, "datetime", _FrozenDatetime)
+        manager = DataManager()
+        
+        first = manager.get_ccxt_historical_data("BTC/USDT", "1h", days=100)
+        assert _FakeExchange.pages == 4  # 2400 candles em 3 páginas + página vazia
+        
+        closed_key = data_manager._ccxt_cache_key("binance", "BTC/USDT", "1h")
+        assert cache.get(closed_key, expire_time=True)[1] is None
+        
+        # Resultado "live" expirado (próximo candle): fica só o histórico fechado
+        for key in list(cache.iterkeys()):
+            if key != closed_key:
+                del cache[key]
+        _FakeExchange.pages = 0
+        second = manager.get_ccxt_historical_data("BTC/USDT", "1h", days=100)
+        
+        assert _FakeExchange.pages == 2  # Candle aberto + página vazia
+        assert second.equals(first)
+        cache.close()
@@ -12,8 +12,14 @@ from unittest.mock import patch, MagicMock
 from src.core.portfolio import (
     sanitize_trades,
     adjust_trade_amounts,
-    apply_risk_management
+    apply_risk_management,
+    get_portfolio_at,
+    normalize_trade,
+    build_sanitized_artifact,
+    replay_trades,
+    _values_at
 )
+from src.core.config import get_total_fee
 
 
 class TestSanitizeTrades:
@@ -73,6 +79,17 @@ class TestSanitizeTrades:
         assert len(buys) == 1
         assert len(sells) == 1
 
+    def test_uses_normalized_action_code(self):
+        """Trades normalizados (inclusive em minúsculas) são tratados pelo código."""
+        base_time = datetime(2025, 1, 1, 10)
+        trades = [
+            normalize_trade({'action': 'buy', 'price': 100.0, 'amount': 10.0, 'timestamp': base_time}),
+            normalize_trade({'action': 'Sell', 'price': 110.0, 'amount': 10.0, 'timestamp': base_time + timedelta(hours=1)}),
+        ]
+        
+        assert [t['_action_code'] for t in trades] == [1, 2]
+        assert len(sanitize_trades(trades)) == 2
+
 
 class TestAdjustTradeAmounts:
     """Testes para função adjust_trade_amounts."""
@@ -99,6 +116,17 @@ class TestAdjustTradeAmounts:
         result = adjust_trade_amounts([], 10000.0, 100.0)
         assert result == []
     
+    def test_explicit_fee_rate(self):
+        """fee_rate passado pelo chamador substitui a taxa da moeda selecionada."""
+        trades = [
+            {'action': 'BUY', 'price': 100.0, 'amount': 1.0, 'timestamp': datetime(2025, 1, 1)},
+        ]
+        
+        result = adjust_trade_amounts(trades, initial_balance=10000.0, fee_rate=0.01)
+        
+        # 100% do saldo não cobre a taxa: amount reduzido para saldo / (preço * (1 + taxa))
+        assert result[0]['amount'] == pytest.approx(10000.0 / (100.0 * 1.01))
+    
     def test_compound_mode_reinvests_profits(self):
         """Modo composto deve reinvestir lucros."""
         base_time = datetime(2025, 1, 1, 10)
@@ -150,6 +178,101 @@ class TestAdjustTradeAmounts:
         assert result[-1]['price'] == 110.0
 
 
+class TestGetPortfolioAt:
+    """Testes para função get_portfolio_at (time-travel)."""
+    
+    def test_state_before_and_after_trades(self, sample_trades):
+        """Estado deve refletir apenas os trades até o timestamp alvo."""
+        fee = get_total_fee('SOL/USDT')
+        
+        # Antes de qualquer trade: saldo inicial intacto
+        before = get_portfolio_at(sample_trades, datetime(2025, 1, 1, 9))
+        assert before['balance'] == pytest.approx(10000.0)
+        assert before['holdings'] == 0.0
+        
+        # Após o primeiro BUY: posição aberta ao preço de compra
+        after_buy = get_portfolio_at(sample_trades, datetime(2025, 1, 1, 12))
+        assert after_buy['holdings'] == pytest.approx(10.0)
+        assert after_buy['avg_price'] == pytest.approx(100.0)
+        assert after_buy['balance'] == pytest.approx(10000.0 - 1000.0 * (1 + fee))
+        
+        # Após o ciclo completo: posição zerada
+        final = get_portfolio_at(sample_trades, datetime(2025, 1, 3))
+        expected = 10000.0
+        for buy, sell in ((100.0, 110.0), (105.0, 108.0)):
+            expected -= 10 * buy * (1 + fee)
+            expected += 10 * sell * (1 - fee)
+        assert final['holdings'] == 0.0
+        assert final['avg_price'] == 0.0
+        assert final['balance'] == pytest.approx(expected)
+    
+    def test_shared_artifact_and_cache_invalidation(self, sample_trades):
+        """Artefato explícito dá o mesmo resultado; append na lista invalida o cache."""
+        target = datetime(2025, 1, 3)
+        artifact = build_sanitized_artifact(sample_trades)
+        assert get_portfolio_at(sample_trades, target, artifact=artifact) == get_portfolio_at(sample_trades, target)
+        
+        trades = sample_trades[:1]
+        assert get_portfolio_at(trades, target)['holdings'] == pytest.approx(10.0)
+        trades.append(sample_trades[1])
+        assert get_portfolio_at(trades, target)['holdings'] == 0.0
+    
+    def test_low_price_position_closes_with_reported_holdings(self):
+        """Amount não representável em float32 volta exato em holdings; vender holdings fecha a posição."""
+        amount = 80923.45078979344
+        buy = normalize_trade({'timestamp': datetime(2025, 1, 1, 10), 'action': 'BUY', 'price': 0.12345, 'amount': amount})
+        trades = [buy]
+        
+        holdings = get_portfolio_at(trades, datetime(2025, 1, 2))['holdings']
+        assert holdings == amount
+        
+        sell = normalize_trade({'timestamp': datetime(2025, 1, 1, 12), 'action': 'SELL', 'price': 0.13, 'amount': holdings})
+        trades = [buy, sell]
+        assert len(sanitize_trades(trades)) == 2
+        assert get_portfolio_at(trades, datetime(2025, 1, 2))['holdings'] == 0.0
+
+
+class TestReplayTrades:
+    """Testes para replay_trades (carregamento de trades.json)."""
+    
+    def test_matches_sequential_replay(self):
+        """Mesmos números do laço em Python, sem sanitizar (venda sem posição conta)."""
+        trades = [
+            {'action': 'SELL', 'price': 99.0, 'amount': 1.0},
+            {'action': 'BUY', 'price': '100.5', 'amount': 3.0},
+            {'action': 'BUY', 'price': 103.25, 'amount': 2.0},
+            {'action': 'SELL', 'price': 110.0, 'amount': 4.5},
+            {'action': 'HOLD', 'price': 1.0, 'amount': 1.0},
+        ]
+        fee = 0.001
+        
+        balance, holdings, avg_price = 10000.0, 0.0, 0.0
+        for t in trades:
+            amt, prc = float(t['amount']), float(t['price'])
+            if t['action'] == 'BUY':
+                balance -= amt * prc + amt * prc * fee
+                if holdings + amt > 0:
+                    avg_price = (holdings * avg_price + amt * prc) / (holdings + amt)
+                holdings += amt
+            elif t['action'] == 'SELL':
+                balance += amt * prc - amt * prc * fee
+                holdings -= amt
+        
+        assert replay_trades(trades, 10000.0, fee) == (balance, holdings, avg_price)
+    
+    @pytest.mark.parametrize("bad", [
+        {'action': 'BUY', 'amount': 1.0},
+        {'action': 'BUY', 'price': 100.0},
+        {'action': 'BUY', 'price': 'abc', 'amount': 1.0},
+        {'action': 'BUY', 'price': 100.0, 'amount': None},
+    ])
+    def test_invalid_price_or_amount_raises(self, bad):
+        """Preço/quantidade ausente ou não numérico levanta (o sidebar mostra o erro)."""
+        trades = [{'action': 'BUY', 'price': 100.0, 'amount': 1.0}, bad]
+        with pytest.raises((KeyError, TypeError, ValueError)):
+            replay_trades(trades, 10000.0, 0.001)
+
+
 class TestApplyRiskManagement:
     """Testes para função apply_risk_management."""
     
@@ -181,3 +304,35 @@ class TestApplyRiskManagement:
         for method in ['conservador', 'volatilidade_atr', 'agressivo_rsi']:
             result = apply_risk_management(trades.copy(), sample_df_with_indicators, method)
             assert 'size_factor' in result[0]
+    
+    def test_missing_timestamp_uses_default(self, sample_df_with_indicators):
+        """Trade fora do índice do DataFrame deve usar o valor default do indicador."""
+        trades = [
+            {'action': 'BUY', 'price': 100.0, 'amount': 1.0, 'timestamp': datetime(2030, 1, 1)},
+        ]
+        
+        result = apply_risk_management(trades, sample_df_with_indicators, 'agressivo_rsi')
+        
+        # RSI default = 50 -> compra "fraca"
+        assert result[0]['size_factor'] == 0.3
+        assert 'RSI: 50.0' in result[0]['reason']
+    
+    def test_unsorted_index_finds_values(self):
+        """Índice fora de ordem: busca os valores certos (searchsorted exigiria ordem)."""
+        index = pd.DatetimeIndex(['2025-01-03', '2025-01-01', '2025-01-02'])
+        series = pd.Series([1.0, 2.0, 3.0], index=index)
+        trades_ts = pd.DatetimeIndex(['2025-01-01', '2025-01-02', '2025-01-05'])
+        
+        assert _values_at(series, trades_ts, 50.0).tolist() == [2.0, 3.0, 50.0]
+    
+    def test_tz_aware_index_with_naive_trades_uses_default(self, sample_df_with_indicators):
+        """Índice com fuso e trades sem fuso: não levanta, usa o default (RSI 50)."""
+        df = sample_df_with_indicators.tz_localize('UTC')
+        trades = [
+            {'action': 'BUY', 'price': 100.0, 'amount': 1.0, 'timestamp': sample_df_with_indicators.index[50]},
+        ]
+        
+        result = apply_risk_management(trades, df, 'agressivo_rsi')
+        
+        assert result[0]['size_factor'] == 0.3
+        assert 'RSI: 50.0' in result[0]['reason']
@@ -0,0 +1,44 @@
+"""
+Testes Unitários - Pré-compilação dos kernels (_precompile.py)
+
+Garante que todo kernel @njit compila na declaração (assinatura explícita)
+e grava em cache, para o primeiro clique no app não pagar o JIT.
+"""
+
+import importlib
+
+import pytest
+
+from src.core._precompile import kernel_modules
+
+
+class TestKernelSignatures:
+    """Testes para as assinaturas dos kernels numba."""
+    
+    def test_kernel_modules_found(self):
+        """A busca no fonte encontra os módulos de kernels de core e strategies."""
+        modules = list(kernel_modules())
+        
+        assert "src.core.portfolio" in modules
+        assert "src.strategies._kernels" in modules
+        assert "src.strategies.trend_following" in modules
+    
+    def test_kernels_compiled_at_declaration_and_cached(self):
+        """Todo kernel tem assinatura explícita (não recompila por tipo) e cache=True."""
+        pytest.importorskip("numba")
+        from numba.core.caching import NullCache
+        from numba.core.registry import CPUDispatcher
+        
+        kernels = []
+        for name in kernel_modules():
+            module = importlib.import_module(name)
+            kernels += [
+                (name, attr, obj) for attr, obj in vars(module).items()
+                if isinstance(obj, CPUDispatcher) and obj.__module__ == name
+            ]
+        
+        assert kernels
+        for name, attr, kernel in kernels:
+            assert len(kernel.signatures) == 1, f"{name}.{attr}"
+            assert not kernel._can_compile, f"{name}.{attr} sem assinatura explícita"
+            assert not isinstance(kernel._cache, NullCache), f"{name}.{attr} sem cache=True"
@@ -0,0 +1,34 @@
+"""
+Testes Unitários - Sidebar (src/ui/sidebar.py)
+
+Testa a gravação do trades.json (save_trades).
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.core.portfolio import normalize_trade
+from src.ui import sidebar
+
+
+class TestSaveTrades:
+    """Testes para save_trades."""
+
+    def test_saved_trades_have_no_internal_keys(self, tmp_path, monkeypatch):
+        """Chaves internas (prefixo '_') não vão para o arquivo nem somem da sessão."""
+        trades = [
+            normalize_trade({'timestamp': datetime(2025, 1, 1, 10), 'action': 'BUY', 'price': 100.0, 'amount': 1.5}),
+            normalize_trade({'timestamp': datetime(2025, 1, 1, 12), 'action': 'SELL', 'price': 110.0, 'amount': 1.5}),
+        ]
+        mock_st = MagicMock()
+        mock_st.session_state.trades = trades
+        monkeypatch.setattr(sidebar, 'st', mock_st)
+        monkeypatch.setattr(sidebar, 'TRADES_PATH', tmp_path / 'trades.json')
+
+        saved = json.loads(Path(sidebar.save_trades()).read_bytes())
+
+        assert [sorted(t) for t in saved] == [['action', 'amount', 'price', 'timestamp']] * 2
+        assert saved[0]['timestamp'] == '2025-01-01 10:00:00'
+        assert all('_action_code' in t for t in trades)
@@ -38,6 +38,13 @@ class TestStrategiesRegistry:
         """Todos os slugs devem ser únicos."""
         slugs = list(STRATEGIES.keys())
         assert len(slugs) == len(set(slugs))
+    
+    def test_lazy_registry_matches_class_slugs(self):
+        """Slug descoberto via AST deve bater com o atributo slug da classe."""
+        for slug, strategy_class in STRATEGIES.items():
+            assert strategy_class.slug == slug
+        assert 'nao_existe' not in STRATEGIES
+        assert STRATEGIES.get('nao_existe') is None
 
 
 class TestStrategyApply:
@@ -101,6 +108,85 @@ class TestStrategyApply:
                     assert price > 0, f"{slug} gerou preço inválido: {price}"
             except:
                 pass
+    
+    def test_apply_batch_matches_apply(self, sample_df_with_indicators, sample_ohlcv_data):
+        """Estratégias colunares: apply() é apply_batch().to_records(), inclusive sem indicadores."""
+        for slug, strategy_class in STRATEGIES.items():
+            strategy = strategy_class()
+            # apply_batch padrão só existe para quem implementa _scan()
+            if strategy_class.apply_batch is BaseStrategy.apply_batch and strategy_class._scan is BaseStrategy._scan:
+                continue
+            
+            for df in (sample_df_with_indicators, sample_ohlcv_data):
+                assert strategy.apply_batch(df).to_records() == strategy.apply(df), slug
+    
+    def test_scan_contract_skips_warmup(self, sample_ohlcv_data):
+        """apply_batch padrão: _scan recebe os arrays sem o aquecimento e os índices voltam absolutos."""
+        import numpy as np
+        
+        seen = []
+        
+        class Toy(BaseStrategy):
+            required_columns = ('x',)
+            
+            def apply(self, df, **params):
+                return self.apply_batch(df, **params).to_records()
+            
+            def _scan(self, arrays, p):
+                seen.append(len(arrays['x']))
+                return np.array([1]), np.array([True]), None
+            
+            def _reasons(self, df, arrays, idx, is_buy, detail, p):
+                return [f"x={arrays['x'][i]:.0f}" for i in idx]
+        
+        n = len(sample_ohlcv_data)
+        df = sample_ohlcv_data.assign(x=np.r_[np.full(10, np.nan), np.arange(n - 10.0)])
+        trades = Toy().apply(df)
+        
+        # Começa um candle antes do primeiro valor válido (candle anterior dos cruzamentos)
+        assert seen == [n - 9]
+        assert [(t["action"], t["timestamp"], t["reason"]) for t in trades] == [("BUY", df.index[10], "x=0")]
+        assert Toy().apply(sample_ohlcv_data) == []
+    
+    def test_apply_strategies_matches_apply_and_shares_columns(self, sample_df_with_indicators, monkeypatch):
+        """apply_strategies == apply() por par; cada coluna é extraída uma vez."""
+        from src.strategies import apply_strategies, base
+        
+        runs = [(cls(), {}) for cls in STRATEGIES.values()] + [
+            (STRATEGIES['rsi_reversal'](), {"rsi_buy": 40, "rsi_sell": 60}),
+        ]
+        expected = [strategy.apply(sample_df_with_indicators, **params) for strategy, params in runs]
+        
+        extracted = []
+        original = base._column_array
+        
+        def counting(df, col, shared=None):
+            if shared is not None and col not in shared:
+                extracted.append(col)
+            return original(df, col, shared)
+        
+        monkeypatch.setattr(base, "_column_array", counting)
+        
+        assert apply_strategies(sample_df_with_indicators, runs) == expected
+        assert extracted and len(extracted) == len(set(extracted))
+    
+    def test_reasons_formatted_only_when_read(self, sample_df_with_indicators, monkeypatch):
+        """apply_batch não formata os textos; to_records formata uma vez."""
+        from src.strategies.rsi_reversal import RSIReversalStrategy
+        
+        calls = []
+        original = RSIReversalStrategy._reasons
+        
+        def counting(self, *args):
+            calls.append(1)
+            return original(self, *args)
+        
+        monkeypatch.setattr(RSIReversalStrategy, "_reasons", counting)
+        batch = RSIReversalStrategy().apply_batch(sample_df_with_indicators, rsi_buy=40, rsi_sell=60)
+        
+        assert len(batch) > 0 and calls == []
+        assert batch.to_records() == batch.to_records()
+        assert calls == [1]
 
 
 class TestRSIReversalStrategy:
@@ -140,6 +226,17 @@ class TestRSIReversalStrategy:
         trades = strategy.apply(sample_ohlcv_data)  # Sem indicadores
         
         assert trades == []
+    
+    def test_apply_grid_matches_apply(self, sample_df_with_indicators):
+        """Varredura no kernel paralelo == apply() combinação a combinação."""
+        from src.strategies.rsi_reversal import RSIReversalStrategy
+        
+        strategy = RSIReversalStrategy()
+        grid = [{"rsi_buy": b, "rsi_sell": s} for b in (30, 40, 45) for s in (55, 70)] + [{}]
+        
+        assert strategy.apply_grid(sample_df_with_indicators, grid) == [
+            strategy.apply(sample_df_with_indicators, **params) for params in grid
+        ]
 
 
 class TestGoldenCrossStrategy:
@@ -166,6 +263,250 @@ class TestGoldenCrossStrategy:
         # Verifica que trades são gerados (dados de teste têm cruzamentos)
         # Não garantimos quantidade, apenas formato
         assert all('action' in t for t in trades)
+    
+    def test_missing_emas_leave_df_untouched(self, sample_ohlcv_data):
+        """EMAs ausentes viram arrays locais: o df não ganha colunas."""
+        from src.strategies.golden_cross import GoldenCrossStrategy
+        
+        columns = list(sample_ohlcv_data.columns)
+        with_emas = sample_ohlcv_data.assign(
+            ema20=sample_ohlcv_data['close'].ewm(span=20, adjust=False).mean(),
+            ema100=sample_ohlcv_data['close'].ewm(span=100, adjust=False).mean(),
+        )
+        
+        trades = GoldenCrossStrategy().apply(sample_ohlcv_data, fast_period=20, slow_period=100)
+        
+        assert list(sample_ohlcv_data.columns) == columns
+        assert trades == GoldenCrossStrategy().apply(with_emas, fast_period=20, slow_period=100)
+    
+    def test_ema_kernel_matches_pandas(self, sample_ohlcv_data):
+        """ema() (recorrência compilada) == ewm(adjust=False).mean(), inclusive com NaN."""
+        import numpy as np
+        from src.strategies._kernels import ema
+        
+        close = sample_ohlcv_data['close'].copy()
+        close.iloc[[0, 1, 30, 31, 32, 70]] = np.nan
+        for span in (9, 20, 50):
+            expected = close.ewm(span=span, adjust=False).mean().to_numpy()
+            np.testing.assert_array_equal(ema(close, span), expected)
+    
+    def test_sign_crosses_counts_touch_and_ignores_nan(self):
+        """Sair de zero conta como cruzamento; NaN nunca cruza."""
+        import numpy as np
+        from src.strategies._kernels import sign_crosses
+        
+        up, down = sign_crosses(np.array([-1.0, 0.0, 2.0, np.nan, -1.0, 1.0, -1.0]))
+        
+        assert up.tolist() == [False, True, False, False, True, False]
+        assert down.tolist() == [False, False, False, False, False, True]
+
+
+class TestBollingerBounceStrategy:
+    """Testes específicos para Bollinger Bounce."""
+    
+    def test_pyarrow_backed_frame_matches_numpy(self, sample_df_with_indicators):
+        """DataFrame com backend pyarrow (com nulls) gera os mesmos trades."""
+        pytest.importorskip("pyarrow")
+        from src.strategies.bollinger_bounce import BollingerBounceStrategy
+        
+        strategy = BollingerBounceStrategy()
+        arrow_df = sample_df_with_indicators.convert_dtypes(dtype_backend="pyarrow")
+        
+        assert strategy.apply(arrow_df) == strategy.apply(sample_df_with_indicators)
+    
+    def test_apply_batch_matches_records(self, sample_df_with_indicators):
+        """apply_batch (colunar) converte para os mesmos dicts de apply()."""
+        from src.strategies.base import Trade
+        from src.strategies.bollinger_bounce import BollingerBounceStrategy
+        
+        strategy = BollingerBounceStrategy()
+        batch = strategy.apply_batch(sample_df_with_indicators)
+        trades = strategy.apply(sample_df_with_indicators)
+        
+        assert batch.to_records() == trades
+        assert len(batch) == len(trades)
+        assert [t.to_dict() for t in batch] == trades
+        assert all(isinstance(t, Trade) for t in batch)
+
+
+class _PolarsLike:
+    """Duck typing de um DataFrame polars: só to_pandas(), com a coluna de tempo."""
+    
+    def __init__(self, df):
+        self._df = df
+    
+    def to_pandas(self, use_pyarrow_extension_array=False):
+        pdf = self._df.rename_axis('timestamp').reset_index()
+        return pdf.convert_dtypes(dtype_backend="pyarrow") if use_pyarrow_extension_array else pdf
+
+
+class TestPolarsInput:
+    """DataFrames polars são convertidos na entrada para todas as estratégias."""
+    
+    @pytest.mark.parametrize("slug", ["trend_following", "macd_crossover", "donchian_breakout"])
+    def test_polars_frame_matches_pandas(self, slug, sample_df_with_indicators):
+        """apply() e apply_strategies() com polars dão os mesmos trades do pandas."""
+        pytest.importorskip("pyarrow")
+        from src.strategies.base import apply_strategies
+        
+        strategy = STRATEGIES[slug]()
+        polars_df = _PolarsLike(sample_df_with_indicators)
+        expected = strategy.apply(sample_df_with_indicators)
+        
+        assert expected
+        assert strategy.apply(polars_df) == expected
+        assert apply_strategies(polars_df, [(strategy, {})]) == [expected]
+
+
+class TestDonchianBreakoutStrategy:
+    """Testes específicos para Donchian Breakout."""
+    
+    def test_rolling_windows_cached_per_dataframe(self, sample_ohlcv_data):
+        """Janelas móveis são reaproveitadas no mesmo df e liberadas com ele."""
+        import gc
+        from src.strategies import base, donchian_breakout as mod
+        
+        df = sample_ohlcv_data.copy()
+        strategy = mod.DonchianBreakoutStrategy()
+        first = strategy.apply(df, entry_period=20, exit_period=10)
+        
+        assert mod._rolling_extreme(df, "high", 20) is mod._rolling_extreme(df, "high", 20)
+        assert strategy.apply(df, entry_period=20, exit_period=10) == first
+        
+        key = id(df)
+        del df
+        gc.collect()
+        assert key not in base._FRAME_CACHE
+    
+    def test_rolling_kernels_match_pandas(self):
+        """rolling_max/min (fila monotônica) == rolling do pandas, inclusive com NaN."""
+        import numpy as np
+        from src.strategies._kernels import rolling_max, rolling_min
+        
+        values = pd.Series([3.0, 1.0, np.nan, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0, 5.0, 3.0, 5.0])
+        for window in (1, 2, 3, 5, 20):
+            rolling = values.rolling(window=window)
+            np.testing.assert_array_equal(rolling_max(values, window), rolling.max().to_numpy())
+            np.testing.assert_array_equal(rolling_min(values, window), rolling.min().to_numpy())
+
+
+class TestTrendFollowingStrategy:
+    """Testes específicos para Trend Following."""
+    
+    def test_ema_column_resolved_once_per_columns(self, sample_ohlcv_data):
+        """Varredura no mesmo df resolve a coluna EMA uma vez; fallback para a primeira 'ema*'."""
+        from src.strategies import trend_following as mod
+        
+        df = sample_ohlcv_data.assign(ema50=sample_ohlcv_data['close'].ewm(span=50, adjust=False).mean())
+        strategy = mod.TrendFollowingStrategy()
+        mod._resolve_ema_column.cache_clear()
+        
+        for _ in range(5):
+            strategy.apply(df, ema_period=20)
+        
+        assert mod._resolve_ema_column.cache_info().misses == 1
+        assert strategy._ema_column(df, 20) == 'ema50'
+        assert strategy._ema_column(sample_ohlcv_data, 20) is None
+    
+    def test_events_cached_per_dataframe_and_column(self, sample_ohlcv_data, monkeypatch):
+        """Períodos que resolvem a mesma coluna EMA varrem uma vez; o cache sai com o df."""
+        import gc
+        from src.strategies import base, trend_following as mod
+        
+        df = sample_ohlcv_data.assign(ema50=sample_ohlcv_data['close'].ewm(span=50, adjust=False).mean())
+        strategy = mod.TrendFollowingStrategy()
+        scans = []
+        original = mod.TrendFollowingStrategy._scan
+        monkeypatch.setattr(mod.TrendFollowingStrategy, "_scan",
+                            lambda self, arrays, p: scans.append(1) or original(self, arrays, p))
+        
+        first = strategy.apply(df, ema_period=20)
+        
+        assert first
+        assert strategy.apply(df, ema_period=30) == first
+        assert strategy.apply(df, ema_period=50) == first
+        assert len(scans) == 1
+        
+        key = id(df)
+        del df
+        gc.collect()
+        assert key not in base._FRAME_CACHE
+    
+    def test_trend_loop_nan_never_crosses(self):
+        """Sem teste de NaN no kernel: comparação com NaN é falsa e não gera cruzamento."""
+        import numpy as np
+        from src.strategies.trend_following import _trend_loop
+        
+        assert not (np.nan < 1.0) and not (np.nan > 1.0)
+        
+        nan = np.nan
+        close = np.array([9.0, 11.0, 9.0, nan, 11.0, 12.0, 9.0, 8.0, 11.0])
+        ema = np.array([10.0, 10.0, 10.0, 10.0, 10.0, nan, 10.0, 10.0, 10.0])
+        entries, exits = _trend_loop(close, ema)
+        
+        # 1 e 8 cruzam para cima, 2 para baixo; 4 (preço anterior NaN) e 6 (EMA anterior NaN) não
+        assert entries.tolist() == [1, 8]
+        assert exits.tolist() == [2]
+
+
+class TestVolumeBreakoutStrategy:
+    """Testes específicos para Volume Breakout."""
+    
+    def test_spikes_trade_after_first_full_window(self):
+        """Spike só conta a partir de volume_period; sem coluna volume não há trades."""
+        from src.strategies.volume_breakout import VolumeBreakoutStrategy
+        
+        n = 12
+        df = pd.DataFrame({
+            "open": [100.0] * n,
+            "close": [101.0, 101.0, 101.0, 101.0, 101.0, 101.0, 101.0, 99.0, 101.0, 99.0, 99.0, 101.0],
+            "volume": [10.0, 10.0, 10.0, 10.0, 50.0, 50.0, 10.0, 10.0, 10.0, 90.0, 10.0, 10.0],
+        }, index=pd.date_range("2024-01-01", periods=n, freq="h"))
+        strategy = VolumeBreakoutStrategy()
+        
+        trades = strategy.apply(df, volume_period=5, volume_multiplier=15)
+        
+        # Candle 4 fecha a primeira janela (spike ignorado); 5 compra, 9 vende
+        assert [(t["action"], t["timestamp"]) for t in trades] == [("BUY", df.index[5]), ("SELL", df.index[9])]
+        assert trades[0]["reason"] == "📊 Volume Spike Bullish (1.9x média)"
+        assert strategy.apply(df.drop(columns=["volume"])) == []
+    
+    def test_apply_leaves_df_untouched(self, sample_ohlcv_data):
+        """Média e máscaras são arrays locais: o df não é alterado nem ganha colunas."""
+        from src.strategies.volume_breakout import VolumeBreakoutStrategy
+        
+        before = sample_ohlcv_data.copy()
+        VolumeBreakoutStrategy().apply(sample_ohlcv_data, volume_period=10, volume_multiplier=12)
+        
+        pd.testing.assert_frame_equal(sample_ohlcv_data, before)
+    
+    def test_resolve_events_matches_resolve_positions(self):
+        """Alternância percorrendo só os eventos == resolve_positions sobre todos os candles."""
+        import numpy as np
+        from src.strategies._kernels import resolve_events, resolve_positions
+        
+        rng = np.random.default_rng(5)
+        signal = np.where(rng.random(500) < 0.1, rng.choice([-1, 1], 500), 0)
+        events = np.flatnonzero(signal)
+        
+        expected = resolve_positions(signal > 0, signal < 0)
+        result = resolve_events(events, signal[events] > 0)
+        
+        assert [r.tolist() for r in result] == [e.tolist() for e in expected]
+        assert [r.tolist() for r in resolve_events(events[:0], signal[:0] > 0)] == [[], []]
+    
+    def test_rolling_mean_kernel_matches_pandas(self):
+        """rolling_mean (soma corrente) == rolling().mean() bit a bit, com NaN e valores repetidos."""
+        import numpy as np
+        from src.strategies._kernels import rolling_mean
+        
+        rng = np.random.default_rng(3)
+        values = rng.normal(0, 1, 200) * 1e4
+        values[[15, 16, 80]] = np.nan
+        values[100:130] = 0.1
+        for window in (1, 2, 5, 20):
+            expected = pd.Series(values).rolling(window=window).mean().to_numpy()
+            np.testing.assert_array_equal(rolling_mean(values, window), expected)
 
 
 class TestStrategyParameters:
@@ -193,3 +534,39 @@ class TestStrategyParameters:
                 
                 assert min_val <= default <= max_val, \
                     f"{slug}.{param_name}: default {default} fora do range [{min_val}, {max_val}]"
+    
+    def test_validate_params_clamps_and_is_order_independent(self):
+        """validate_params aplica limites e ignora a ordem dos kwargs; resultado é mutável."""
+        from src.strategies.rsi_reversal import RSIReversalStrategy
+        
+        strategy = RSIReversalStrategy()
+        a = strategy.validate_params(rsi_buy=-100, rsi_sell=70)
+        b = strategy.validate_params(rsi_sell=70, rsi_buy=-100)
+        
+        assert a == b
+        assert a['rsi_buy'] == strategy.parameters['rsi_buy']['min']
+        a['rsi_buy'] = 1
+        assert strategy.validate_params(rsi_buy=-100, rsi_sell=70) == b
+        assert strategy.get_default_params() == dict(strategy.default_params)
+    
+    def test_validate_params_cache_keeps_value_types(self):
+        """30 e 30.0 (e 1 e True) são iguais para o hash, mas o cache não pode misturá-los."""
+        from src.strategies.rsi_reversal import RSIReversalStrategy
+        
+        strategy = RSIReversalStrategy()
+        assert type(strategy.validate_params(rsi_buy=30)['rsi_buy']) is int
+        assert type(strategy.validate_params(rsi_buy=30.0)['rsi_buy']) is float
+        assert type(strategy.validate_params(rsi_buy=30)['rsi_buy']) is int
+    
+    def test_validated_params_are_shared_and_read_only(self):
+        """Caminho quente: mesmo mapeamento do cache a cada chamada, sem cópia e imutável."""
+        from src.strategies.rsi_reversal import RSIReversalStrategy
+        
+        strategy = RSIReversalStrategy()
+        p = strategy._validated_params({"rsi_buy": 25})
+        
+        assert strategy._validated_params({"rsi_buy": 25}) is p
+        assert RSIReversalStrategy()._validated_params({"rsi_buy": 25}) is p
+        assert dict(p) == strategy.validate_params(rsi_buy=25)
+        with pytest.raises(TypeError):
+            p["rsi_buy"] = 1
@@ -0,0 +1,215 @@
+"""
+Testes Unitários - Persistência de Estratégias (strategy_storage.py)
+
+Testa salvar/carregar/listar/remover estratégias e o manifesto .index.json.
+"""
+
+import json
+import os
+import pytest
+
+from src.core import strategy_storage
+from src.core.strategy_storage import (
+    save_strategy,
+    load_strategy,
+    list_strategies,
+    delete_strategy,
+    strategy_exists,
+    sanitize_filename,
+    INDEX_FILENAME,
+    META_SUFFIX,
+)
+
+
+@pytest.fixture(autouse=True)
+def strategies_dir(tmp_path, monkeypatch):
+    """Usa um diretório temporário para as estratégias."""
+    monkeypatch.setattr(strategy_storage, "STRATEGIES_DIR", tmp_path)
+    return tmp_path
+
+
+def _config(n_buy=1, n_sell=1):
+    return {
+        "buy_rules": [{"indicator": "rsi", "operator": "<", "value": 30}] * n_buy,
+        "sell_rules": [{"indicator": "rsi", "operator": ">", "value": 70}] * n_sell,
+        "buy_logic": "AND",
+        "sell_logic": "OR",
+    }
+
+
+class TestSanitizeFilename:
+    """Testes para sanitize_filename."""
+
+    def test_replaces_special_chars(self):
+        """Espaços e símbolos viram '_', hífen e underscore são mantidos."""
+        assert sanitize_filename("RSI + MACD (v2)") == "rsi___macd__v2_"
+        assert sanitize_filename("a-b_c") == "a-b_c"
+
+    def test_keeps_unicode_letters(self):
+        """Letras acentuadas são mantidas; emoji vira '_'."""
+        assert sanitize_filename("Estratégia 🚀") == "estratégia__"
+
+    def test_truncates_to_50_chars(self):
+        """Nome limitado a 50 caracteres."""
+        assert len(sanitize_filename("x" * 80)) == 50
+
+
+class TestStrategyStorage:
+    """Testes para a API pública de persistência."""
+
+    def test_save_and_load(self):
+        """Estratégia salva deve ser carregada com o mesmo conteúdo."""
+        save_strategy("Minha Estratégia", _config())
+
+        loaded = load_strategy("Minha Estratégia")
+        assert loaded["name"] == "Minha Estratégia"
+        assert len(loaded["buy_rules"]) == 1
+        assert strategy_exists("Minha Estratégia")
+
+    def test_load_missing_returns_none(self):
+        """Estratégia inexistente retorna None."""
+        assert load_strategy("Nao Existe") is None
+
+    def test_list_sorted_with_counts(self):
+        """Listagem ordenada por nome e com contagem de regras."""
+        save_strategy("beta", _config(n_buy=2))
+        save_strategy("Alpha", _config(n_sell=3))
+
+        strategies = list_strategies()
+        assert [s["name"] for s in strategies] == ["Alpha", "beta"]
+        assert strategies[0]["sell_rules_count"] == 3
+        assert strategies[1]["buy_rules_count"] == 2
+        assert strategies[0]["sell_logic"] == "OR"
+
+    def test_delete(self):
+        """Estratégia removida some da listagem e do disco."""
+        save_strategy("Temp", _config())
+
+        assert delete_strategy("Temp") is True
+        assert load_strategy("Temp") is None
+        assert list_strategies() == []
+        assert delete_strategy("Temp") is False
+
+
+class TestStrategyIndex:
+    """Testes para o manifesto .index.json."""
+
+    def test_save_updates_index(self, strategies_dir):
+        """Salvar grava a entrada no manifesto."""
+        save_strategy("Com Índice", _config())
+
+        index = json.loads((strategies_dir / INDEX_FILENAME).read_text(encoding="utf-8"))
+        assert [e["name"] for e in index.values()] == ["Com Índice"]
+
+    def test_rebuilds_when_files_added_outside_app(self, strategies_dir):
+        """Arquivo criado fora do app é encontrado pelo nome de exibição."""
+        save_strategy("Primeira", _config())
+        external = dict(_config(n_buy=4), name="Nome Diferente")
+        (strategies_dir / "externa.json").write_text(json.dumps(external), encoding="utf-8")
+
+        loaded = load_strategy("Nome Diferente")
+        assert loaded["buy_rules"] == external["buy_rules"]
+        assert {s["name"] for s in list_strategies()} == {"Primeira", "Nome Diferente"}
+        assert delete_strategy("Nome Diferente") is True
+        assert not (strategies_dir / "externa.json").exists()
+
+    def test_list_is_cached_until_directory_changes(self, strategies_dir):
+        """Listagem vem do cache enquanto o diretório não muda."""
+        save_strategy("Cacheada", _config())
+        first = list_strategies()
+        (strategies_dir / INDEX_FILENAME).write_text("{}", encoding="utf-8")
+
+        assert list_strategies() == first
+
+        save_strategy("Nova", _config())
+        assert {s["name"] for s in list_strategies()} == {"Cacheada", "Nova"}
+
+    def test_rebuild_with_many_files(self, strategies_dir):
+        """Reconstrução (paralela) lê todos os arquivos e ignora JSON inválido."""
+        for i in range(20):
+            save_strategy(f"Estrategia {i:02d}", _config())
+        (strategies_dir / "quebrada.json").write_text("{", encoding="utf-8")
+        (strategies_dir / INDEX_FILENAME).unlink()
+
+        names = [s["name"] for s in list_strategies()]
+        assert names == [f"Estrategia {i:02d}" for i in range(20)]
+
+    def test_rebuild_uses_and_migrates_sidecars(self, strategies_dir):
+        """Sidecar .meta.json é gravado ao salvar e criado na migração de arquivos antigos."""
+        save_strategy("Com Sidecar", _config(n_buy=2))
+        assert (strategies_dir / ("com_sidecar" + META_SUFFIX)).exists()
+
+        legacy = dict(_config(n_sell=5), name="Antiga")
+        (strategies_dir / "antiga.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        by_name = {s["name"]: s for s in list_strategies()}
+        assert by_name["Com Sidecar"]["buy_rules_count"] == 2
+        assert by_name["Antiga"]["sell_rules_count"] == 5
+        assert (strategies_dir / ("antiga" + META_SUFFIX)).exists()
+
+        delete_strategy("Com Sidecar")
+        assert not (strategies_dir / ("com_sidecar" + META_SUFFIX)).exists()
+
+    def test_rebuilds_corrupted_index(self, strategies_dir):
+        """Manifesto corrompido é reconstruído a partir dos arquivos."""
+        save_strategy("Sobrevive", _config())
+        (strategies_dir / INDEX_FILENAME).write_text("{corrompido", encoding="utf-8")
+
+        assert [s["name"] for s in list_strategies()] == ["Sobrevive"]
+
+    def test_reserved_looking_names_are_saved(self, strategies_dir):
+        """'_index' (e ' Index') viram _index.json, que não colide com o manifesto."""
+        assert sanitize_filename("_index") + ".json" != INDEX_FILENAME
+        assert sanitize_filename(" Index") + ".json" != INDEX_FILENAME
+
+        save_strategy("_index", _config(n_buy=2))
+
+        assert load_strategy("_index")["buy_rules"] == _config(n_buy=2)["buy_rules"]
+        assert [s["name"] for s in list_strategies()] == ["_index"]
+        assert (strategies_dir / INDEX_FILENAME).exists()
+
+    def test_files_edited_in_place_are_resummarized(self, strategies_dir):
+        """Arquivo reescrito (mtime novo) é resumido de novo; inválido corrigido volta à listagem."""
+        save_strategy("Alpha", _config())
+        broken = strategies_dir / "quebrada.json"
+        broken.write_text("{", encoding="utf-8")
+        assert [s["name"] for s in list_strategies()] == ["Alpha"]
+
+        def rewrite(path, config):
+            stat = path.stat()
+            path.write_text(json.dumps(config), encoding="utf-8")
+            # Garante mtime diferente mesmo em sistemas de arquivos com resolução grossa
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        rewrite(strategies_dir / "alpha.json", dict(_config(n_buy=3), name="Renamed"))
+        rewrite(broken, dict(_config(), name="Consertada"))
+
+        strategies = list_strategies()
+        assert [s["name"] for s in strategies] == ["Consertada", "Renamed"]
+        assert strategies[1]["buy_rules_count"] == 3
+        assert "mtime_ns" not in strategies[0]
+
+    def test_display_name_lookup_sees_in_place_edits(self, strategies_dir):
+        """load/delete pelo nome de exibição acham arquivo renomeado no lugar (mtime novo)."""
+        save_strategy("Alpha", _config())
+        assert [s["name"] for s in list_strategies()] == ["Alpha"]
+
+        path = strategies_dir / "alpha.json"
+        stat = path.stat()
+        path.write_text(json.dumps(dict(_config(n_buy=2), name="Renamed")), encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert load_strategy("Renamed")["buy_rules"] == _config(n_buy=2)["buy_rules"]
+        assert delete_strategy("Renamed") is True
+        assert not path.exists()
+        assert load_strategy("Renamed") is None
+
+    def test_unknown_name_lookup_does_not_touch_disk(self, strategies_dir):
+        """Nome ausente do manifesto em dia: None, sem reconstruir o manifesto nem os sidecars."""
+        save_strategy("Alpha", _config())
+        list_strategies()
+        written = {p.name: p.stat().st_mtime_ns for p in strategies_dir.iterdir()}
+
+        assert load_strategy("Nao Existe") is None
+        assert delete_strategy("Nao Existe") is False
+        assert {p.name: p.stat().st_mtime_ns for p in strategies_dir.iterdir()} == written